@@ -0,0 +1,213 @@
+"""
+Contrôle d'admission des requêtes de prédiction (backpressure)
+
+Deux voies indépendantes :
+  - voie prioritaire : les petites requêtes (/predict, petits lots). Elles ne
+    font jamais la queue derrière les gros lots ; au-delà de leur propre
+    limite de concurrence elles sont refusées tout de suite.
+  - voie lots : un budget de lignes en cours de traitement. Une requête qui
+    ne rentre pas attend dans une file FIFO bornée, pendant un délai borné ;
+    file pleine ou délai dépassé -> refus immédiat (HTTP 429 + Retry-After).
+
+Un refus rapide coûte bien moins cher qu'une requête acceptée qui fait
+s'effondrer la latence de toutes les autres.
+"""
+import threading
+import time
+from collections import deque
+
+PRIORITY = "priority"
+BULK = "bulk"
+
+class Overloaded(Exception):
+    """Requête refusée par le contrôle d'admission"""
+
+    def __init__(self, reason, retry_after):
+        super().__init__(f"Serveur surchargé ({reason}), réessayer dans {retry_after} s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+class Ticket:
+    """Droit d'entrée accordé à une requête ; à rendre avec release()"""
+
+    __slots__ = ("lane", "rows")
+
+    def __init__(self, lane, rows):
+        self.lane = lane
+        self.rows = rows
+
+class AdmissionController:
+    """
+    Limite les lignes en cours de traitement, avec une file d'attente bornée et une voie prioritaire
+
+    Thread-safe. acquire() bloque au plus queue_timeout secondes ;
+    try_acquire() ne bloque jamais (utile sur une boucle asyncio) et peut
+    réserver la place dans la file de l'acquire() qui suivra dans un thread.
+    """
+
+    def __init__(self, max_rows_in_flight=200_000, max_queue=32, queue_timeout=2.0,
+                 priority_max_rows=16, priority_max_in_flight=256, retry_after=1):
+        """
+        Args:
+            max_rows_in_flight (int): Lignes traitées simultanément dans la voie lots
+            max_queue (int): Requêtes au plus en attente dans la voie lots
+            queue_timeout (float): Attente maximale (secondes) dans la file
+            priority_max_rows (int): Taille maximale (lignes) d'une requête de la voie prioritaire
+            priority_max_in_flight (int): Requêtes prioritaires traitées simultanément
+            retry_after (int): Valeur de l'en-tête Retry-After (secondes) renvoyée en cas de refus
+        """
+        if max_rows_in_flight < 1:
+            raise ValueError("max_rows_in_flight doit être >= 1")
+        self.max_rows_in_flight = int(max_rows_in_flight)
+        self.max_queue = int(max_queue)
+        self.queue_timeout = float(queue_timeout)
+        self.priority_max_rows = int(priority_max_rows)
+        self.priority_max_in_flight = int(priority_max_in_flight)
+        self.retry_after = int(retry_after)
+
+        self._cond = threading.Condition()
+        self._waiters = deque()
+        self._reserved = 0  # Places de file retenues par try_acquire(reserve=True), pas encore dans _waiters
+        self._rows_in_flight = 0
+        self._priority_in_flight = 0
+        self._admitted = {PRIORITY: 0, BULK: 0}
+        self._queued = 0
+        self._rejected = {}
+
+    def lane_for(self, rows):
+        return PRIORITY if rows <= self.priority_max_rows else BULK
+
+    def try_acquire(self, rows, reserve=False):
+        """
+        Admet la requête si elle passe sans attendre, sans jamais bloquer
+
+        Args:
+            rows (int): Lignes de la requête
+            reserve (bool): Si la requête doit attendre, retenir sa place dans la file
+                pour l'appel acquire(rows, reserved=True) qui doit obligatoirement suivre
+
+        Returns:
+            Ticket, ou None si la requête doit attendre dans la file
+
+        Raises:
+            Overloaded: file pleine ou voie prioritaire saturée
+        """
+        with self._cond:
+            ticket = self._admit_now(rows)
+            if ticket is None:
+                if self._queue_full():
+                    raise self._reject("queue_full")
+                if reserve:
+                    self._reserved += 1
+            return ticket
+
+    def acquire(self, rows, timeout=None, reserved=False):
+        """
+        Admet une requête de rows lignes, en attendant au plus timeout secondes dans la file
+
+        Args:
+            reserved (bool): La place dans la file a déjà été retenue par try_acquire(reserve=True)
+
+        Returns:
+            Ticket: à rendre avec release()
+
+        Raises:
+            Overloaded: file pleine, délai dépassé ou voie prioritaire saturée
+        """
+        timeout = self.queue_timeout if timeout is None else timeout
+        with self._cond:
+            if reserved:
+                self._reserved -= 1  # La place passe de la réservation à la file, sous le même verrou
+            ticket = self._admit_now(rows)
+            if ticket is not None:
+                return ticket
+
+            if self._queue_full():
+                raise self._reject("queue_full")
+
+            rows = min(rows, self.max_rows_in_flight)  # Un lot énorme passe seul plutôt que jamais
+            token = object()
+            self._waiters.append(token)
+            self._queued += 1
+            deadline = time.monotonic() + timeout
+            try:
+                while not (self._waiters[0] is token
+                           and self._rows_in_flight + rows <= self.max_rows_in_flight):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise self._reject("queue_timeout")
+                    self._cond.wait(remaining)
+                self._waiters.popleft()
+                self._rows_in_flight += rows
+                self._admitted[BULK] += 1
+                return Ticket(BULK, rows)
+            finally:
+                if token in self._waiters:
+                    self._waiters.remove(token)
+                self._cond.notify_all()  # La tête de file a peut-être changé
+
+    def _admit_now(self, rows):
+        if self.lane_for(rows) == PRIORITY:
+            if self._priority_in_flight >= self.priority_max_in_flight:
+                raise self._reject("priority_full")
+            self._priority_in_flight += 1
+            self._admitted[PRIORITY] += 1
+            return Ticket(PRIORITY, rows)
+
+        rows = min(rows, self.max_rows_in_flight)
+        # FIFO : personne ne double une requête déjà en attente
+        if not self._waiters and self._rows_in_flight + rows <= self.max_rows_in_flight:
+            self._rows_in_flight += rows
+            self._admitted[BULK] += 1
+            return Ticket(BULK, rows)
+        return None
+
+    def _queue_full(self):
+        return len(self._waiters) + self._reserved >= self.max_queue
+
+    def _reject(self, reason):
+        self._rejected[reason] = self._rejected.get(reason, 0) + 1
+        return Overloaded(reason, self.retry_after)
+
+    def release(self, ticket):
+        with self._cond:
+            if ticket.lane == PRIORITY:
+                self._priority_in_flight -= 1
+            else:
+                self._rows_in_flight -= ticket.rows
+                self._cond.notify_all()
+
+    def admit(self, rows, timeout=None):
+        """Context manager : acquire() à l'entrée, release() à la sortie"""
+        return _Admission(self, rows, timeout)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "rows_in_flight": self._rows_in_flight,
+                "max_rows_in_flight": self.max_rows_in_flight,
+                "queued_now": len(self._waiters) + self._reserved,
+                "max_queue": self.max_queue,
+                "priority_in_flight": self._priority_in_flight,
+                "priority_max_in_flight": self.priority_max_in_flight,
+                "priority_max_rows": self.priority_max_rows,
+                "admitted": dict(self._admitted),
+                "queued_total": self._queued,
+                "rejected": dict(self._rejected),
+            }
+
+class _Admission:
+    __slots__ = ("controller", "rows", "timeout", "ticket")
+
+    def __init__(self, controller, rows, timeout):
+        self.controller = controller
+        self.rows = rows
+        self.timeout = timeout
+
+    def __enter__(self):
+        self.ticket = self.controller.acquire(self.rows, self.timeout)
+        return self.ticket
+
+    def __exit__(self, exc_type, exc, tb):
+        self.controller.release(self.ticket)
+        return False
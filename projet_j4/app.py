@@ -1,13 +1,49 @@
-from flask import Flask, jsonify, request
-from predict import predict, predict_multiple
+import gzip
+import json
+import os
+import zlib
+from flask import Flask, Response, jsonify, request
+import numpy as np
+from house_engines import load_engines
+from metrics import ApiMetrics
 
 app = Flask(__name__)
 
+# 📈 Requêtes, latence par étape, tailles de lot et erreurs sur /metrics
+metrics = ApiMetrics("house_api").instrument_flask(app)
+
+MAX_BATCH_ROWS = int(os.environ.get("HOUSE_MAX_BATCH_ROWS", "100000"))
+MAX_BODY_BYTES = int(os.environ.get("HOUSE_MAX_BODY_BYTES", str(64 * 1024 * 1024)))  # Corps reçu, et une fois décompressé
+GZIP_MIN_BYTES = 1024  # En dessous, compresser la réponse ne vaut pas le coût
+READ_CHUNK_BYTES = 64 * 1024
+
+# 🧮 Moteurs de prix : "model" (régression entraînée, réduite à ses coefficients) ou "rules" (predict.py)
+ENGINES = load_engines()
+DEFAULT_ENGINE = os.environ.get("HOUSE_ENGINE", "model" if "model" in ENGINES else "rules")
+if DEFAULT_ENGINE not in ENGINES:
+    raise RuntimeError(f"HOUSE_ENGINE={DEFAULT_ENGINE} indisponible (moteurs chargés: {', '.join(ENGINES)})")
+
+class EngineError(Exception):
+    """Moteur demandé inconnu ou non chargé"""
+
+def select_engine():
+    """Moteur de la requête : paramètre ?engine=rules|model, sinon HOUSE_ENGINE"""
+    name = request.args.get('engine', DEFAULT_ENGINE)
+    engine = ENGINES.get(name)
+    if engine is None:
+        raise EngineError(f"Moteur inconnu ou indisponible: {name} (disponibles: {', '.join(ENGINES)})")
+    return engine
+
+def engine_info(engine):
+    return {"name": engine.name, "version": engine.version}
+
 @app.route('/')
 def hello_world():
     return jsonify({
         "message": "Bienvenue sur l'API de prédiction de prix de maisons!",
-        "status": "API fonctionnelle"
+        "status": "API fonctionnelle",
+        "engine": DEFAULT_ENGINE,
+        "engines": {name: engine_info(engine) for name, engine in ENGINES.items()}
     })
 
 @app.route('/predictions', methods=['GET'])
@@ -21,20 +57,32 @@ def get_predictions():
         {"taille": 180, "nb_chambres": 3, "jardin": True}
     ]
     
-    # Utilisation de la fonction predict du fichier séparé
-    predictions = predict_multiple(houses_data)
+    try:
+        engine = select_engine()
+    except EngineError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    metrics.observe_batch('/predictions', len(houses_data))
+    with metrics.stage('/predictions', 'predict'):
+        predictions = [{**house, "prix_predit": engine.predict_one(house["taille"], house["nb_chambres"],
+                                                                   house["jardin"])}
+                       for house in houses_data]
     
-    return jsonify({
-        "status": "success",
-        "predictions": predictions,
-        "total": len(predictions)
-    })
+    with metrics.stage('/predictions', 'jsonify'):
+        return jsonify({
+            "status": "success",
+            "engine": engine_info(engine),
+            "predictions": predictions,
+            "total": len(predictions)
+        })
 
 @app.route('/predict', methods=['POST'])
 def predict_single():
     """Route pour prédire le prix d'une seule maison"""
     try:
-        data = request.json
+        engine = select_engine()
+        with metrics.stage('/predict', 'json_parse'):
+            data = request.json
         taille = data.get('taille')
         nb_chambres = data.get('nb_chambres')
         jardin = data.get('jardin', False)
@@ -47,23 +95,230 @@ def predict_single():
             }), 400
         
         # Prédiction
-        prix_predit = predict(taille, nb_chambres, jardin)
+        with metrics.stage('/predict', 'predict'):
+            prix_predit = engine.predict_one(taille, nb_chambres, jardin)
         
-        return jsonify({
-            "status": "success",
-            "prediction": {
-                "taille": taille,
-                "nb_chambres": nb_chambres,
-                "jardin": jardin,
-                "prix_predit": prix_predit
-            }
-        })
+        with metrics.stage('/predict', 'jsonify'):
+            return jsonify({
+                "status": "success",
+                "engine": engine_info(engine),
+                "prediction": {
+                    "taille": taille,
+                    "nb_chambres": nb_chambres,
+                    "jardin": jardin,
+                    "prix_predit": prix_predit
+                }
+            })
         
+    except EngineError as e:
+        metrics.error('/predict', e)
+        return jsonify({"status": "error", "message": str(e)}), 400
     except Exception as e:
+        metrics.error('/predict', e)
         return jsonify({
             "status": "error",
             "message": f"Erreur lors de la prédiction: {str(e)}"
         }), 500
 
+class BatchError(Exception):
+    """Erreur qui rejette tout le lot (corps illisible, format inconnu, lot trop gros)"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+def read_limited(stream, limit):
+    """Lit le flux jusqu'au bout sans jamais garder plus de limit octets (corps envoyé par morceaux)"""
+    body = bytearray()
+    while len(body) <= limit:
+        chunk = stream.read(min(READ_CHUNK_BYTES, limit + 1 - len(body)))
+        if not chunk:
+            return bytes(body)
+        body += chunk
+    raise BatchError(f"Corps trop volumineux (max {limit} octets)", 413)
+
+def read_body():
+    """Corps de la requête, décompressé si Content-Encoding: gzip (tailles reçue et décompressée bornées)"""
+    encoding = (request.headers.get('Content-Encoding') or '').strip().lower()
+    if encoding not in ('', 'identity', 'gzip'):
+        raise BatchError(f"Content-Encoding non supporté: {encoding}", 415)
+    # Taille annoncée vérifiée avant toute lecture, que le corps soit compressé ou non
+    if request.content_length is not None and request.content_length > MAX_BODY_BYTES:
+        raise BatchError(f"Corps trop volumineux (max {MAX_BODY_BYTES} octets)", 413)
+    body = read_limited(request.stream, MAX_BODY_BYTES)
+    if encoding != 'gzip':
+        return body
+    try:
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)  # En-tête gzip
+        body = decompressor.decompress(body, MAX_BODY_BYTES + 1)
+    except zlib.error as e:
+        raise BatchError(f"Corps gzip invalide: {str(e)}")
+    if len(body) > MAX_BODY_BYTES or decompressor.unconsumed_tail:
+        raise BatchError(f"Corps trop volumineux une fois décompressé (max {MAX_BODY_BYTES} octets)", 413)
+    return body
+
+def encode_response(payload, status=200):
+    """Réponse JSON, compressée en gzip si le client l'accepte et si elle est assez grosse"""
+    body = json.dumps(payload).encode('utf-8')
+    headers = {"Vary": "Accept-Encoding"}
+    if len(body) >= GZIP_MIN_BYTES and 'gzip' in (request.headers.get('Accept-Encoding') or '').lower():
+        body = gzip.compress(body, compresslevel=5)
+        headers["Content-Encoding"] = "gzip"
+    return Response(body, status=status, mimetype='application/json', headers=headers)
+
+def to_float_column(values):
+    """
+    Liste de valeurs -> tableau float64, cellule par cellule
+
+    Seuls les nombres JSON sont acceptés (ni texte, ni booléen, ni liste) : la
+    validité d'une maison ne dépend jamais des autres maisons du lot. Une valeur
+    absente, non numérique ou trop grande pour un float64 devient NaN.
+    """
+    column = np.full(len(values), np.nan)
+    for i, value in enumerate(values):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            try:
+                column[i] = value
+            except OverflowError:
+                pass  # Ex: 10**400 : erreur à cet index, pas pour tout le lot
+    return column
+
+def validate_houses(taille, nb_chambres, jardin):
+    """
+    Valide toutes les maisons d'un coup
+
+    Args:
+        taille, nb_chambres, jardin (list): Valeurs brutes, une par maison
+
+    Returns:
+        tuple: (taille, nb_chambres, jardin en tableaux NumPy, liste d'erreurs par index)
+    """
+    taille_column = to_float_column(taille)
+    chambres_column = to_float_column(nb_chambres)
+    jardin_column = np.empty(len(jardin), dtype=object)  # Toujours 1-D, même si des cellules sont des listes
+    for i, value in enumerate(jardin):
+        jardin_column[i] = bool(value) if isinstance(value, (bool, int, float)) else value
+
+    missing = np.array([value is None for value in taille]) | np.array([value is None for value in nb_chambres])
+    invalid = ~np.isfinite(taille_column) | ~np.isfinite(chambres_column)
+    bad_jardin = np.array([not isinstance(value, bool) for value in jardin_column])
+
+    errors = {}
+    for i in np.flatnonzero(missing):
+        errors[int(i)] = "Les paramètres 'taille' et 'nb_chambres' sont requis"
+    for i in np.flatnonzero(invalid & ~missing):
+        errors[int(i)] = "'taille' et 'nb_chambres' doivent être des nombres"
+    for i in np.flatnonzero(bad_jardin):
+        errors.setdefault(int(i), "'jardin' doit être un booléen")
+    return taille_column, chambres_column, jardin_column, errors
+
+@app.route('/predict_batch', methods=['POST'])
+def predict_batch():
+    """
+    Prédire le prix de nombreuses maisons en un seul appel (chemin vectorisé)
+
+    Deux formats sont acceptés :
+      - lignes : {"houses": [{"taille": ..., "nb_chambres": ..., "jardin": ...}, ...]}
+      - colonnes : {"taille": [...], "nb_chambres": [...], "jardin": [...]}
+    Une maison invalide reçoit une erreur à son index sans faire échouer le lot.
+    Corps de requête et de réponse optionnellement compressés en gzip.
+    """
+    try:
+        try:
+            engine = select_engine()
+        except EngineError as e:
+            raise BatchError(str(e))
+        with metrics.stage('/predict_batch', 'json_parse'):
+            data = json.loads(read_body())
+        if not isinstance(data, dict):
+            raise BatchError("Un objet JSON est attendu")
+
+        columnar = isinstance(data.get('taille'), list)
+        if columnar:
+            taille = data['taille']
+            nb_chambres = data.get('nb_chambres')
+            jardin = data.get('jardin', [False] * len(taille))
+            if not isinstance(nb_chambres, list) or not isinstance(jardin, list) \
+                    or not len(taille) == len(nb_chambres) == len(jardin):
+                raise BatchError("Les listes 'taille', 'nb_chambres' et 'jardin' doivent avoir la même longueur")
+        else:
+            houses = data.get('houses')
+            if not isinstance(houses, list) or not houses:
+                raise BatchError("Le paramètre 'houses' est requis et doit être une liste non vide")
+            rows = [house if isinstance(house, dict) else {} for house in houses]
+            taille = [house.get('taille') for house in rows]
+            nb_chambres = [house.get('nb_chambres') for house in rows]
+            jardin = [house.get('jardin', False) for house in rows]
+
+        n_rows = len(taille)
+        if n_rows == 0:
+            raise BatchError("Le lot ne doit pas être vide")
+        if n_rows > MAX_BATCH_ROWS:
+            raise BatchError(f"Lot trop gros: {n_rows} maisons (max {MAX_BATCH_ROWS})", 413)
+        metrics.observe_batch('/predict_batch', n_rows)
+
+        with metrics.stage('/predict_batch', 'validate'):
+            taille_column, chambres_column, jardin_column, errors = validate_houses(taille, nb_chambres, jardin)
+            if not columnar:
+                for i, house in enumerate(houses):
+                    if not isinstance(house, dict):
+                        errors[i] = "Chaque maison doit être un objet JSON"
+            valid = np.ones(n_rows, dtype=bool)
+            valid[list(errors)] = False
+
+        # ⚡ Tous les prix valides en une seule expression vectorisée
+        with metrics.stage('/predict_batch', 'predict'):
+            prix = np.full(n_rows, np.nan)
+            prix[valid] = engine.predict_columns(taille_column[valid], chambres_column[valid],
+                                                 jardin_column[valid].astype(bool))
+
+        with metrics.stage('/predict_batch', 'serialize'):
+            errors_list = [{"index": i, "error": message} for i, message in sorted(errors.items())]
+            if columnar:
+                prix_list = prix.tolist()
+                for i in errors:
+                    prix_list[i] = None
+                payload = {
+                    "status": "success",
+                    "format": "columnar",
+                    "engine": engine_info(engine),
+                    "prix_predit": prix_list,
+                    "errors": errors_list,
+                    "total": n_rows
+                }
+            else:
+                predictions = []
+                for i, (house, prix_predit) in enumerate(zip(houses, prix.tolist())):
+                    if i in errors:
+                        predictions.append({"error": errors[i], "house": house})
+                    else:
+                        predictions.append({
+                            "taille": house['taille'],
+                            "nb_chambres": house['nb_chambres'],
+                            "jardin": house.get('jardin', False),
+                            "prix_predit": prix_predit
+                        })
+                payload = {
+                    "status": "success",
+                    "engine": engine_info(engine),
+                    "predictions": predictions,
+                    "errors": len(errors),
+                    "total": n_rows
+                }
+            return encode_response(payload)
+
+    except BatchError as e:
+        metrics.error('/predict_batch', e)
+        return encode_response({"status": "error", "message": str(e)}, e.status)
+    except ValueError as e:  # JSON invalide
+        metrics.error('/predict_batch', e)
+        return encode_response({"status": "error", "message": f"Corps JSON invalide: {str(e)}"}, 400)
+    except Exception as e:
+        metrics.error('/predict_batch', e)
+        return encode_response({
+            "status": "error",
+            "message": f"Erreur lors des prédictions: {str(e)}"
+        }, 500)
+
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000) 
\ No newline at end of file
+    app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,177 @@
+"""
+Formats binaires/colonnes pour /predict_batch (négociés via le Content-Type)
+
+  - application/octet-stream : floats 64 bits little-endian, lignes
+    (size, p53_concentration) entrelacées. Réponse : floats 64 bits
+    (is_cancerous, probability_cancerous) par ligne, NaN pour une ligne invalide.
+  - application/vnd.apache.arrow.stream : flux Arrow IPC avec les colonnes
+    size et p53_concentration. Réponse : colonnes is_cancerous et
+    probability_cancerous (nulles pour une ligne invalide). Nécessite pyarrow.
+  - application/vnd.apache.arrow.file : mêmes colonnes, au format fichier
+    Arrow IPC (magique ARROW1, accès aléatoire). Réponse au format fichier.
+  - application/msgpack : map {"size": ..., "p53_concentration": ...} où chaque
+    colonne est soit une liste de nombres, soit un bin de floats 64 bits
+    little-endian. Réponse : map avec des bin (int64 -1 / NaN pour une ligne
+    invalide). Nécessite msgpack.
+
+Le JSON reste le format par défaut. Les colonnes sont décodées en vues NumPy
+sur le tampon de la requête, sans copie, quand le format le permet.
+"""
+import numpy as np
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+RAW_FLOAT64 = "application/octet-stream"
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+ARROW_FILE = "application/vnd.apache.arrow.file"
+MSGPACK = "application/msgpack"
+
+_ALIASES = {
+    RAW_FLOAT64: RAW_FLOAT64,
+    ARROW_STREAM: ARROW_STREAM,
+    ARROW_FILE: ARROW_FILE,
+    MSGPACK: MSGPACK,
+    "application/x-msgpack": MSGPACK,
+}
+
+FLOAT64_LE = np.dtype('<f8')
+INT64_LE = np.dtype('<i8')
+FEATURES = ('size', 'p53_concentration')
+
+class UnsupportedFormat(Exception):
+    """Format binaire reconnu mais dépendance optionnelle absente"""
+
+def negotiate(content_type):
+    """Renvoie le format binaire demandé par le Content-Type, ou None pour le JSON"""
+    if not content_type:
+        return None
+    mimetype = content_type.split(';', 1)[0].strip().lower()
+    fmt = _ALIASES.get(mimetype)
+    if fmt in (ARROW_STREAM, ARROW_FILE) and pa is None:
+        raise UnsupportedFormat("pyarrow n'est pas installé sur le serveur")
+    if fmt == MSGPACK and msgpack is None:
+        raise UnsupportedFormat("msgpack n'est pas installé sur le serveur")
+    return fmt
+
+def decode_columns(body, fmt):
+    """
+    Décode le corps de la requête en colonnes (size, p53_concentration)
+
+    Args:
+        body (bytes): Corps brut de la requête
+        fmt (str): Format renvoyé par negotiate()
+
+    Returns:
+        tuple: deux tableaux 1-D float64 (des vues sur body quand c'est possible)
+
+    Raises:
+        ValueError: si le corps ne respecte pas le format
+    """
+    if fmt == RAW_FLOAT64:
+        if len(body) % (2 * FLOAT64_LE.itemsize):
+            raise ValueError("Le corps doit contenir des paires de floats 64 bits little-endian")
+        features = np.frombuffer(body, dtype=FLOAT64_LE).reshape(-1, 2)
+        return features[:, 0], features[:, 1]
+
+    if fmt in (ARROW_STREAM, ARROW_FILE):
+        open_ipc = pa.ipc.open_stream if fmt == ARROW_STREAM else pa.ipc.open_file
+        table = open_ipc(pa.py_buffer(body)).read_all()
+        missing = [name for name in FEATURES if name not in table.column_names]
+        if missing:
+            raise ValueError(f"Colonnes manquantes: {', '.join(missing)}")
+        return tuple(_arrow_column_to_numpy(table.column(name)) for name in FEATURES)
+
+    if fmt == MSGPACK:
+        data = msgpack.unpackb(body, raw=False)
+        if not isinstance(data, dict) or any(name not in data for name in FEATURES):
+            raise ValueError("Une map avec 'size' et 'p53_concentration' est attendue")
+        columns = tuple(_msgpack_column_to_numpy(data[name]) for name in FEATURES)
+        if len(columns[0]) != len(columns[1]):
+            raise ValueError("Les colonnes 'size' et 'p53_concentration' doivent avoir la même longueur")
+        return columns
+
+    raise ValueError(f"Format inconnu: {fmt}")
+
+def _one_dimensional(array):
+    """Refuse les colonnes dont les cellules ne sont pas des scalaires (listes imbriquées)"""
+    if array.ndim != 1:
+        raise ValueError("Chaque colonne doit être une liste de nombres (une dimension)")
+    return array
+
+def _arrow_column_to_numpy(column):
+    column = column.cast(pa.float64())
+    if column.num_chunks == 1 and column.null_count == 0:
+        return _one_dimensional(column.chunk(0).to_numpy(zero_copy_only=True))  # Vue directe sur le tampon
+    return _one_dimensional(column.to_numpy().astype(np.float64))  # Les nulls deviennent NaN (copie)
+
+def _msgpack_column_to_numpy(values):
+    if isinstance(values, (bytes, bytearray, memoryview)):
+        if len(values) % FLOAT64_LE.itemsize:
+            raise ValueError("Une colonne binaire doit contenir des floats 64 bits little-endian")
+        return np.frombuffer(values, dtype=FLOAT64_LE)
+    return _one_dimensional(np.array(values, dtype=np.float64))  # None devient NaN
+
+def encode_result(fmt, labels, probabilities, valid, model_version):
+    """
+    Encode le résultat dans le même format que la requête
+
+    Args:
+        fmt (str): Format renvoyé par negotiate()
+        labels (ndarray): Labels prédits pour les lignes valides
+        probabilities (ndarray): Probabilités pour les lignes valides
+        valid (ndarray): Masque booléen des lignes valides (taille n)
+        model_version (str): Version du modèle utilisé
+
+    Returns:
+        bytes: Corps de la réponse
+    """
+    n_rows = len(valid)
+    all_valid = bool(valid.all())
+
+    if fmt == RAW_FLOAT64:
+        out = np.full((n_rows, 2), np.nan, dtype=FLOAT64_LE)
+        out[valid, 0] = labels
+        out[valid, 1] = probabilities
+        return out.tobytes()
+
+    if fmt in (ARROW_STREAM, ARROW_FILE):
+        mask = None if all_valid else ~valid
+        full_labels = np.zeros(n_rows, dtype=np.int64)
+        full_probabilities = np.zeros(n_rows, dtype=np.float64)
+        full_labels[valid] = labels
+        full_probabilities[valid] = probabilities
+        batch = pa.record_batch(
+            [pa.array(full_labels, mask=mask), pa.array(full_probabilities, mask=mask)],
+            names=['is_cancerous', 'probability_cancerous'],
+        )
+        batch = batch.replace_schema_metadata({"model_version": model_version})
+        sink = pa.BufferOutputStream()
+        new_ipc = pa.ipc.new_stream if fmt == ARROW_STREAM else pa.ipc.new_file
+        with new_ipc(sink, batch.schema) as writer:
+            writer.write_batch(batch)
+        return sink.getvalue().to_pybytes()
+
+    if fmt == MSGPACK:
+        full_labels = np.full(n_rows, -1, dtype=INT64_LE)
+        full_probabilities = np.full(n_rows, np.nan, dtype=FLOAT64_LE)
+        full_labels[valid] = labels
+        full_probabilities[valid] = probabilities
+        return msgpack.packb({
+            "status": "success",
+            "format": "columnar",
+            "is_cancerous": full_labels.tobytes(),
+            "probability_cancerous": full_probabilities.tobytes(),
+            "invalid_indices": np.flatnonzero(~valid).tolist(),
+            "total": n_rows,
+            "model_version": model_version,
+        }, use_bin_type=True)
+
+    raise ValueError(f"Format inconnu: {fmt}")
@@ -0,0 +1,116 @@
+import argparse
+import http.client
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+import numpy as np
+
+FLASK_PORT = 5002
+ASGI_PORT = 5003
+PAYLOAD = json.dumps({"size": 0.015, "p53_concentration": 0.003})
+
+def start_server(command, port):
+    """Lance un serveur dans son propre groupe de processus et attend qu'il réponde"""
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                               start_new_session=True)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/health")
+            if conn.getresponse().status == 200:
+                conn.close()
+                return process
+        except OSError:
+            time.sleep(0.2)
+    stop_server(process)
+    raise RuntimeError(f"Le serveur sur le port {port} n'a pas démarré")
+
+def stop_server(process):
+    """Arrête le serveur et ses processus enfants (reloader Flask, workers uvicorn)"""
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=10)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        os.killpg(process.pid, signal.SIGKILL)
+
+def run_load(port, concurrency, duration):
+    """Boucle fermée : chaque client garde sa connexion et renvoie une requête dès la réponse reçue"""
+    latencies = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+    stop_at = time.perf_counter() + duration
+
+    def client(i):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        headers = {"Content-Type": "application/json"}
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            try:
+                conn.request("POST", "/predict", body=PAYLOAD, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                if response.status != 200:
+                    errors[i] += 1
+                    continue
+            except (OSError, http.client.HTTPException):
+                errors[i] += 1
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+                continue
+            latencies[i].append(time.perf_counter() - start)
+        conn.close()
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    all_latencies = np.array([l for per_client in latencies for l in per_client]) * 1000
+    return {
+        "requests": len(all_latencies),
+        "errors": sum(errors),
+        "throughput_rps": len(all_latencies) / duration,
+        "p50_ms": float(np.percentile(all_latencies, 50)) if len(all_latencies) else None,
+        "p99_ms": float(np.percentile(all_latencies, 99)) if len(all_latencies) else None,
+    }
+
+def print_result(name, result):
+    print(f"  {name:<28} {result['throughput_rps']:8.0f} req/s | "
+          f"p50 {result['p50_ms']:6.2f} ms | p99 {result['p99_ms']:6.2f} ms | "
+          f"erreurs {result['errors']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare le débit de /predict : serveur de dev Flask vs ASGI")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--workers", type=int, default=2, help="Processus uvicorn côté ASGI")
+    parser.add_argument("--inference-threads", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"🏁 Charge en boucle fermée : {args.concurrency} clients pendant {args.duration:.0f} s")
+
+    flask = start_server([sys.executable, "tumor_api_fixed.py"], FLASK_PORT)
+    try:
+        flask_result = run_load(FLASK_PORT, args.concurrency, args.duration)
+    finally:
+        stop_server(flask)
+
+    asgi = start_server([sys.executable, "tumor_api_asgi.py", "--port", str(ASGI_PORT),
+                         "--workers", str(args.workers),
+                         "--inference-threads", str(args.inference_threads)], ASGI_PORT)
+    try:
+        asgi_result = run_load(ASGI_PORT, args.concurrency, args.duration)
+    finally:
+        stop_server(asgi)
+
+    print_result("Flask (serveur de dev)", flask_result)
+    print_result(f"ASGI ({args.workers} workers)", asgi_result)
+    print(f"  ⚡ Rapport de débit : x{asgi_result['throughput_rps'] / flask_result['throughput_rps']:.1f}")
+
+if __name__ == "__main__":
+    main()
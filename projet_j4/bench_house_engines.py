@@ -0,0 +1,90 @@
+"""
+Parité et benchmark des moteurs de prix de l'API maisons
+
+  - parité : régression réduite à ses coefficients contre model.predict() de
+    sklearn (doit être identique au centime), puis écart règles / modèle sur houses.csv
+  - latence une maison : règles, coefficients, sklearn
+  - débit par lot : règles et coefficients vectorisés, sklearn
+
+    python bench_house_engines.py
+    python bench_house_engines.py --rows 1000000 --single-calls 50000
+"""
+import argparse
+import joblib
+import numpy as np
+import pandas as pd
+from bench_predict_multiple import best_time, make_houses
+from house_engines import LinearPriceModel, RulesEngine
+
+def check_parity(model, engine, rules, houses_csv):
+    houses = pd.read_csv(houses_csv)
+    X = houses[list(model.feature_names_in_)]
+    expected = np.round(model.predict(X), 2)
+    compiled = engine.predict_columns(houses["size"], houses["nb_rooms"], houses["garden"])
+    single = np.array([engine.predict_one(t, c, j) for t, c, j in
+                       zip(houses["size"].tolist(), houses["nb_rooms"].tolist(), houses["garden"].tolist())])
+    rule_prices = rules.predict_columns(houses["size"], houses["nb_rooms"], houses["garden"].astype(bool))
+
+    print(f"🔍 Parité sur {houses_csv} ({len(houses)} maisons)")
+    print(f"   coefficients vs sklearn : écart max {np.abs(compiled - expected).max():.4f} €"
+          f" (une maison: {np.abs(single - expected).max():.4f} €)")
+    diff = rule_prices - compiled
+    print(f"   règles vs modèle        : écart moyen {diff.mean():,.0f} €, "
+          f"écart absolu moyen {np.abs(diff).mean():,.0f} €, max {np.abs(diff).max():,.0f} €")
+    if "price" in houses:
+        for name, prices in (("règles", rule_prices), ("modèle", compiled)):
+            print(f"   MAE vs prix réels ({name}) : {np.abs(prices - houses['price']).mean():,.0f} €")
+    return float(np.abs(compiled - expected).max())
+
+def bench_single(model, engine, rules, n_calls):
+    house = (150.0, 3, True)
+    frame = pd.DataFrame([house], columns=list(model.feature_names_in_))
+
+    def loop(func):
+        return lambda: [func() for _ in range(n_calls)]
+
+    timings = {
+        "règles": best_time(loop(lambda: rules.predict_one(*house)), 3),
+        "coefficients": best_time(loop(lambda: engine.predict_one(*house)), 3),
+        # sklearn est ~1000x plus lent : on le mesure sur moins d'appels
+        "sklearn": best_time(lambda: [model.predict(frame) for _ in range(n_calls // 100)], 3) * 100,
+    }
+    print(f"\n⏱️ Latence une maison ({n_calls:,} appels)")
+    for name, seconds in timings.items():
+        print(f"   {name:>12} : {seconds / n_calls * 1e6:8.3f} µs/appel")
+
+def bench_batch(model, engine, rules, n_rows):
+    columns = make_houses(n_rows)
+    frame = pd.DataFrame({"size": columns["taille"], "nb_rooms": columns["nb_chambres"],
+                          "garden": columns["jardin"].astype(int)})[list(model.feature_names_in_)]
+    timings = {
+        "règles": best_time(lambda: rules.predict_columns(columns["taille"], columns["nb_chambres"],
+                                                          columns["jardin"]), 3),
+        "coefficients": best_time(lambda: engine.predict_columns(columns["taille"], columns["nb_chambres"],
+                                                                 columns["jardin"]), 3),
+        "sklearn": best_time(lambda: model.predict(frame), 3),
+    }
+    print(f"\n🚀 Lot de {n_rows:,} maisons")
+    for name, seconds in timings.items():
+        print(f"   {name:>12} : {seconds * 1e3:8.2f} ms ({n_rows / seconds:,.0f} maisons/s)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Parité et benchmark règles / modèle entraîné")
+    parser.add_argument("--model", default="regression.joblib")
+    parser.add_argument("--houses", default="houses.csv")
+    parser.add_argument("--rows", type=int, default=100_000, help="Taille du lot pour le débit")
+    parser.add_argument("--single-calls", type=int, default=100_000, help="Appels pour la latence une maison")
+    args = parser.parse_args()
+
+    model = joblib.load(args.model)
+    engine = LinearPriceModel.from_sklearn(model)
+    rules = RulesEngine()
+
+    max_diff = check_parity(model, engine, rules, args.houses)
+    bench_single(model, engine, rules, args.single_calls)
+    bench_batch(model, engine, rules, args.rows)
+    if max_diff > 0.01:
+        raise SystemExit(f"❌ Le moteur à coefficients s'écarte de sklearn de {max_diff:.4f} €")
+
+if __name__ == "__main__":
+    main()
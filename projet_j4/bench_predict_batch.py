@@ -0,0 +1,73 @@
+import json
+import time
+import numpy as np
+from tumor_api_fixed import app
+from tumor_service import orjson
+import batch_formats
+
+N_ROWS = 100_000
+N_REPEATS = 3
+MIN_SPEEDUP = 10  # Format colonnes vs format lignes à 100k lignes
+
+def generate_tumors(n_rows, seed=42):
+    """Génère des tumeurs aléatoires dans la plage des données d'entraînement"""
+    rng = np.random.default_rng(seed)
+    sizes = rng.uniform(0.005, 0.07, n_rows)
+    p53 = rng.uniform(0.0, 0.011, n_rows)
+    return sizes, p53
+
+def time_request(client, payload, content_type='application/json'):
+    """Renvoie le meilleur temps (en secondes) pour un POST /predict_batch"""
+    body = payload if isinstance(payload, bytes) else json.dumps(payload)
+    best = float('inf')
+    for _ in range(N_REPEATS):
+        start = time.perf_counter()
+        response = client.post('/predict_batch', data=body, content_type=content_type)
+        response.get_data()
+        best = min(best, time.perf_counter() - start)
+        assert response.status_code == 200, response.get_data(as_text=True)[:200]
+    return best
+
+def run_benchmark(n_rows=N_ROWS):
+    """Compare le format lignes (dicts) au format colonnes sur /predict_batch"""
+    sizes, p53 = generate_tumors(n_rows)
+    rows_payload = {"tumors": [
+        {"size": float(s), "p53_concentration": float(p)} for s, p in zip(sizes, p53)
+    ]}
+    columnar_payload = {"size": sizes.tolist(), "p53_concentration": p53.tolist()}
+
+    client = app.test_client()
+    rows_time = time_request(client, rows_payload)
+    columnar_time = time_request(client, columnar_payload)
+
+    print(f"📊 /predict_batch sur {n_rows:,} lignes (meilleur de {N_REPEATS})")
+    print(f"  Codec JSON      : {'orjson' if orjson is not None else 'json (bibliothèque standard)'}")
+    print(f"  Format lignes   : {rows_time * 1000:8.1f} ms ({n_rows / rows_time:,.0f} lignes/s)")
+    print(f"  Format colonnes : {columnar_time * 1000:8.1f} ms ({n_rows / columnar_time:,.0f} lignes/s)")
+    speedup = rows_time / columnar_time
+    print(f"  ⚡ Accélération : x{speedup:.1f}")
+
+    # Formats binaires (voir batch_formats.py)
+    raw_body = np.column_stack([sizes, p53]).astype('<f8').tobytes()
+    raw_time = time_request(client, raw_body, batch_formats.RAW_FLOAT64)
+    print(f"  Binaire float64 : {raw_time * 1000:8.1f} ms ({n_rows / raw_time:,.0f} lignes/s)")
+    if batch_formats.pa is not None:
+        pa = batch_formats.pa
+        table = pa.table({"size": sizes, "p53_concentration": p53})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        arrow_time = time_request(client, sink.getvalue().to_pybytes(), batch_formats.ARROW_STREAM)
+        print(f"  Arrow IPC       : {arrow_time * 1000:8.1f} ms ({n_rows / arrow_time:,.0f} lignes/s)")
+    if batch_formats.msgpack is not None:
+        body = batch_formats.msgpack.packb({"size": sizes.astype('<f8').tobytes(),
+                                            "p53_concentration": p53.astype('<f8').tobytes()})
+        msgpack_time = time_request(client, body, batch_formats.MSGPACK)
+        print(f"  MessagePack     : {msgpack_time * 1000:8.1f} ms ({n_rows / msgpack_time:,.0f} lignes/s)")
+    return speedup
+
+if __name__ == "__main__":
+    speedup = run_benchmark()
+    assert speedup >= MIN_SPEEDUP, (
+        f"Format colonnes seulement x{speedup:.1f} plus rapide (x{MIN_SPEEDUP} attendu ; orjson est-il installé ?)"
+    )
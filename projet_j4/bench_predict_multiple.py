@@ -0,0 +1,63 @@
+"""
+Benchmark : predict_multiple (boucle Python) contre predict_multiple_columnar (NumPy)
+
+De 1 000 à 10 millions de maisons. La boucle est limitée par défaut à 1 million
+de lignes (10 millions de dicts Python occuperaient plusieurs Go).
+
+    python bench_predict_multiple.py
+    python bench_predict_multiple.py --sizes 1000 100000 --max-loop-rows 100000
+"""
+import argparse
+import time
+import numpy as np
+from predict import predict_multiple, predict_multiple_columnar
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+
+def make_houses(n_rows, seed=42):
+    """Données synthétiques reproductibles, au format colonnes"""
+    rng = np.random.default_rng(seed)
+    return {
+        "taille": np.round(rng.uniform(20, 300, n_rows), 1),
+        "nb_chambres": rng.integers(1, 8, n_rows),
+        "jardin": rng.random(n_rows) < 0.5,
+    }
+
+def best_time(func, repeat):
+    """Meilleur temps (secondes) sur plusieurs exécutions"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def run_benchmark(sizes=SIZES, max_loop_rows=1_000_000):
+    print(f"{'lignes':>12} | {'boucle (s)':>11} | {'colonnes (s)':>12} | {'lignes/s colonnes':>18} | accélération")
+    for n_rows in sizes:
+        columns = make_houses(n_rows)
+        repeat = 5 if n_rows <= 100_000 else 2
+
+        columnar_s = best_time(lambda: predict_multiple_columnar(columns), repeat)
+
+        loop_s = None
+        if n_rows <= max_loop_rows:
+            rows = [{"taille": t, "nb_chambres": c, "jardin": j}
+                    for t, c, j in zip(columns["taille"].tolist(), columns["nb_chambres"].tolist(),
+                                       columns["jardin"].tolist())]
+            loop_s = best_time(lambda: predict_multiple(rows), repeat)
+
+        loop_text = f"{loop_s:11.4f}" if loop_s is not None else f"{'-':>11}"
+        speedup = f"x{loop_s / columnar_s:,.0f}" if loop_s is not None else "-"
+        print(f"{n_rows:>12,} | {loop_text} | {columnar_s:12.4f} | {n_rows / columnar_s:>18,.0f} | {speedup}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de predict_multiple vectorisé")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--max-loop-rows", type=int, default=1_000_000,
+                        help="Au-delà, la version boucle n'est pas mesurée")
+    args = parser.parse_args()
+    run_benchmark(args.sizes, args.max_loop_rows)
+
+if __name__ == "__main__":
+    main()
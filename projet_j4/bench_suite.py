@@ -0,0 +1,227 @@
+"""
+Suite de benchmarks reproductible de la pile de prédiction
+
+Couvre, avec des entrées figées (graines fixes) :
+  - predict.predict / predict_multiple / predict_columns (règles des maisons)
+  - scaler + modèle tumeurs : pipeline sklearn et noyau compilé, de 1 à 1M lignes
+  - sérialisation JSON d'une réponse de lot (json standard et orjson)
+  - appels de bout en bout via le client de test Flask : /predict et /predict_batch
+    des APIs maisons (app.py) et tumeurs (tumor_api_fixed.py)
+
+Chaque cas est calibré (assez d'appels pour ~50 ms par mesure), mesuré
+plusieurs fois, et résumé par le temps médian et minimal par appel. Les
+résultats sont écrits en JSON avec l'environnement (versions, CPU, commit).
+La comparaison à une référence porte sur le temps minimal, le moins sensible
+au bruit de la machine ; les cas plus lents que --threshold sont signalés
+et le code de sortie vaut 1 (utilisable en CI).
+
+    python bench_suite.py --save-baseline                 # crée bench_baseline.json
+    python bench_suite.py                                 # compare à la référence
+    python bench_suite.py --filter tumor --repeat 3       # seulement certains cas
+
+Les temps dépendent de la machine : bench_results.json et bench_baseline.json
+restent locaux (ignorés par git), la référence se crée sur la machine qui compare.
+"""
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import warnings
+import numpy as np
+
+RESULTS_PATH = "bench_results.json"
+BASELINE_PATH = "bench_baseline.json"
+SEED = 42
+TARGET_SECONDS = 0.05  # Durée visée d'une mesure (calibrage du nombre d'appels)
+
+def calibrate(func, target=TARGET_SECONDS):
+    """Nombre d'appels tel qu'une mesure dure au moins target secondes (comme timeit.autorange)"""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        if time.perf_counter() - start >= target or number >= 1_000_000:
+            return number
+        number *= 2 if time.perf_counter() - start > target / 10 else 10
+
+def measure(func, repeat):
+    """Temps par appel (secondes) sur repeat mesures : (médiane, minimum, nombre d'appels par mesure)"""
+    func()  # Chauffe (caches, imports paresseux)
+    number = calibrate(func)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    return float(np.median(timings)), float(min(timings)), number
+
+def build_cases():
+    """Cas de benchmark : liste de (nom, fonction sans argument, lignes traitées par appel)"""
+    os.environ.setdefault("TUMOR_MODEL_WATCH_INTERVAL", "0")  # Pas de thread de surveillance pendant la mesure
+    os.environ.setdefault("TUMOR_CACHE_SIZE", "0")  # Sinon /predict mesurerait le cache, pas le modèle
+    warnings.filterwarnings("ignore")
+    import joblib
+    from predict import predict, predict_columns, predict_multiple
+    from tumor_inference import CompiledTumorModel
+    from bench_predict_multiple import make_houses
+    import tumor_service
+    from app import app as house_app
+    from tumor_api_fixed import app as tumor_app
+
+    cases = []
+    rng = np.random.default_rng(SEED)
+
+    # 🏠 Règles de prix des maisons
+    houses = make_houses(10_000, seed=SEED)
+    rows = [{"taille": t, "nb_chambres": c, "jardin": j}
+            for t, c, j in zip(houses["taille"].tolist(), houses["nb_chambres"].tolist(), houses["jardin"].tolist())]
+    cases.append(("house/predict", lambda: predict(150.0, 3, True), 1))
+    cases.append(("house/predict_multiple/1k", lambda: predict_multiple(rows[:1000]), 1000))
+    big_houses = make_houses(1_000_000, seed=SEED)
+    cases.append(("house/predict_columns/1M",
+                  lambda: predict_columns(big_houses["taille"], big_houses["nb_chambres"], big_houses["jardin"]),
+                  1_000_000))
+
+    # 🔬 Scaler + modèle tumeurs
+    model = joblib.load("tumor_model.joblib")
+    scaler = joblib.load("tumor_scaler.joblib")
+    compiled = CompiledTumorModel.from_sklearn(model, scaler)
+    features = np.column_stack([rng.uniform(0.005, 0.05, 1_000_000), rng.uniform(0.0005, 0.01, 1_000_000)])
+    for n_rows, label in ((1, "1"), (1_000, "1k"), (100_000, "100k"), (1_000_000, "1M")):
+        block = features[:n_rows]
+
+        def sklearn_pipeline(block=block):
+            scaled = scaler.transform(block)
+            return model.predict(scaled), model.predict_proba(scaled)[:, 1]
+
+        cases.append((f"tumor/sklearn/{label}", sklearn_pipeline, n_rows))
+        cases.append((f"tumor/compiled/{label}", lambda block=block: compiled.predict_with_proba(block), n_rows))
+    cases.append(("tumor/compiled_scalar/1", lambda: compiled.predict_one(0.015, 0.003), 1))
+
+    # 📦 Sérialisation JSON d'une réponse de 10 000 prédictions
+    labels, probabilities = compiled.predict_with_proba(features[:10_000])
+    payload = {"status": "success", "total": 10_000, "predictions": [
+        {"size": float(s), "p53_concentration": float(p), "is_cancerous": int(l), "probability_cancerous": float(q)}
+        for (s, p), l, q in zip(features[:10_000].tolist(), labels.tolist(), probabilities.tolist())]}
+    cases.append(("json/json_dumps/10k", lambda: json.dumps(payload).encode('utf-8'), 10_000))
+    if tumor_service.orjson is not None:
+        cases.append(("json/orjson_dumps/10k", lambda: tumor_service.orjson.dumps(payload), 10_000))
+
+    # 🌐 Bout en bout, client de test Flask (routage, décodage, validation, encodage)
+    house_client = house_app.test_client()
+    house_batch = {"houses": rows[:1000]}
+    cases.append(("flask/house/predict",
+                  lambda: house_client.post('/predict', json={"taille": 150, "nb_chambres": 3, "jardin": True}), 1))
+    cases.append(("flask/house/predict_batch/1k", lambda: house_client.post('/predict_batch', json=house_batch), 1000))
+
+    tumor_client = tumor_app.test_client()
+    tumor_batch = {"tumors": [{"size": s, "p53_concentration": p} for s, p in features[:1000].tolist()]}
+    cases.append(("flask/tumor/predict",
+                  lambda: tumor_client.post('/predict', json={"size": 0.015, "p53_concentration": 0.003}), 1))
+    cases.append(("flask/tumor/predict_batch/1k", lambda: tumor_client.post('/predict_batch', json=tumor_batch), 1000))
+    return cases
+
+def environment():
+    """Contexte de la mesure : des résultats ne se comparent qu'à environnement égal"""
+    import sklearn
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "sklearn": sklearn.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "commit": commit,
+    }
+
+def run_suite(pattern="*", repeat=5):
+    """Mesure tous les cas dont le nom correspond au motif ; renvoie les résultats (dict JSON)"""
+    results = {}
+    for name, func, n_rows in build_cases():
+        if not fnmatch.fnmatch(name, pattern) and pattern not in name:
+            continue
+        median, best, number = measure(func, repeat)
+        results[name] = {"median_s": median, "min_s": best, "calls_per_measure": number, "rows": n_rows,
+                         "rows_per_s": n_rows / median}
+        print(f"  {name:<32} {median * 1e6:>12.2f} µs/appel  {n_rows / median:>14,.0f} lignes/s", file=sys.stderr)
+    return {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "seed": SEED, "repeat": repeat,
+            "environment": environment(), "results": results}
+
+def compare(current, baseline, threshold):
+    """
+    Compare les temps minimaux à la référence
+
+    Returns:
+        list: (nom, temps de référence, temps actuel, ratio) des cas plus lents que 1 + threshold
+    """
+    regressions = []
+    print(f"\n{'cas':<32} {'référence':>12} {'actuel':>12} {'ratio':>7}", file=sys.stderr)
+    for name, result in current["results"].items():
+        reference = baseline["results"].get(name)
+        if reference is None:
+            print(f"{name:<32} {'-':>12} {result['min_s'] * 1e6:>10.2f}µs {'nouveau':>7}", file=sys.stderr)
+            continue
+        ratio = result["min_s"] / reference["min_s"]
+        flag = ""
+        if ratio > 1 + threshold:
+            regressions.append((name, reference["min_s"], result["min_s"], ratio))
+            flag = "  ❌ régression"
+        elif ratio < 1 - threshold:
+            flag = "  ✅ plus rapide"
+        print(f"{name:<32} {reference['min_s'] * 1e6:>10.2f}µs {result['min_s'] * 1e6:>10.2f}µs "
+              f"{ratio:>7.2f}{flag}", file=sys.stderr)
+    if baseline.get("environment", {}) != current["environment"]:
+        changed = {key for key in current["environment"]
+                   if key != "commit" and baseline.get("environment", {}).get(key) != current["environment"][key]}
+        if changed:
+            print(f"⚠️ Environnement différent de la référence ({', '.join(sorted(changed))}) : "
+                  f"comparaison indicative", file=sys.stderr)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite de benchmarks de la pile de prédiction")
+    parser.add_argument("--filter", default="*", help="Motif (glob ou sous-chaîne) des cas à mesurer")
+    parser.add_argument("--repeat", type=int, default=5, help="Mesures par cas")
+    parser.add_argument("--output", default=RESULTS_PATH, help="Fichier de résultats JSON")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Référence à laquelle comparer")
+    parser.add_argument("--save-baseline", action="store_true", help="Enregistrer ces résultats comme référence")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="Ralentissement relatif au-delà duquel un cas est signalé (0.15 = +15 %%)")
+    args = parser.parse_args()
+
+    print(f"⏱️ Benchmarks ({args.repeat} mesures par cas)", file=sys.stderr)
+    current = run_suite(args.filter, args.repeat)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(current, f, indent=2)
+    print(f"📝 Résultats écrits dans {args.output}", file=sys.stderr)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2)
+        print(f"📌 Référence enregistrée dans {args.baseline}", file=sys.stderr)
+        return
+    if not os.path.exists(args.baseline):
+        print(f"ℹ️ Pas de référence ({args.baseline}) : lancer avec --save-baseline pour en créer une",
+              file=sys.stderr)
+        return
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare(current, baseline, args.threshold)
+    if regressions:
+        print(f"\n❌ {len(regressions)} régression(s) au-delà de +{args.threshold:.0%}", file=sys.stderr)
+        sys.exit(1)
+    print(f"\n✅ Aucune régression au-delà de +{args.threshold:.0%}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import time
+import warnings
+import joblib
+import numpy as np
+from tumor_inference import CompiledTumorModel
+
+N_CALLS = 2000
+
+def time_per_call(func, n_calls=N_CALLS):
+    """Renvoie la latence médiane (en microsecondes) d'un appel"""
+    timings = np.empty(n_calls)
+    for i in range(n_calls):
+        start = time.perf_counter()
+        func()
+        timings[i] = time.perf_counter() - start
+    return float(np.median(timings)) * 1e6
+
+def run_benchmark():
+    """Compare la latence une-ligne du pipeline sklearn et du noyau compilé"""
+    warnings.filterwarnings("ignore")
+    model = joblib.load("tumor_model.joblib")
+    scaler = joblib.load("tumor_scaler.joblib")
+    compiled = CompiledTumorModel.from_sklearn(model, scaler)
+    size, p53_concentration = 0.015, 0.003
+
+    def sklearn_pipeline():
+        features_scaled = scaler.transform(np.array([[size, p53_concentration]]))
+        model.predict(features_scaled)
+        model.predict_proba(features_scaled)
+
+    sklearn_us = time_per_call(sklearn_pipeline)
+    numpy_us = time_per_call(lambda: compiled.predict_with_proba([[size, p53_concentration]]))
+    scalar_us = time_per_call(lambda: compiled.predict_one(size, p53_concentration))
+
+    print("⏱️ Latence médiane d'une prédiction (une ligne)")
+    print(f"  sklearn (transform + predict + predict_proba) : {sklearn_us:8.1f} µs")
+    print(f"  Noyau compilé NumPy (predict_with_proba)      : {numpy_us:8.1f} µs")
+    print(f"  Noyau compilé scalaire (predict_one)          : {scalar_us:8.1f} µs")
+    print(f"  ⚡ Accélération scalaire : x{sklearn_us / scalar_us:.0f}")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,237 @@
+"""
+Cache des jeux de données d'entraînement au format colonnes binaire
+
+Au premier accès, un CSV est converti (par morceaux) en un fichier .npy par
+colonne, dans un dossier identifié par l'empreinte SHA-256 du CSV :
+
+    .dataset_cache/
+      index.json                           chemin + taille + mtime -> empreinte
+      tumor_two_vars-1a2b3c4d5e6f7a8b-v2/
+        meta.json  size.npy  p53_concentration.npy  is_cancerous.npy
+        split-<paramètres>.npz             indices train/test déjà calculés
+
+Les accès suivants ouvrent les colonnes avec mmap (aucun parsing, lecture à
+la demande) et relisent les indices du découpage train/test au lieu de
+refaire train_test_split. Un CSV modifié change d'empreinte : il est
+reconverti dans un nouveau dossier. L'index évite de re-hacher un fichier
+dont la taille et la date de modification n'ont pas changé.
+
+    from dataset_cache import open_dataset, train_test_frames
+    X_train, X_test, y_train, y_test = train_test_frames('tumor_two_vars.csv',
+                                                         ['size', 'p53_concentration'], 'is_cancerous')
+"""
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from model_registry import file_digest
+
+CACHE_DIR = os.environ.get("DATASET_CACHE_DIR", ".dataset_cache")
+INDEX = "index.json"
+META = "meta.json"
+CONVERT_CHUNKSIZE = 1_000_000
+FORMAT_VERSION = 2  # À incrémenter quand le contenu d'un dossier converti change
+
+class Dataset:
+    """Colonnes d'un CSV converti, projetées en mémoire (lecture seule)"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, META), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.columns = self.meta["columns"]
+        self.text_columns = set(self.meta["text_columns"])
+        self.n_rows = self.meta["n_rows"]
+        self._arrays = {}
+
+    def __len__(self):
+        return self.n_rows
+
+    def __getitem__(self, column):
+        """Une colonne (tableau NumPy en mmap)"""
+        if column not in self._arrays:
+            if column not in self.columns:
+                raise KeyError(f"Colonne inconnue: {column} (disponibles: {', '.join(self.columns)})")
+            self._arrays[column] = np.load(os.path.join(self.directory, f"{column}.npy"), mmap_mode="r")
+        return self._arrays[column]
+
+    def to_frame(self, columns=None):
+        """DataFrame pandas des colonnes demandées (copie en mémoire)"""
+        columns = self.columns if columns is None else columns
+        return pd.DataFrame({column: self._values(column) for column in columns})
+
+    def _values(self, column):
+        values = np.asarray(self[column])
+        if column in self.text_columns:
+            values = np.where(values == '', np.nan, values.astype(object))  # Valeurs manquantes comme read_csv
+        return values
+
+    def split(self, test_size=0.2, random_state=42, stratify=None):
+        """
+        Indices (train, test) identiques à ceux de train_test_split, calculés une seule fois
+
+        Args:
+            test_size (float): Part du jeu de test
+            random_state (int): Graine du découpage
+            stratify (str): Colonne utilisée pour stratifier (optionnel)
+
+        Returns:
+            tuple: (indices train, indices test), dans l'ordre que renverrait train_test_split
+        """
+        path = os.path.join(self.directory, f"split-{test_size}-{random_state}-{stratify or 'none'}.npz")
+        if os.path.exists(path):
+            with np.load(path, allow_pickle=False) as split:
+                return split["train"], split["test"]
+
+        from sklearn.model_selection import train_test_split
+        labels = np.asarray(self[stratify]) if stratify else None
+        train, test = train_test_split(np.arange(self.n_rows), test_size=test_size,
+                                       random_state=random_state, stratify=labels)
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, train=train, test=test)
+        os.replace(tmp_path, path)
+        return train, test
+
+def _promote(a, b):
+    if a != b and np.dtype(bool) in (a, b):
+        return np.dtype(object)  # True/False relu comme un nombre : impossible
+    return np.result_type(a, b)
+
+def _scan_dtypes(csv_path, chunksize):
+    """
+    Premier passage : type final de chaque colonne sur tout le fichier
+
+    Un type numérique est promu d'un morceau à l'autre (entiers puis valeurs
+    manquantes -> float64) ; une colonne texte dans un seul morceau est texte partout.
+    """
+    columns = list(pd.read_csv(csv_path, nrows=0).columns)
+    dtypes = dict.fromkeys(columns, None)
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+        for column in columns:
+            dtype = chunk[column].dtype
+            dtype = dtype if isinstance(dtype, np.dtype) else np.dtype(object)  # Ex: StringDtype de pandas
+            dtypes[column] = dtype if dtypes[column] is None else _promote(dtypes[column], dtype)
+    # Fichier sans aucune ligne : colonnes texte, comme pd.read_csv
+    return {column: np.dtype(object) if dtype is None else dtype for column, dtype in dtypes.items()}
+
+def _convert(csv_path, directory, chunksize):
+    """
+    CSV -> un .npy par colonne, en deux passages par morceaux (seules les colonnes texte sont gardées en mémoire)
+
+    Returns:
+        tuple: (colonnes, colonnes texte, nombre de lignes)
+    """
+    dtypes = _scan_dtypes(csv_path, chunksize)
+    columns = list(dtypes)
+    text_columns = [column for column in columns if dtypes[column] == object]
+    raw_files, texts = {}, {column: [] for column in text_columns}
+    n_rows = 0
+    try:
+        for column in columns:
+            if column not in texts:
+                raw_files[column] = open(os.path.join(directory, f"{column}.raw"), 'w+b')
+        # Types imposés à la lecture : chaque morceau arrive directement dans le type final
+        for chunk in pd.read_csv(csv_path, chunksize=chunksize, dtype=dtypes):
+            for column, f in raw_files.items():
+                f.write(np.ascontiguousarray(chunk[column].to_numpy(), dtype=dtypes[column]).tobytes())
+            for column, parts in texts.items():
+                values = chunk[column].to_numpy(dtype=object)
+                # Chaîne vide pour une valeur manquante (read_csv ne produit jamais de chaîne vide)
+                parts.append(np.where(pd.isna(values), '', values).astype(str))
+            n_rows += len(chunk)
+
+        for column, f in raw_files.items():
+            with open(os.path.join(directory, f"{column}.npy"), 'wb') as out:
+                np.lib.format.write_array_header_1_0(
+                    out, {"descr": np.lib.format.dtype_to_descr(dtypes[column]), "fortran_order": False,
+                          "shape": (n_rows,)})
+                f.seek(0)
+                shutil.copyfileobj(f, out, 1 << 20)
+        for column, parts in texts.items():
+            values = np.concatenate(parts) if parts else np.array([], dtype=str)
+            np.save(os.path.join(directory, f"{column}.npy"), values)  # Unicode fixe, sans pickle
+    finally:
+        for column, f in raw_files.items():
+            f.close()
+            os.remove(os.path.join(directory, f"{column}.raw"))
+    return columns, text_columns, n_rows
+
+class DatasetCache:
+    """Conversion et ouverture des CSV en cache (un dossier par empreinte de fichier)"""
+
+    def __init__(self, root=CACHE_DIR):
+        self.root = root
+
+    def _read_index(self):
+        try:
+            with open(os.path.join(self.root, INDEX), encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write_index(self, index):
+        tmp_path = os.path.join(self.root, f"{INDEX}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_path, os.path.join(self.root, INDEX))
+
+    def digest(self, csv_path):
+        """Empreinte du CSV, re-calculée seulement si sa taille ou sa date de modification a changé"""
+        stat = os.stat(csv_path)
+        signature = [stat.st_size, stat.st_mtime_ns]
+        key = os.path.abspath(csv_path)
+        index = self._read_index()
+        entry = index.get(key)
+        if entry is not None and entry["signature"] == signature:
+            return entry["digest"]
+        digest = file_digest(csv_path, length=16)
+        os.makedirs(self.root, exist_ok=True)
+        index[key] = {"signature": signature, "digest": digest}
+        self._write_index(index)
+        return digest
+
+    def open(self, csv_path, chunksize=CONVERT_CHUNKSIZE):
+        """Ouvre le CSV depuis le cache, en le convertissant au premier accès"""
+        digest = self.digest(csv_path)
+        stem = os.path.splitext(os.path.basename(csv_path))[0]
+        directory = os.path.join(self.root, f"{stem}-{digest}-v{FORMAT_VERSION}")
+        if os.path.exists(os.path.join(directory, META)):
+            return Dataset(directory)
+
+        # Conversion dans un dossier temporaire puis renommage atomique (comme le registre de modèles)
+        os.makedirs(self.root, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=".staging-", dir=self.root)
+        try:
+            os.chmod(staging, 0o755)
+            columns, text_columns, n_rows = _convert(csv_path, staging, chunksize)
+            with open(os.path.join(staging, META), 'w', encoding='utf-8') as f:
+                json.dump({"source": os.path.abspath(csv_path), "sha256": digest, "columns": columns,
+                           "text_columns": text_columns, "n_rows": n_rows}, f, indent=2)
+            try:
+                os.rename(staging, directory)
+            except OSError:
+                if not os.path.exists(os.path.join(directory, META)):  # Sinon : converti en parallèle par un autre
+                    raise
+        finally:
+            if os.path.exists(staging):
+                shutil.rmtree(staging)
+        return Dataset(directory)
+
+def open_dataset(csv_path, root=None):
+    """Dataset en cache pour ce CSV (DATASET_CACHE_DIR par défaut)"""
+    return DatasetCache(root or CACHE_DIR).open(csv_path)
+
+def train_test_frames(csv_path, features, target, test_size=0.2, random_state=42, stratify=True, root=None):
+    """
+    Équivalent de train_test_split(X, y, stratify=y) sur un CSV, sans parsing ni redécoupage
+
+    Returns:
+        tuple: (X_train, X_test, y_train, y_test), mêmes lignes et même ordre que train_test_split
+    """
+    dataset = open_dataset(csv_path, root)
+    train, test = dataset.split(test_size, random_state, target if stratify else None)
+    df = dataset.to_frame(list(features) + [target])
+    X, y = df[list(features)], df[target]
+    return X.iloc[train], X.iloc[test], y.iloc[train], y.iloc[test]
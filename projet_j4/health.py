@@ -0,0 +1,84 @@
+import os
+import threading
+import time
+
+class HealthMonitor:
+    """
+    Exécute un test de santé (prédiction canari) en arrière-plan et met le résultat en cache
+
+    Les sondes de l'orchestrateur lisent uniquement le cache : aucune
+    inférence n'est faite pendant une requête /health. Le thread de fond est
+    démarré au premier appel dans chaque processus, ce qui fonctionne aussi
+    après un fork (serveur pre-fork, workers uvicorn).
+    """
+
+    def __init__(self, check_fn, interval=5.0, ttl=15.0):
+        """
+        Args:
+            check_fn (callable): Test de santé, renvoie un dict de détails ou lève une exception
+            interval (float): Secondes entre deux tests
+            ttl (float): Âge maximal (secondes) d'un résultat pour rester "ready"
+        """
+        self.check_fn = check_fn
+        self.interval = interval
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._pid = None
+        self._result = None  # (ok, détails ou message d'erreur, horodatage)
+        self._failures = {}  # raison -> message, posées par d'autres composants (ex: rechargement du modèle)
+
+    def _ensure_started(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._run_check()  # Premier résultat disponible immédiatement
+            threading.Thread(target=self._loop, name="health-monitor", daemon=True).start()
+
+    def _loop(self):
+        pid = os.getpid()
+        while self._pid == pid:
+            time.sleep(self.interval)
+            self._run_check()
+
+    def _run_check(self):
+        try:
+            self._result = (True, self.check_fn(), time.time())
+        except Exception as e:
+            self._result = (False, str(e), time.time())
+
+    def mark_unready(self, reason, message):
+        """Force l'état "not ready" tant que clear(reason) n'est pas appelé"""
+        self._failures[reason] = message
+
+    def clear(self, reason):
+        self._failures.pop(reason, None)
+
+    def last_check(self):
+        """Renvoie (ok, détails, âge en secondes) du dernier test canari"""
+        self._ensure_started()
+        ok, details, checked_at = self._result
+        return ok, details, time.time() - checked_at
+
+    def liveness(self):
+        """Le processus répond : toujours vrai si on arrive ici"""
+        return {"status": "alive", "pid": os.getpid()}
+
+    def readiness(self):
+        """Renvoie (prêt, payload) d'après le cache et les échecs signalés"""
+        ok, details, age = self.last_check()
+        reasons = dict(self._failures)
+        if not ok:
+            reasons["canary"] = details
+        elif age > self.ttl:
+            reasons["canary"] = f"Dernier test de santé trop ancien ({age:.1f} s)"
+
+        payload = {
+            "status": "ready" if not reasons else "not_ready",
+            "last_check_age_s": round(age, 3),
+        }
+        if reasons:
+            payload["reasons"] = reasons
+        return not reasons, payload
@@ -0,0 +1,94 @@
+"""
+Moteurs de prix de l'API maisons : règles codées en dur (predict.py) ou modèle entraîné
+
+Le modèle entraîné (LinearRegression de train_model.py) est réduit à son
+vecteur de coefficients au chargement : une prédiction devient un simple
+produit scalaire, sans validation sklearn ni construction de DataFrame.
+
+Le moteur par défaut est choisi par HOUSE_ENGINE ("model" ou "rules").
+"""
+import os
+import numpy as np
+import predict as rules
+
+# Colonnes d'entraînement (houses.csv) -> paramètres de l'API
+FEATURE_ALIASES = {"size": "taille", "nb_rooms": "nb_chambres", "garden": "jardin"}
+API_FEATURES = ("taille", "nb_chambres", "jardin")
+
+class RulesEngine:
+    """Règles de prix codées en dur de predict.py"""
+
+    name = "rules"
+    version = "rules"
+
+    def predict_one(self, taille, nb_chambres, jardin):
+        return rules.predict(taille, nb_chambres, jardin)
+
+    def predict_columns(self, taille, nb_chambres, jardin):
+        return rules.predict_columns(taille, nb_chambres, jardin)
+
+class LinearPriceModel:
+    """Régression linéaire réduite à ses coefficients, dans l'ordre des paramètres de l'API"""
+
+    name = "model"
+
+    def __init__(self, coef, intercept, version=None):
+        self.coef = np.asarray(coef, dtype=np.float64).ravel()
+        self.intercept = float(intercept)
+        if len(self.coef) != len(API_FEATURES):
+            raise ValueError(f"{len(API_FEATURES)} coefficients attendus, {len(self.coef)} reçus")
+        self.version = version
+        # Copies en floats Python pour le chemin une-maison (plus rapide que NumPy sur 3 valeurs)
+        self._coef = [float(c) for c in self.coef]
+
+    @classmethod
+    def from_sklearn(cls, model, version=None):
+        """
+        Construit le moteur à partir d'une LinearRegression entraînée
+
+        Les coefficients sont réordonnés d'après feature_names_in_ quand le
+        modèle a été entraîné sur un DataFrame (size, nb_rooms, garden).
+        """
+        coef = np.asarray(model.coef_, dtype=np.float64).ravel()
+        names = getattr(model, "feature_names_in_", None)
+        if names is not None:
+            position = {FEATURE_ALIASES.get(str(name), str(name)): i for i, name in enumerate(names)}
+            missing = [feature for feature in API_FEATURES if feature not in position]
+            if missing:
+                raise ValueError(f"Features absentes du modèle: {', '.join(missing)}")
+            coef = coef[[position[feature] for feature in API_FEATURES]]
+        return cls(coef, np.ravel(model.intercept_)[0], version)
+
+    def predict_one(self, taille, nb_chambres, jardin):
+        """Prix d'une maison, arrondi au centime comme predict()"""
+        w_taille, w_chambres, w_jardin = self._coef
+        prix = self.intercept + w_taille * taille + w_chambres * nb_chambres
+        if jardin:
+            prix += w_jardin
+        return round(prix, 2)
+
+    def predict_columns(self, taille, nb_chambres, jardin):
+        """Prix de toutes les maisons en un seul produit vectorisé"""
+        w_taille, w_chambres, w_jardin = self.coef
+        prix = self.intercept + w_taille * np.asarray(taille, dtype=np.float64) \
+            + w_chambres * np.asarray(nb_chambres, dtype=np.float64)
+        prix += np.where(np.asarray(jardin, dtype=bool), w_jardin, 0.0)
+        return np.round(prix, 2)
+
+def load_linear_model(version="latest", fallback_path="regression.joblib"):
+    """Charge la régression (registre ou regression.joblib) et la réduit à ses coefficients"""
+    import joblib
+    from model_registry import file_digest, resolve_artifacts
+
+    paths, from_registry = resolve_artifacts("regression", version, fallback={"model": fallback_path})
+    model = joblib.load(paths["model"], mmap_mode="r" if from_registry else None)
+    return LinearPriceModel.from_sklearn(model, version=file_digest(paths["model"]))
+
+def load_engines(version=None):
+    """Tous les moteurs disponibles ; le modèle n'est présent que si son fichier est chargeable"""
+    engines = {"rules": RulesEngine()}
+    try:
+        engines["model"] = load_linear_model(version or os.environ.get("REGRESSION_MODEL_VERSION", "latest"))
+    except (OSError, LookupError, ValueError) as e:
+        print(f"⚠️ Modèle de régression indisponible, seules les règles sont servies: {e}")
+    return engines
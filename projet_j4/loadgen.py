@@ -0,0 +1,302 @@
+"""
+Générateur de charge asyncio pour les APIs de projet_j4 (maisons et tumeurs)
+
+Remplace les scripts séquentiels (send_request.py, test_tumor_api.py,
+test_fixed_api.py), qui ouvrent une connexion par requête et ne mesurent rien :
+
+  - pool de connexions HTTP/1.1 keep-alive (client minimal sur asyncio, sans dépendance)
+  - boucle fermée : N clients envoient une requête dès que la précédente a répondu
+  - boucle ouverte : arrivées de Poisson à un débit fixé ; la latence est mesurée
+    depuis l'heure d'arrivée prévue (l'attente d'une connexion libre compte,
+    pas d'omission coordonnée)
+  - mélange de tailles de lot : 1 -> /predict, n > 1 -> /predict_batch
+  - rapport JSON : débit, codes HTTP, erreurs, latences p50/p95/p99/p999
+    globales et par taille de lot ; --output ajoute le rapport à un fichier
+    JSON Lines pour comparer les exécutions dans le temps
+
+Exemples :
+    python loadgen.py --api tumor --url http://127.0.0.1:5002 --concurrency 32 --duration 20
+    python loadgen.py --api house --url http://127.0.0.1:5000 --mode open --rate 500 --batch-mix 1:0.9,100:0.1
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from urllib.parse import urlsplit
+import numpy as np
+
+PERCENTILES = {"p50": 50, "p95": 95, "p99": 99, "p999": 99.9}
+
+class HttpError(Exception):
+    """Réponse HTTP illisible ou connexion fermée par le serveur"""
+
+class Connection:
+    """Une connexion HTTP/1.1 keep-alive (une requête à la fois)"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+        self.opened = 0
+
+    async def request(self, method, path, body=b"", headers=None):
+        """Envoie une requête et lit toute la réponse ; renvoie (status, corps)"""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+            self.opened += 1
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}",
+                 f"Content-Length: {len(body)}"]
+        lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + body)
+        try:
+            return await self._read_response()
+        except (HttpError, ConnectionError, asyncio.IncompleteReadError, ValueError):
+            self.close()  # Réponse lue à moitié : la connexion n'est plus réutilisable
+            raise
+
+    async def _read_response(self):
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise HttpError("Connexion fermée par le serveur")
+        parts = status_line.split(None, 2)
+        if len(parts) < 2 or not parts[0].startswith(b"HTTP/"):
+            raise HttpError(f"Ligne de statut invalide: {status_line[:80]!r}")
+        status = int(parts[1])
+
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode('latin-1').partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            body = bytearray()
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await self.reader.readline()  # Ligne vide finale (pas de trailers)
+                    break
+                body += await self.reader.readexactly(size)
+                await self.reader.readexactly(2)
+            body = bytes(body)
+        elif "content-length" in headers:
+            body = await self.reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await self.reader.read()  # Corps délimité par la fermeture
+            self.close()
+
+        if headers.get("connection", "").lower() == "close" or parts[0] == b"HTTP/1.0":
+            self.close()
+        return status, body
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+class ConnectionPool:
+    """Pool borné de connexions réutilisées ; un appelant attend qu'une connexion se libère"""
+
+    def __init__(self, host, port, size):
+        self.connections = [Connection(host, port) for _ in range(size)]
+        self._free = asyncio.Queue()
+        for connection in self.connections:
+            self._free.put_nowait(connection)
+
+    async def request(self, method, path, body=b"", headers=None):
+        connection = await self._free.get()
+        try:
+            return await connection.request(method, path, body, headers)
+        finally:
+            self._free.put_nowait(connection)
+
+    @property
+    def connects(self):
+        return sum(connection.opened for connection in self.connections)
+
+    def close(self):
+        for connection in self.connections:
+            connection.close()
+
+def parse_batch_mix(text):
+    """"1:0.8,100:0.2" -> ([1, 100], [0.8, 0.2]) (poids normalisés)"""
+    sizes, weights = [], []
+    for item in text.split(","):
+        size, _, weight = item.partition(":")
+        sizes.append(int(size))
+        weights.append(float(weight or 1))
+    total = sum(weights)
+    return sizes, [weight / total for weight in weights]
+
+def build_payloads(api, sizes, seed=42):
+    """
+    Requêtes pré-encodées par taille de lot (données figées par la graine)
+
+    Returns:
+        dict: taille -> (chemin, corps JSON en bytes)
+    """
+    rng = np.random.default_rng(seed)
+    payloads = {}
+    for n in sizes:
+        if api == "tumor":
+            rows = [{"size": round(float(size), 6), "p53_concentration": round(float(p53), 6)}
+                    for size, p53 in zip(rng.uniform(0.005, 0.05, n), rng.uniform(0.0005, 0.01, n))]
+            body = rows[0] if n == 1 else {"tumors": rows}
+        else:
+            rows = [{"taille": round(float(taille), 1), "nb_chambres": int(chambres), "jardin": bool(jardin)}
+                    for taille, chambres, jardin in zip(rng.uniform(20, 300, n), rng.integers(1, 8, n),
+                                                        rng.random(n) < 0.5)]
+            body = rows[0] if n == 1 else {"houses": rows}
+        payloads[n] = ("/predict" if n == 1 else "/predict_batch", json.dumps(body).encode('utf-8'))
+    return payloads
+
+class Recorder:
+    """Latences et résultats, hors période de chauffe"""
+
+    def __init__(self):
+        self.latencies = {}
+        self.statuses = {}
+        self.errors = {}
+        self.rows = 0
+        self.recording = False
+
+    def record(self, batch_size, latency, status=None, error=None):
+        if not self.recording:
+            return
+        if error is not None:
+            self.errors[error] = self.errors.get(error, 0) + 1
+            return
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        self.latencies.setdefault(batch_size, []).append(latency)
+        if 200 <= status < 300:
+            self.rows += batch_size
+
+async def send(pool, payloads, batch_size, recorder, started_at):
+    path, body = payloads[batch_size]
+    try:
+        status, _ = await pool.request("POST", path, body, {"Content-Type": "application/json"})
+    except (OSError, HttpError, asyncio.IncompleteReadError, ValueError) as e:  # ValueError : statut ou taille illisible
+        recorder.record(batch_size, None, error=type(e).__name__)
+        return
+    recorder.record(batch_size, time.perf_counter() - started_at, status)
+
+async def closed_loop(pool, payloads, sizes, weights, recorder, concurrency, deadline, rng):
+    """N clients : chacun renvoie une requête dès la réponse précédente"""
+    async def client():
+        while time.perf_counter() < deadline:
+            batch_size = rng.choices(sizes, weights)[0]
+            await send(pool, payloads, batch_size, recorder, time.perf_counter())
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+
+async def open_loop(pool, payloads, sizes, weights, recorder, rate, deadline, rng):
+    """Arrivées de Poisson à `rate` req/s, indépendantes des réponses (la file d'attente se voit dans la latence)"""
+    tasks = set()
+    next_arrival = time.perf_counter()
+    while next_arrival < deadline:
+        delay = next_arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        task = asyncio.create_task(send(pool, payloads, rng.choices(sizes, weights)[0], recorder, next_arrival))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        next_arrival += rng.expovariate(rate)
+    if tasks:
+        await asyncio.gather(*tasks)
+
+def summarize(latencies):
+    values = np.asarray(latencies) * 1000
+    summary = {"count": len(values)}
+    if len(values):
+        summary.update({name: round(float(np.percentile(values, q)), 3) for name, q in PERCENTILES.items()})
+        summary.update({"mean": round(float(values.mean()), 3), "max": round(float(values.max()), 3)})
+    return summary
+
+async def run(url, api="tumor", mode="closed", concurrency=16, rate=100.0, duration=10.0, warmup=2.0,
+              batch_mix="1:1", seed=42):
+    """
+    Lance un test de charge et renvoie le rapport (dict sérialisable en JSON)
+
+    Args:
+        url (str): Adresse de l'API (ex: http://127.0.0.1:5002)
+        api (str): "tumor" ou "house" (format des requêtes)
+        mode (str): "closed" (concurrence fixe) ou "open" (débit d'arrivée fixe)
+        concurrency (int): Taille du pool de connexions (= nombre de clients en boucle fermée)
+        rate (float): Requêtes par seconde en boucle ouverte
+        duration (float): Durée mesurée (secondes), après la chauffe
+        warmup (float): Chauffe non mesurée (secondes)
+        batch_mix (str): Tailles de lot et poids, ex: "1:0.9,100:0.1"
+        seed (int): Graine des données et du tirage des tailles
+    """
+    target = urlsplit(url)
+    sizes, weights = parse_batch_mix(batch_mix)
+    payloads = build_payloads(api, sizes, seed)
+    pool = ConnectionPool(target.hostname, target.port or 80, concurrency)
+    recorder = Recorder()
+    rng = random.Random(seed)
+
+    async def start_recording():
+        await asyncio.sleep(warmup)
+        recorder.recording = True
+        return time.perf_counter()
+
+    start = time.perf_counter()
+    deadline = start + warmup + duration
+    recording_task = asyncio.create_task(start_recording())
+    try:
+        if mode == "closed":
+            await closed_loop(pool, payloads, sizes, weights, recorder, concurrency, deadline, rng)
+        else:
+            await open_loop(pool, payloads, sizes, weights, recorder, rate, deadline, rng)
+    finally:
+        pool.close()
+    measured_from = await recording_task
+    elapsed = max(time.perf_counter() - measured_from, 1e-9)
+
+    all_latencies = [latency for values in recorder.latencies.values() for latency in values]
+    requests_done = len(all_latencies) + sum(recorder.errors.values())
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "config": {"url": url, "api": api, "mode": mode, "concurrency": concurrency,
+                   "rate": rate if mode == "open" else None, "duration_s": duration, "warmup_s": warmup,
+                   "batch_mix": dict(zip(sizes, weights)), "seed": seed},
+        "requests": requests_done,
+        "throughput_rps": round(len(all_latencies) / elapsed, 2),
+        "rows_per_s": round(recorder.rows / elapsed, 2),
+        "statuses": {str(status): count for status, count in sorted(recorder.statuses.items())},
+        "errors": recorder.errors,
+        "connections_opened": pool.connects,
+        "latency_ms": summarize(all_latencies),
+        "latency_ms_by_batch_size": {str(size): summarize(values)
+                                     for size, values in sorted(recorder.latencies.items())},
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge des APIs de prédiction")
+    parser.add_argument("--url", default="http://127.0.0.1:5002")
+    parser.add_argument("--api", choices=["tumor", "house"], default="tumor")
+    parser.add_argument("--mode", choices=["closed", "open"], default="closed",
+                        help="closed : concurrence fixe ; open : arrivées de Poisson à --rate req/s")
+    parser.add_argument("--concurrency", type=int, default=16, help="Connexions du pool")
+    parser.add_argument("--rate", type=float, default=100.0, help="Requêtes/s en boucle ouverte")
+    parser.add_argument("--duration", type=float, default=10.0, help="Durée mesurée (s)")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Chauffe non mesurée (s)")
+    parser.add_argument("--batch-mix", default="1:1", help="Tailles de lot:poids, ex: 1:0.9,100:0.1")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Fichier JSON Lines auquel ajouter le rapport")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.url, args.api, args.mode, args.concurrency, args.rate, args.duration,
+                             args.warmup, args.batch_mix, args.seed))
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(report) + "\n")
+        print(f"📝 Rapport ajouté à {args.output}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
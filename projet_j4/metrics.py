@@ -0,0 +1,273 @@
+"""
+Métriques au format texte Prometheus (compteurs et histogrammes), sans dépendance
+
+L'enregistrement doit rester assez bon marché pour être toujours actif : chaque
+thread écrit dans sa propre tranche (pas de verrou sur le chemin chaud) et
+l'export /metrics additionne les tranches. Les tranches des threads terminés
+(werkzeug crée un thread par requête) sont repliées dans un total commun pour
+que la mémoire reste bornée.
+
+Les métriques sont propres au processus : avec le serveur pre-fork ou
+plusieurs workers uvicorn, chaque worker expose les siennes.
+
+Exemple :
+    metrics = ApiMetrics("house_api").instrument_flask(app)  # ajoute /metrics
+    with metrics.stage("/predict", "predict"):
+        ...
+"""
+import bisect
+import contextvars
+import threading
+import time
+
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000,
+                      10_000, 20_000, 50_000, 100_000, 1_000_000)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+class _Metric:
+    """Base commune : une tranche de valeurs par thread, repliée à l'export"""
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._lock = threading.Lock()  # Uniquement pour la liste des tranches, jamais à l'enregistrement
+        self._shards = []  # (thread, dict labels -> valeur)
+        self._retired = {}  # Valeurs des threads terminés
+
+    def _shard(self):
+        """Tranche du thread courant (créée au premier enregistrement du thread)"""
+        try:
+            return self._local.values
+        except AttributeError:
+            values = self._local.values = {}
+            with self._lock:
+                if len(self._shards) >= 32:
+                    self._retire_dead_shards()
+                self._shards.append((threading.current_thread(), values))
+            return values
+
+    def _retire_dead_shards(self):
+        alive = []
+        for thread, values in self._shards:
+            if thread.is_alive():
+                alive.append((thread, values))
+            else:
+                for labels, value in values.items():
+                    self._merge(self._retired, labels, value)
+        self._shards = alive
+
+    def collect(self):
+        """Additionne toutes les tranches : dict labels -> valeur"""
+        with self._lock:
+            self._retire_dead_shards()
+            total = {}
+            for labels, value in self._retired.items():
+                self._merge(total, labels, value)
+            for _, values in self._shards:
+                for labels, value in list(values.items()):
+                    self._merge(total, labels, value)
+        return total
+
+    def _labels_text(self, labels, extra=()):
+        pairs = list(zip(self.labelnames, labels)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        values = self._shard()
+        values[labels] = values.get(labels, 0) + amount
+
+    @staticmethod
+    def _merge(total, labels, value):
+        total[labels] = total.get(labels, 0) + value
+
+    def render(self):
+        return [f"{self.name}{self._labels_text(labels)} {_number(value)}"
+                for labels, value in sorted(self.collect().items())]
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *labels):
+        values = self._shard()
+        state = values.get(labels)
+        if state is None:
+            # Comptes par tranche (non cumulés) + un pour +Inf, puis la somme
+            state = values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        state[bisect.bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    def time(self, *labels):
+        """Context manager qui observe la durée du bloc (en secondes)"""
+        return _Timer(self, labels)
+
+    @staticmethod
+    def _merge(total, labels, value):
+        current = total.get(labels)
+        if current is None:
+            total[labels] = list(value)
+        else:
+            for i, v in enumerate(value):
+                current[i] += v
+
+    def render(self):
+        lines = []
+        for labels, state in sorted(self.collect().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), state[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                lines.append(f"{self.name}_bucket{self._labels_text(labels, [('le', le)])} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels_text(labels)} {_number(state[-1])}")
+            lines.append(f"{self.name}_count{self._labels_text(labels)} {cumulative}")
+        return lines
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+        return False
+
+class MetricsRegistry:
+    """Ensemble des métriques d'une application, toutes préfixées par son nom"""
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self._metrics = []
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(f"{self.prefix}_{name}", documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(f"{self.prefix}_{name}", documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Export au format texte Prometheus (version 0.0.4)"""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+class ApiMetrics:
+    """
+    Métriques standard d'une API : requêtes, latence totale, étapes, tailles de lot, erreurs
+
+    Indépendant du framework : instrument_flask() (ou un middleware ASGI)
+    mesure chaque requête, les handlers chronomètrent leurs étapes avec
+    stage() et comptent leurs erreurs avec error().
+
+    L'état d'une requête (erreur déjà typée ou non) vit dans une ContextVar
+    ouverte par start_request() : propre à chaque requête, y compris quand
+    plusieurs requêtes ASGI partagent un thread ou qu'un handler s'exécute
+    dans un pool (à condition d'y copier le contexte).
+    """
+
+    def __init__(self, prefix):
+        self.registry = MetricsRegistry(prefix)
+        self.requests = self.registry.counter(
+            "requests_total", "Requêtes traitées", ["endpoint", "method", "status"])
+        self.request_seconds = self.registry.histogram(
+            "request_seconds", "Durée totale des requêtes", ["endpoint"])
+        self.stage_seconds = self.registry.histogram(
+            "stage_seconds", "Durée de chaque étape du traitement", ["endpoint", "stage"])
+        self.batch_size = self.registry.histogram(
+            "batch_size", "Nombre de lignes par requête de lot", ["endpoint"], BATCH_SIZE_BUCKETS)
+        self.errors = self.registry.counter(
+            "errors_total", "Erreurs par type (exception ou code HTTP)", ["endpoint", "type"])
+        self._request = contextvars.ContextVar(f"{prefix}_request", default=None)
+
+    def start_request(self):
+        """Ouvre l'état de la requête courante, à appeler avant le handler"""
+        self._request.set({"error_recorded": False})
+
+    def stage(self, endpoint, stage):
+        """Chronomètre une étape (ex: json_parse, transform, predict_proba, jsonify)"""
+        return self.stage_seconds.time(endpoint, stage)
+
+    def observe_batch(self, endpoint, n_rows):
+        self.batch_size.observe(n_rows, endpoint)
+
+    def error(self, endpoint, exc_or_type):
+        """Compte une erreur par type d'exception (ou par le type donné en texte)"""
+        error_type = exc_or_type if isinstance(exc_or_type, str) else type(exc_or_type).__name__
+        self.errors.inc(endpoint, error_type)
+        state = self._request.get()
+        if state is None:
+            self._request.set({"error_recorded": True})
+        else:
+            state["error_recorded"] = True  # Objet partagé : visible depuis un contexte copié
+
+    def observe_request(self, endpoint, method, status, seconds):
+        """Enregistre une requête terminée ; une réponse d'erreur sans type connu compte comme http_<code>"""
+        self.request_seconds.observe(seconds, endpoint)
+        self.requests.inc(endpoint, method, str(status))
+        state = self._request.get()
+        self._request.set(None)
+        recorded = state is not None and state["error_recorded"]
+        if status >= 400 and not recorded:
+            self.errors.inc(endpoint, f"http_{status}")
+
+    def render(self):
+        return self.registry.render()
+
+    def instrument_flask(self, app):
+        """Mesure toutes les requêtes d'une application Flask et ajoute la route /metrics"""
+        from flask import Response, g, request
+
+        @app.before_request
+        def _start_timer():
+            g.metrics_start = time.perf_counter()
+            self.start_request()
+
+        @app.after_request
+        def _record_request(response):
+            start = g.pop("metrics_start", None)
+            if start is not None and request.endpoint != "metrics":
+                endpoint = request.url_rule.rule if request.url_rule is not None else "unknown"
+                self.observe_request(endpoint, request.method, response.status_code,
+                                     time.perf_counter() - start)
+            return response
+
+        def metrics():
+            return Response(self.render(), content_type=CONTENT_TYPE)
+
+        app.add_url_rule("/metrics", "metrics", metrics, methods=["GET"])
+        return self
+
+def _number(value):
+    if isinstance(value, float):
+        return repr(value) if value == value else "NaN"
+    return str(value)
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
@@ -0,0 +1,215 @@
+import os
+import queue
+import threading
+import time
+import numpy as np
+
+class _PendingPrediction:
+    """Une prédiction en attente : les features d'un appelant et l'emplacement de son résultat"""
+
+    __slots__ = ("features", "predict_fn", "done", "result", "error")
+
+    def __init__(self, features, predict_fn):
+        self.features = features
+        self.predict_fn = predict_fn
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class MicroBatcher:
+    """
+    Agrège les prédictions unitaires concurrentes en petits lots
+
+    Chaque appel à submit() dépose une ligne dans une file. Un thread de fond
+    attend la première ligne, puis regroupe les suivantes jusqu'à atteindre
+    max_batch_size lignes ou max_latency_us microsecondes d'attente. Le lot
+    passe ensuite en une seule fois dans predict_batch_fn et chaque appelant
+    reçoit sa propre ligne de résultat. Un appelant peut imposer sa propre
+    fonction de scoring (ex: le modèle lu au début de sa requête) : les
+    lignes d'un lot sont alors regroupées par fonction.
+
+    Le thread est démarré au premier submit() de chaque processus : un
+    micro-batcher créé à l'import puis hérité par fork (workers pré-forkés)
+    démarre sa propre file et son propre thread dans chaque worker.
+    """
+
+    def __init__(self, predict_batch_fn, max_batch_size=64, max_latency_us=500, timeout=1.0):
+        """
+        Args:
+            predict_batch_fn (callable): Fonction (matrice n x n_features) -> (labels, probabilités)
+            max_batch_size (int): Nombre maximum de lignes par lot
+            max_latency_us (int): Attente maximale (µs) après la première ligne d'un lot
+            timeout (float): Attente maximale (secondes) d'un résultat par défaut dans submit()
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size doit être >= 1")
+        if max_latency_us < 0:
+            raise ValueError("max_latency_us doit être >= 0")
+
+        self.predict_batch_fn = predict_batch_fn
+        self.max_batch_size = int(max_batch_size)
+        self.max_latency = max_latency_us / 1e6
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._drained = False  # File vidée par l'arrêt : plus aucun put() ne serait traité
+        self._thread = None
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._rows = 0
+        self._full_batches = 0
+        self._errors = 0
+        self._fill_histogram = [0] * 10  # Tranches de 10% de remplissage
+
+        self._running = True
+
+    def _ensure_started(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            # Après un fork, la file et le thread du parent n'existent plus pour ce processus
+            self._queue = queue.Queue()
+            self._drained = False
+            self._thread = threading.Thread(target=self._run, args=(self._queue,), name="micro-batcher",
+                                            daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def submit(self, features, timeout=None, predict_fn=None):
+        """
+        Soumet une ligne et attend son résultat
+
+        Args:
+            features (sequence): Valeurs brutes d'une ligne (ex: [size, p53_concentration])
+            timeout (float): Attente maximale en secondes (None = self.timeout)
+            predict_fn (callable): Fonction de scoring de cette ligne (None = predict_batch_fn)
+
+        Returns:
+            tuple: (label, probabilité de la classe positive)
+
+        Raises:
+            TimeoutError: Pas de résultat dans le délai (thread bloqué ou surchargé)
+        """
+        if not self._running:
+            raise RuntimeError("Le micro-batcher est arrêté")
+        self._ensure_started()
+
+        pending = _PendingPrediction(features, predict_fn or self.predict_batch_fn)
+        with self._lock:
+            # Sous le verrou : un close() concurrent a vidé la file ou videra cette ligne
+            if self._drained:
+                raise RuntimeError("Le micro-batcher est arrêté")
+            self._queue.put(pending)
+        if not pending.done.wait(self.timeout if timeout is None else timeout):
+            raise TimeoutError("Pas de résultat du micro-batcher dans le délai imparti")
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _collect_batch(self, jobs):
+        """Attend une première ligne puis regroupe les suivantes jusqu'à la taille ou au délai max"""
+        first = jobs.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.perf_counter() + self.max_latency
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = jobs.get(timeout=remaining) if remaining > 0 else jobs.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._running = False
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self, jobs):
+        while True:
+            batch = self._collect_batch(jobs)
+            if batch is None:
+                break
+            self._process(batch)
+            if not self._running and jobs.empty():
+                break
+        self._fail_remaining(jobs)
+
+    def _fail_remaining(self, jobs):
+        """Débloque les appelants arrivés pendant l'arrêt"""
+        with self._lock:
+            self._drained = True
+            while True:
+                try:
+                    pending = jobs.get_nowait()
+                except queue.Empty:
+                    return
+                if pending is not None:
+                    pending.error = RuntimeError("Le micro-batcher est arrêté")
+                    pending.done.set()
+
+    def _process(self, batch):
+        groups = {}
+        for pending in batch:
+            groups.setdefault(pending.predict_fn, []).append(pending)
+        for predict_fn, group in groups.items():
+            self._process_group(predict_fn, group)
+
+    def _process_group(self, predict_fn, batch):
+        try:
+            features = np.array([pending.features for pending in batch], dtype=np.float64)
+            labels, probabilities = predict_fn(features)
+            for pending, label, probability in zip(batch, labels.tolist(), probabilities.tolist()):
+                pending.result = (label, probability)
+        except Exception as e:
+            for pending in batch:
+                pending.error = e
+            with self._stats_lock:
+                self._errors += 1
+        finally:
+            self._record(len(batch))
+            for pending in batch:
+                pending.done.set()
+
+    def _record(self, batch_size):
+        fill_ratio = batch_size / self.max_batch_size
+        with self._stats_lock:
+            self._batches += 1
+            self._rows += batch_size
+            if batch_size >= self.max_batch_size:
+                self._full_batches += 1
+            self._fill_histogram[min(int(fill_ratio * 10), 9)] += 1
+
+    def stats(self):
+        """Renvoie les métriques de remplissage des lots"""
+        with self._stats_lock:
+            batches = self._batches
+            rows = self._rows
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_latency_us": self.max_latency * 1e6,
+                "batches": batches,
+                "rows": rows,
+                "full_batches": self._full_batches,
+                "errors": self._errors,
+                "mean_batch_size": rows / batches if batches else 0.0,
+                "mean_fill_ratio": rows / (batches * self.max_batch_size) if batches else 0.0,
+                "fill_ratio_histogram": {
+                    f"{i * 10}-{(i + 1) * 10}%": count
+                    for i, count in enumerate(self._fill_histogram)
+                },
+            }
+
+    def close(self, timeout=None):
+        """Arrête le thread de fond après avoir traité les lignes déjà soumises"""
+        running, self._running = self._running, False
+        if self._pid != os.getpid():
+            return  # Aucun thread démarré dans ce processus
+        if running:
+            self._queue.put(None)
+        self._thread.join(timeout)
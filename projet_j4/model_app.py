@@ -1,14 +1,59 @@
+import os
 import streamlit as st
-import joblib
 import numpy as np
+import pandas as pd
+import altair as alt
+from house_engines import load_linear_model
 
 # Charger le modèle
-model = joblib.load("regression.joblib")
+# 📦 Résolu dans le registre (models/regression) s'il y est publié, sinon regression.joblib.
+# cache_resource : chargé une seule fois par processus, pas à chaque rerun Streamlit
+@st.cache_resource
+def get_model(version):
+    return load_linear_model(version)
+
+model = get_model(os.environ.get("REGRESSION_MODEL_VERSION", "latest"))
+
+# 🧠 Prix mémorisé par (version du modèle, taille, nb_chambres, jardin)
+@st.cache_data(max_entries=10000)
+def predict_price(model_version, taille, nb_chambres, jardin):
+    return model.predict_one(taille, nb_chambres, jardin)
+
+# ⚡ Toute la grille taille x chambres en un seul appel vectorisé
+@st.cache_data(max_entries=100)
+def predict_grid(model_version, tailles, chambres, jardin):
+    grid_taille, grid_chambres = np.meshgrid(np.asarray(tailles), np.asarray(chambres))
+    prix = model.predict_columns(grid_taille.ravel(), grid_chambres.ravel(),
+                                 np.full(grid_taille.size, jardin))
+    return pd.DataFrame({"taille": grid_taille.ravel(), "nb_chambres": grid_chambres.ravel(), "prix": prix})
 
 # Titre de l'application
 st.title("🏠 Prédicteur de Prix de Maisons")
 st.write("Cette application prédit le prix d'une maison basé sur ses caractéristiques.")
 
+mode = st.radio("Mode", ["Une maison", "Grille what-if"], horizontal=True)
+
+if mode == "Grille what-if":
+    st.header("Grille what-if : taille x nombre de chambres")
+    taille_min, taille_max = st.slider("Taille (m²)", 0, 500, (20, 300), step=10)
+    pas_taille = st.number_input("Pas de taille (m²)", min_value=1, max_value=100, value=10, step=1)
+    chambres_min, chambres_max = st.slider("Nombre de chambres", 1, 10, (1, 6))
+    jardin_grille = st.checkbox("Avec jardin", key="jardin_grille")
+
+    tailles = tuple(float(t) for t in np.arange(taille_min, taille_max + 1, pas_taille))
+    chambres = tuple(range(chambres_min, chambres_max + 1))
+    grid = predict_grid(model.version, tailles, chambres, jardin_grille)
+
+    heatmap = alt.Chart(grid).mark_rect().encode(
+        x=alt.X("taille:O", title="Taille (m²)"),
+        y=alt.Y("nb_chambres:O", title="Nombre de chambres", sort="descending"),
+        color=alt.Color("prix:Q", title="Prix (€)", scale=alt.Scale(scheme="viridis")),
+        tooltip=["taille", "nb_chambres", alt.Tooltip("prix:Q", format=",.2f")],
+    )
+    st.altair_chart(heatmap, use_container_width=True)
+    st.caption(f"{len(grid):,} maisons scorées en un seul appel vectorisé")
+    st.stop()
+
 # Créer les champs de formulaire
 st.header("Caractéristiques de la maison")
 
@@ -43,11 +88,8 @@ jardin_valeur = 1 if jardin else 0
 
 # Bouton pour faire la prédiction
 if st.button("🔮 Prédire le prix", type="primary"):
-    # Préparer les données pour la prédiction
-    features = np.array([[taille, nb_chambres, jardin_valeur]])
-    
-    # Faire la prédiction
-    prediction = model.predict(features)[0]
+    # Faire la prédiction (mémorisée : la même maison n'est calculée qu'une fois)
+    prediction = predict_price(model.version, float(taille), int(nb_chambres), jardin_valeur)
     
     # Afficher le résultat
     st.success("Prédiction réalisée avec succès !")
@@ -65,4 +107,5 @@ st.sidebar.write("Ce modèle utilise une régression linéaire pour prédire le
 st.sidebar.write("Les caractéristiques utilisées sont :")
 st.sidebar.write("- Taille (m²)")
 st.sidebar.write("- Nombre de chambres")
-st.sidebar.write("- Présence d'un jardin") 
\ No newline at end of file
+st.sidebar.write("- Présence d'un jardin")
+st.sidebar.write(f"Version du modèle : `{model.version}`") 
\ No newline at end of file
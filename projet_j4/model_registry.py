@@ -0,0 +1,290 @@
+"""
+Registre de modèles versionnés sur disque
+
+Chaque entraînement publie une nouvelle version, jamais modifiée ensuite :
+
+    models/
+      tumor/
+        v1/  model.joblib  scaler.joblib  manifest.json
+        v2/  model.joblib  scaler.joblib  pipeline.bin  manifest.json
+      regression/
+        v1/  model.joblib  manifest.json
+
+Le manifeste décrit la version : features attendues, métriques
+d'entraînement, empreinte SHA-256 de chaque artefact et empreinte globale.
+pipeline.bin est le pipeline fusionné sans pickle (tumor_inference.save_pipeline),
+servi en priorité par l'API tumeurs. La version est publiée
+par un renommage atomique du dossier : un lecteur voit une version complète
+ou rien.
+
+Les artefacts sont écrits sans compression et rechargés avec mmap_mode :
+les grands tableaux NumPy sont projetés en mémoire, lus à la demande et
+partagés entre les processus (workers pre-fork, uvicorn). C'est sûr parce
+qu'une version publiée n'est jamais réécrite ; les fichiers .joblib
+historiques, eux, sont écrasés par l'entraînement et restent chargés sans mmap.
+
+Exemples :
+    python model_registry.py import tumor model=tumor_model.joblib scaler=tumor_scaler.joblib
+    python model_registry.py list
+    python model_registry.py show tumor latest
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import joblib
+
+REGISTRY_DIR = os.environ.get("MODEL_REGISTRY_DIR", "models")
+MANIFEST = "manifest.json"
+
+class ModelNotFound(LookupError):
+    """Modèle ou version absent du registre"""
+
+def file_digest(*paths, length=12):
+    """
+    Empreinte SHA-256 du contenu de un ou plusieurs fichiers, lus par blocs
+
+    Args:
+        length (int): Caractères hexadécimaux gardés (12 pour les versions affichées, None pour tout)
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()[:length]
+
+def _artifact_file(artifact, obj):
+    """Nom de fichier d'un artefact : les bytes (pipeline sans pickle) sont écrits tels quels"""
+    return f"{artifact}.bin" if isinstance(obj, bytes) else f"{artifact}.joblib"
+
+def _load_file(path, mmap_mode=None):
+    """Charge un artefact : objet joblib, ou contenu brut (bytes) pour les autres fichiers"""
+    if path.endswith(".joblib"):
+        return joblib.load(path, mmap_mode=mmap_mode)
+    with open(path, 'rb') as f:
+        return f.read()
+
+class ModelRegistry:
+    """Accès en lecture/écriture à un registre de modèles (un dossier par nom, un sous-dossier par version)"""
+
+    def __init__(self, root=REGISTRY_DIR):
+        self.root = root
+
+    def names(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root) if self.versions(name))
+
+    def versions(self, name):
+        """Versions publiées (manifeste présent), par ordre croissant"""
+        directory = os.path.join(self.root, name)
+        if not os.path.isdir(directory):
+            return []
+        versions = []
+        for entry in os.listdir(directory):
+            if entry.startswith('v') and entry[1:].isdigit() \
+                    and os.path.exists(os.path.join(directory, entry, MANIFEST)):
+                versions.append(int(entry[1:]))
+        return sorted(versions)
+
+    def resolve_version(self, name, version="latest"):
+        """Convertit "latest", 3, "3" ou "v3" en numéro de version publié"""
+        versions = self.versions(name)
+        if not versions:
+            raise ModelNotFound(f"Aucune version du modèle '{name}' dans {self.root}")
+        if version in (None, "latest"):
+            return versions[-1]
+        number = int(str(version).lstrip('v'))
+        if number not in versions:
+            raise ModelNotFound(f"Version {version} du modèle '{name}' introuvable (disponibles: {versions})")
+        return number
+
+    def version_dir(self, name, version="latest"):
+        return os.path.join(self.root, name, f"v{self.resolve_version(name, version)}")
+
+    def manifest(self, name, version="latest"):
+        with open(os.path.join(self.version_dir(name, version), MANIFEST), encoding='utf-8') as f:
+            return json.load(f)
+
+    def artifact_paths(self, name, version="latest"):
+        """Chemins des artefacts d'une version : dict nom d'artefact -> chemin"""
+        directory = self.version_dir(name, version)
+        manifest = self.manifest(name, version)
+        return {artifact: os.path.join(directory, info["file"])
+                for artifact, info in manifest["artifacts"].items()}
+
+    def load(self, name, version="latest", mmap_mode="r", verify=False):
+        """
+        Charge tous les artefacts d'une version
+
+        Args:
+            name (str): Nom du modèle (ex: "tumor", "regression")
+            version: "latest" ou numéro de version
+            mmap_mode (str): Mode de projection mémoire des tableaux NumPy (None pour tout lire)
+            verify (bool): Vérifie l'empreinte SHA-256 de chaque artefact avant de le charger
+
+        Returns:
+            tuple: (dict nom d'artefact -> objet chargé, manifeste)
+        """
+        manifest = self.manifest(name, version)
+        paths = self.artifact_paths(name, version)
+        if verify:
+            for artifact, path in paths.items():
+                if file_digest(path, length=None) != manifest["artifacts"][artifact]["sha256"]:
+                    raise ValueError(f"Empreinte invalide pour l'artefact '{artifact}' de {name} v{manifest['version']}")
+        return {artifact: _load_file(path, mmap_mode) for artifact, path in paths.items()}, manifest
+
+    def register(self, name, artifacts, feature_names=None, metrics=None, params=None):
+        """
+        Publie une nouvelle version à partir d'objets Python (modèle, scaler...)
+
+        Args:
+            name (str): Nom du modèle
+            artifacts (dict): Nom d'artefact -> objet à sauvegarder (l'ordre fixe l'empreinte globale) ;
+                un artefact bytes est écrit tel quel (ex: pipeline fusionné sans pickle)
+            feature_names (list): Features attendues, dans l'ordre
+            metrics (dict): Métriques d'entraînement/test
+            params (dict): Hyperparamètres ou informations libres
+
+        Returns:
+            dict: Manifeste de la version publiée
+        """
+        def write(directory):
+            for artifact, obj in artifacts.items():
+                path = os.path.join(directory, _artifact_file(artifact, obj))
+                if isinstance(obj, bytes):
+                    with open(path, 'wb') as f:
+                        f.write(obj)
+                else:
+                    joblib.dump(obj, path)  # Sans compression : mmap possible
+        files = {artifact: _artifact_file(artifact, obj) for artifact, obj in artifacts.items()}
+        return self._publish(name, write, files, feature_names, metrics, params)
+
+    def import_files(self, name, files, feature_names=None, metrics=None, params=None):
+        """Publie une nouvelle version à partir de fichiers .joblib existants (dict artefact -> chemin)"""
+        names = {artifact: f"{artifact}{os.path.splitext(path)[1] or '.joblib'}" for artifact, path in files.items()}
+
+        def write(directory):
+            for artifact, path in files.items():
+                shutil.copyfile(path, os.path.join(directory, names[artifact]))
+        return self._publish(name, write, names, feature_names, metrics, params)
+
+    def _next_version(self, name):
+        # Tous les dossiers vN comptent, même sans manifeste, pour ne jamais viser un dossier existant
+        directory = os.path.join(self.root, name)
+        numbers = [int(entry[1:]) for entry in os.listdir(directory)
+                   if entry.startswith('v') and entry[1:].isdigit()]
+        return max(numbers, default=0) + 1
+
+    def _publish(self, name, write, artifact_files, feature_names, metrics, params):
+        directory = os.path.join(self.root, name)
+        os.makedirs(directory, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=".staging-", dir=directory)
+        try:
+            os.chmod(staging, 0o755)  # mkdtemp crée le dossier en 0700
+            write(staging)
+            files = {artifact: os.path.join(staging, file) for artifact, file in artifact_files.items()}
+            manifest = {
+                "name": name,
+                "version": None,
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "feature_names": list(feature_names) if feature_names is not None else None,
+                "metrics": metrics or {},
+                "params": params or {},
+                "artifacts": {
+                    artifact: {"file": os.path.basename(path), "sha256": file_digest(path, length=None),
+                               "bytes": os.path.getsize(path)}
+                    for artifact, path in files.items()
+                },
+                # 12 premiers caractères : même valeur que la version affichée par l'API
+                "hash": file_digest(*files.values()),
+            }
+
+            # Le renommage publie la version d'un bloc ; en cas de course on prend le numéro suivant
+            while True:
+                version = self._next_version(name)
+                manifest["version"] = version
+                with open(os.path.join(staging, MANIFEST), 'w', encoding='utf-8') as f:
+                    json.dump(manifest, f, indent=2, ensure_ascii=False, default=str)
+                try:
+                    os.rename(staging, os.path.join(directory, f"v{version}"))
+                    return manifest
+                except OSError:
+                    if not os.path.exists(os.path.join(directory, f"v{version}")):
+                        raise
+        finally:
+            if os.path.exists(staging):
+                shutil.rmtree(staging)
+
+def resolve_artifacts(name, version="latest", fallback=None, root=None):
+    """
+    Chemins des artefacts d'un modèle : depuis le registre s'il y est, sinon les fichiers historiques
+
+    Args:
+        name (str): Nom du modèle dans le registre
+        version: "latest" ou numéro de version
+        fallback (dict): Artefact -> chemin utilisé quand le registre ne contient pas ce modèle
+        root (str): Dossier du registre (MODEL_REGISTRY_DIR par défaut)
+
+    Returns:
+        tuple: (dict artefact -> chemin, True si les chemins viennent du registre)
+    """
+    registry = ModelRegistry(root or REGISTRY_DIR)
+    if registry.versions(name) or fallback is None:
+        return registry.artifact_paths(name, version), True
+    if version not in (None, "latest"):
+        raise ModelNotFound(f"Le modèle '{name}' n'est pas dans le registre, version {version} impossible")
+    return dict(fallback), False
+
+def load_artifacts(name, version="latest", fallback=None, root=None):
+    """Charge les artefacts d'un modèle (mmap pour le registre, lecture complète pour les fichiers historiques)"""
+    paths, from_registry = resolve_artifacts(name, version, fallback, root)
+    mmap_mode = "r" if from_registry else None
+    return {artifact: _load_file(path, mmap_mode) for artifact, path in paths.items()}
+
+def main():
+    parser = argparse.ArgumentParser(description="Registre de modèles versionnés")
+    parser.add_argument("--root", default=REGISTRY_DIR, help="Dossier du registre")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list", help="Lister les modèles et leurs versions")
+
+    show = commands.add_parser("show", help="Afficher le manifeste d'une version")
+    show.add_argument("name")
+    show.add_argument("version", nargs="?", default="latest")
+
+    import_cmd = commands.add_parser("import", help="Publier des fichiers existants (.joblib, pipeline .bin)")
+    import_cmd.add_argument("name")
+    import_cmd.add_argument("files", nargs="+", help="artefact=chemin (ex: model=tumor_model.joblib)")
+    import_cmd.add_argument("--features", help="Features attendues, séparées par des virgules")
+
+    args = parser.parse_args()
+    registry = ModelRegistry(args.root)
+
+    if args.command == "list":
+        for name in registry.names():
+            manifest = registry.manifest(name)
+            print(f"📦 {name}: versions {registry.versions(name)} (latest v{manifest['version']}, {manifest['hash']})")
+    elif args.command == "show":
+        print(json.dumps(registry.manifest(args.name, args.version), indent=2, ensure_ascii=False))
+    elif args.command == "import":
+        files = dict(item.split("=", 1) for item in args.files)
+        features = args.features.split(",") if args.features else None
+        if features is None:
+            # Les features viennent des objets sklearn qui les connaissent (ex: le scaler)
+            for path in files.values():
+                if not path.endswith(".joblib"):
+                    continue
+                names = getattr(joblib.load(path), "feature_names_in_", None)
+                if names is not None:
+                    features = [str(n) for n in names]
+                    break
+        manifest = registry.import_files(args.name, files, feature_names=features)
+        print(f"✅ {args.name} v{manifest['version']} publié ({manifest['hash']})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Rechargement à chaud du modèle et du scaler de l'API tumeurs
+
+Le modèle et le scaler forment un couple indissociable (ModelBundle) : le
+serveur ne manipule qu'une seule référence vers le couple actif, remplacée
+d'un bloc. Une requête lit cette référence une fois et utilise toujours un
+modèle et un scaler issus du même entraînement.
+"""
+import os
+import threading
+import time
+import joblib
+import numpy as np
+from model_registry import file_digest
+from tumor_inference import CompiledTumorModel, load_pipeline
+
+class ModelBundle:
+    """
+    Couple modèle + scaler chargé ensemble, avec son noyau compilé et sa version
+
+    Chargé depuis un pipeline fusionné (tumor_pipeline.bin), le couple n'a que
+    son noyau compilé : model et scaler valent None.
+    """
+
+    def __init__(self, model, scaler, version, source=None, compiled=None):
+        self.model = model
+        self.scaler = scaler
+        self.compiled = compiled if compiled is not None else CompiledTumorModel.from_sklearn(model, scaler)
+        self.version = version
+        self.source = source
+        self.loaded_at = time.time()
+
+def load_bundle(model_path, scaler_path=None, mmap_mode=None):
+    """
+    Charge le modèle et le scaler depuis le disque ; la version est l'empreinte des deux fichiers
+
+    Avec scaler_path=None, model_path désigne un pipeline fusionné sans pickle
+    (un seul fichier, chargé en quelques dizaines de microsecondes).
+
+    mmap_mode n'est sûr que pour des fichiers jamais réécrits (versions du registre) :
+    un fichier projeté en mémoire puis tronqué par un nouvel entraînement ferait planter le processus.
+    """
+    if scaler_path is None:
+        return ModelBundle(None, None, file_digest(model_path), source={"pipeline": model_path},
+                           compiled=load_pipeline(model_path))
+    version = file_digest(model_path, scaler_path)
+    return ModelBundle(joblib.load(model_path, mmap_mode=mmap_mode),
+                       joblib.load(scaler_path, mmap_mode=mmap_mode), version,
+                       source={"model": model_path, "scaler": scaler_path})
+
+def validate_bundle(bundle, canary_features, canary_labels=None, min_accuracy=0.0):
+    """
+    Vérifie un couple fraîchement chargé avant de le mettre en service
+
+    Args:
+        bundle (ModelBundle): Couple à valider
+        canary_features (array-like): Lignes brutes (n, 2) de test
+        canary_labels (array-like): Labels attendus (optionnel)
+        min_accuracy (float): Accuracy minimale exigée sur les labels canari
+
+    Raises:
+        ValueError: si le couple est incohérent ou trop mauvais
+    """
+    canary_features = np.asarray(canary_features, dtype=np.float64)
+    if bundle.compiled.weights.shape[0] != canary_features.shape[1]:
+        raise ValueError("Le modèle n'attend pas le bon nombre de features")
+
+    labels, probabilities = bundle.compiled.predict_with_proba(canary_features)
+    if not np.all(np.isfinite(probabilities)):
+        raise ValueError("Probabilités non finies sur le jeu canari")
+
+    # Le noyau compilé doit reproduire exactement le pipeline sklearn (s'il a été chargé)
+    if bundle.model is not None:
+        scaled = bundle.scaler.transform(canary_features)
+        expected = bundle.model.predict_proba(scaled)[:, 1]
+        if not np.allclose(probabilities, expected, rtol=1e-9, atol=1e-9):
+            raise ValueError("Le noyau compilé diverge du pipeline sklearn")
+
+    if canary_labels is not None and min_accuracy > 0:
+        accuracy = float(np.mean(labels == np.asarray(canary_labels)))
+        if accuracy < min_accuracy:
+            raise ValueError(f"Accuracy canari trop faible: {accuracy:.2%} < {min_accuracy:.2%}")
+
+class ModelWatcher:
+    """
+    Surveille les fichiers du modèle et du scaler et recharge le couple en arrière-plan
+
+    Un changement n'est pris en compte qu'une fois les deux fichiers stables
+    pendant un intervalle complet (l'entraînement écrit le modèle puis le
+    scaler). Le nouveau couple est validé sur le jeu canari puis remplace
+    l'ancien d'un seul coup. En cas d'échec, l'ancien couple reste en service
+    et la sonde de disponibilité passe à "not ready".
+    """
+
+    RELOAD_FAILURE = "model_reload"
+
+    def __init__(self, model_path, scaler_path, canary_features, canary_labels=None,
+                 min_accuracy=0.0, interval=2.0, health_monitor=None, resolve_paths=None):
+        """
+        Args:
+            resolve_paths (callable): Optionnel, renvoie (chemin modèle, chemin scaler, mmap_mode) ;
+                rappelé à chaque tour pour suivre une nouvelle version publiée dans le registre.
+                Chemin scaler None : le chemin modèle est un pipeline fusionné
+        """
+        self.model_path = model_path
+        self.scaler_path = scaler_path
+        self.mmap_mode = None
+        self.resolve_paths = resolve_paths
+        if resolve_paths is not None:
+            self.model_path, self.scaler_path, self.mmap_mode = resolve_paths()
+        self.canary_features = canary_features
+        self.canary_labels = canary_labels
+        self.min_accuracy = min_accuracy
+        self.interval = interval
+        self.health_monitor = health_monitor
+
+        self.current = load_bundle(self.model_path, self.scaler_path, self.mmap_mode)
+        validate_bundle(self.current, canary_features, canary_labels, min_accuracy)
+
+        self.reloads = 0
+        self.last_error = None
+        self._signature = self._stat()
+        self._pending = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _stat(self):
+        if self.resolve_paths is not None:
+            try:
+                self.model_path, self.scaler_path, self.mmap_mode = self.resolve_paths()
+            except (LookupError, OSError) as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                return None
+        try:
+            paths = [path for path in (self.model_path, self.scaler_path) if path is not None]
+            return tuple((s.st_mtime_ns, s.st_size) for s in map(os.stat, paths))
+        except FileNotFoundError:
+            return None
+
+    def ensure_started(self):
+        """Démarre le thread de surveillance dans le processus courant (compatible fork)"""
+        if self.interval <= 0 or self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            threading.Thread(target=self._loop, name="model-watcher", daemon=True).start()
+
+    def _loop(self):
+        pid = os.getpid()
+        while self._pid == pid:
+            time.sleep(self.interval)
+            self.poll()
+
+    def poll(self):
+        """Vérifie les fichiers ; recharge si un changement est stable depuis le dernier appel"""
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            self._pending = None
+            return False
+        if signature != self._pending:
+            self._pending = signature  # Fichiers en cours d'écriture : on attend le prochain tour
+            return False
+        self._pending = None
+        self._signature = signature
+        return self.reload()
+
+    def reload(self):
+        """Charge, valide puis active le nouveau couple ; renvoie True si le couple a changé"""
+        try:
+            bundle = load_bundle(self.model_path, self.scaler_path, self.mmap_mode)
+            if bundle.version == self.current.version:
+                return False
+            validate_bundle(bundle, self.canary_features, self.canary_labels, self.min_accuracy)
+        except Exception as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+            print(f"❌ Rechargement du modèle refusé: {self.last_error}")
+            if self.health_monitor is not None:
+                self.health_monitor.mark_unready(self.RELOAD_FAILURE, self.last_error)
+            return False
+
+        self.current = bundle  # Remplacement atomique du couple modèle + scaler
+        self.reloads += 1
+        self.last_error = None
+        if self.health_monitor is not None:
+            self.health_monitor.clear(self.RELOAD_FAILURE)
+        print(f"🔄 Nouveau modèle en service: version {bundle.version}")
+        return True
+
+    def status(self):
+        return {
+            "model_version": self.current.version,
+            "loaded_at": self.current.loaded_at,
+            "source": self.current.source,
+            "reloads": self.reloads,
+            "last_error": self.last_error,
+            "watch_interval_s": self.interval,
+        }
@@ -1,3 +1,11 @@
+import numpy as np
+
+# Règles de prix codées en dur (partagées par predict et predict_columns)
+PRIX_BASE = 100000  # Prix de base
+PRIX_PAR_M2 = 1200  # Prix par m²
+BONUS_CHAMBRE = 15000  # Bonus par chambre
+BONUS_JARDIN = 25000  # Bonus si jardin
+
 def predict(taille, nb_chambres, jardin):
     """
     Fonction de prédiction codée en dur pour le prix d'une maison
@@ -11,15 +19,10 @@ def predict(taille, nb_chambres, jardin):
         float: Prix prédit en euros
     """
     # Prédiction codée en dur basée sur des règles simples
-    prix_base = 100000  # Prix de base
-    prix_par_m2 = 1200  # Prix par m²
-    bonus_chambre = 15000  # Bonus par chambre
-    bonus_jardin = 25000  # Bonus si jardin
-    
-    prix_predit = prix_base + (taille * prix_par_m2) + (nb_chambres * bonus_chambre)
+    prix_predit = PRIX_BASE + (taille * PRIX_PAR_M2) + (nb_chambres * BONUS_CHAMBRE)
     
     if jardin:
-        prix_predit += bonus_jardin
+        prix_predit += BONUS_JARDIN
     
     return round(prix_predit, 2)
 
@@ -44,4 +47,46 @@ def predict_multiple(houses_data):
         }
         predictions.append(prediction)
     
-    return predictions 
\ No newline at end of file
+    return predictions
+
+def predict_columns(taille, nb_chambres, jardin):
+    """
+    Version vectorisée de predict : tous les prix en une seule expression NumPy
+    
+    Args:
+        taille (array-like): Tailles en m²
+        nb_chambres (array-like): Nombres de chambres
+        jardin (array-like): Présence d'un jardin (booléens ou 0/1)
+    
+    Returns:
+        numpy.ndarray: Prix prédits en euros (arrondis au centime, comme predict)
+    """
+    taille = np.asarray(taille, dtype=np.float64)
+    nb_chambres = np.asarray(nb_chambres, dtype=np.float64)
+    jardin = np.asarray(jardin, dtype=bool)
+    
+    prix_predit = PRIX_BASE + taille * PRIX_PAR_M2 + nb_chambres * BONUS_CHAMBRE
+    prix_predit += np.where(jardin, BONUS_JARDIN, 0)
+    return np.round(prix_predit, 2)
+
+def predict_multiple_columnar(houses):
+    """
+    Prédit les prix de nombreuses maisons au format colonnes (remplace predict_multiple pour les gros volumes)
+    
+    Args:
+        houses: DataFrame ou dict avec les colonnes 'taille', 'nb_chambres' et 'jardin'
+    
+    Returns:
+        Même type que l'entrée (DataFrame ou dict de tableaux NumPy) avec la colonne 'prix_predit' en plus
+    """
+    prix_predit = predict_columns(houses['taille'], houses['nb_chambres'], houses['jardin'])
+    
+    if hasattr(houses, 'assign'):  # DataFrame pandas
+        return houses.assign(prix_predit=prix_predit)
+    
+    return {
+        "taille": np.asarray(houses['taille']),
+        "nb_chambres": np.asarray(houses['nb_chambres']),
+        "jardin": np.asarray(houses['jardin'], dtype=bool),
+        "prix_predit": prix_predit
+    }
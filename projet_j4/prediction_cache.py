@@ -0,0 +1,121 @@
+"""
+Cache des résultats de prédiction, devant le noyau d'inférence tumeurs
+
+Les clients renvoient souvent les mêmes couples (size, p53_concentration)
+(tableaux de bord rafraîchis, jobs relancés). La clé combine la version du
+modèle et les features arrondies : un modèle rechargé ne sert jamais un
+résultat calculé par l'ancien, et deux flottants quasi identiques partagent
+la même entrée.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+class PredictionCache:
+    """
+    Cache LRU borné avec expiration (TTL) et compteurs de hits/misses
+
+    Le cache est propre au processus (chaque worker pré-forké a le sien) et
+    protégé par un verrou : les serveurs Flask et ASGI l'appellent depuis
+    plusieurs threads.
+    """
+
+    def __init__(self, max_entries=10_000, ttl=300.0, decimals=9, clock=time.monotonic):
+        """
+        Args:
+            max_entries (int): Nombre maximum d'entrées (les moins récemment utilisées partent en premier)
+            ttl (float): Durée de vie d'une entrée en secondes (0 = sans expiration)
+            decimals (int): Nombre de décimales conservées dans la clé
+            clock (callable): Horloge en secondes (injectable pour les tests)
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries doit être >= 1")
+        self.max_entries = int(max_entries)
+        self.ttl = float(ttl)
+        self.decimals = int(decimals)
+        self._clock = clock
+        self._entries = OrderedDict()  # clé -> (expiration, résultat)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def key(self, model_version, *features):
+        """Clé de cache : version du modèle + features arrondies"""
+        return (model_version,) + tuple(round(float(value), self.decimals) for value in features)
+
+    def get(self, key):
+        """Renvoie le résultat associé à la clé, ou None (absent ou expiré)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, result = entry
+            if expires_at is not None and expires_at <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def get_many(self, keys):
+        """
+        Recherche plusieurs clés sous un seul verrou
+
+        Returns:
+            list: Un résultat (ou None pour un miss) par clé, dans l'ordre
+        """
+        now = self._clock()
+        results = []
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] is not None and entry[0] <= now:
+                    del self._entries[key]
+                    self.expirations += 1
+                    entry = None
+                if entry is None:
+                    self.misses += 1
+                    results.append(None)
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    results.append(entry[1])
+        return results
+
+    def put(self, key, result):
+        self.put_many([(key, result)])
+
+    def put_many(self, items):
+        """Ajoute des couples (clé, résultat) puis évince les entrées les plus anciennes"""
+        expires_at = self._clock() + self.ttl if self.ttl > 0 else None
+        with self._lock:
+            for key, result in items:
+                self._entries[key] = (expires_at, result)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_s": self.ttl,
+                "decimals": self.decimals,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
@@ -0,0 +1,362 @@
+"""
+Serveur pre-fork de production pour l'API de prédiction de tumeurs
+
+Le processus maître charge le modèle et le scaler UNE seule fois (import de
+tumor_service), ouvre le socket d'écoute puis forke N workers. Les pages
+mémoire du modèle sont partagées en copy-on-write : la mémoire résidente
+n'est pas multipliée par le nombre de workers.
+
+Le maître surveille ses workers :
+  - un worker mort est relancé immédiatement ; s'il meurt dès le démarrage
+    (artefact illisible, port occupé...), la relance attend de plus en plus
+    longtemps, et le serveur s'arrête après max_crashes échecs d'affilée
+  - un worker dont le heartbeat n'avance plus est tué puis relancé ; le
+    heartbeat est donné par la boucle d'acceptation, et seulement si les
+    requêtes en cours progressent (réponse terminée ou morceau envoyé)
+  - SIGHUP : redémarrage progressif (un worker après l'autre, sans coupure)
+  - SIGTERM / SIGINT : arrêt propre (les requêtes en cours sont terminées)
+
+Lancement (Linux / macOS) :
+    python prefork_server.py --workers 4 --port 5002
+"""
+import argparse
+import gc
+import json
+import os
+import signal
+import socket
+import threading
+import time
+import traceback
+from multiprocessing import RawArray
+
+from werkzeug.serving import make_server
+
+from tumor_api_fixed import app
+
+MIN_UPTIME = 5.0  # Un worker mort plus tôt a échoué au démarrage (relance avec backoff)
+CRASH_BACKOFF_MAX = 30.0
+
+class WorkerTable:
+    """Heartbeats et compteurs de requêtes des workers, en mémoire partagée (créée avant le fork)"""
+
+    def __init__(self, n_workers):
+        self.n_workers = n_workers
+        self.pids = RawArray('q', n_workers)
+        self.heartbeats = RawArray('d', n_workers)
+        self.started_at = RawArray('d', n_workers)
+        self.requests = RawArray('q', n_workers)
+        self.restarts = RawArray('q', n_workers)
+
+    def snapshot(self, heartbeat_timeout):
+        now = time.time()
+        return [{
+            "worker": slot,
+            "pid": self.pids[slot],
+            "alive": self.pids[slot] > 0 and now - self.heartbeats[slot] < heartbeat_timeout,
+            "last_heartbeat_s": round(now - self.heartbeats[slot], 3) if self.heartbeats[slot] else None,
+            "uptime_s": round(now - self.started_at[slot], 1) if self.started_at[slot] else None,
+            "requests": self.requests[slot],
+            "restarts": self.restarts[slot],
+        } for slot in range(self.n_workers)]
+
+class RequestProgress:
+    """Requêtes en cours d'un worker et date de leur dernier progrès (thread-safe)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.last_progress = time.monotonic()
+
+    def started(self):
+        with self._lock:
+            if self.in_flight == 0:
+                self.last_progress = time.monotonic()  # Un worker inactif n'est pas bloqué
+            self.in_flight += 1
+
+    def progressed(self):
+        self.last_progress = time.monotonic()
+
+    def finished(self):
+        with self._lock:
+            self.in_flight -= 1
+            self.last_progress = time.monotonic()
+
+    def stalled(self, timeout):
+        """Vrai si des requêtes sont en cours et qu'aucune n'a progressé depuis timeout secondes"""
+        return self.in_flight > 0 and time.monotonic() - self.last_progress > timeout
+
+    def track(self, body):
+        """Itère sur le corps d'une réponse WSGI en notant chaque morceau envoyé"""
+        try:
+            for chunk in body:
+                self.progressed()
+                yield chunk
+        finally:
+            try:
+                if hasattr(body, "close"):
+                    body.close()
+            finally:
+                self.finished()
+
+class PreforkServer:
+    def __init__(self, wsgi_app, host, port, n_workers, heartbeat_timeout=10.0, graceful_timeout=30.0,
+                 crash_backoff=0.5, max_crashes=5):
+        """
+        Args:
+            heartbeat_timeout (float): Secondes sans heartbeat avant de tuer un worker
+            graceful_timeout (float): Secondes laissées aux requêtes en cours lors d'un arrêt
+            crash_backoff (float): Attente avant la 2e relance d'un worker qui échoue au démarrage (doublée ensuite)
+            max_crashes (int): Échecs au démarrage d'affilée avant d'arrêter le serveur
+        """
+        self.wsgi_app = wsgi_app
+        self.host = host
+        self.port = port
+        self.n_workers = n_workers
+        self.heartbeat_timeout = heartbeat_timeout
+        self.graceful_timeout = graceful_timeout
+        self.crash_backoff = crash_backoff
+        self.max_crashes = max_crashes
+        self.table = WorkerTable(n_workers)
+        self.workers = {}  # pid -> slot
+        self.socket = None
+        self.exit_code = 0
+        self._stopping = False
+        self._rolling_restart = False
+        self._crashes = [0] * n_workers  # Échecs au démarrage consécutifs, par slot
+        self._respawn_at = {}  # slot -> date de relance (backoff)
+
+    # ---------- Maître ----------
+
+    def run(self):
+        """Lance et surveille les workers jusqu'à SIGTERM / SIGINT ; renvoie le code de sortie"""
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.socket.bind((self.host, self.port))
+        self.socket.listen(1024)
+        self.socket.set_inheritable(True)
+
+        # Tout ce qui est chargé jusqu'ici (modèle, scaler, modules) passe dans la
+        # génération permanente du GC : les collectes des workers ne touchent plus
+        # ces objets, ce qui évite de dupliquer leurs pages copy-on-write.
+        gc.collect()
+        gc.freeze()
+
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGHUP, self._handle_hup)
+
+        print(f"🚀 Maître {os.getpid()} : {self.n_workers} workers sur http://{self.host}:{self.port}")
+        for slot in range(self.n_workers):
+            self._spawn(slot)
+
+        while not self._stopping:
+            self._reap()
+            self._respawn_due()
+            self._kill_stale()
+            if self._rolling_restart:
+                self._rolling_restart = False
+                self._restart_all()
+            time.sleep(0.5)
+
+        self._shutdown()
+        return self.exit_code
+
+    def _spawn(self, slot):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                self._worker_main(slot)
+            except BaseException:
+                code = 1
+                print(f"❌ Worker {slot} (pid {os.getpid()}) arrêté sur une exception :", flush=True)
+                traceback.print_exc()
+            finally:
+                os._exit(code)
+        self.table.pids[slot] = pid
+        self.table.heartbeats[slot] = time.time()
+        self.table.started_at[slot] = time.time()
+        self.workers[pid] = slot
+        return pid
+
+    def _reap(self):
+        """Récupère les workers morts et les relance"""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            slot = self.workers.pop(pid, None)
+            if slot is None:
+                continue
+            self.table.pids[slot] = 0
+            if not self._stopping:
+                self._schedule_respawn(slot, pid, os.waitstatus_to_exitcode(status))
+
+    def _schedule_respawn(self, slot, pid, code):
+        """Relance immédiate, ou différée (backoff exponentiel) si le worker est mort au démarrage"""
+        if time.time() - self.table.started_at[slot] < MIN_UPTIME:
+            self._crashes[slot] += 1
+        else:
+            self._crashes[slot] = 0
+        crashes = self._crashes[slot]
+        if crashes >= self.max_crashes:
+            print(f"❌ Worker {slot} a échoué {crashes} fois d'affilée au démarrage : arrêt du serveur")
+            self.exit_code = 1
+            self._stopping = True
+            return
+        delay = min(self.crash_backoff * 2 ** (crashes - 2), CRASH_BACKOFF_MAX) if crashes >= 2 else 0.0
+        print(f"⚠️ Worker {slot} (pid {pid}) arrêté (code {code}) : relance dans {delay:.1f} s")
+        self.table.restarts[slot] += 1
+        self._respawn_at[slot] = time.time() + delay
+        self._respawn_due()
+
+    def _respawn_due(self):
+        now = time.time()
+        for slot, due in list(self._respawn_at.items()):
+            if due <= now:
+                del self._respawn_at[slot]
+                self._spawn(slot)
+
+    def _kill_stale(self):
+        """Tue les workers bloqués (heartbeat trop ancien) ; _reap les relancera"""
+        now = time.time()
+        for pid, slot in list(self.workers.items()):
+            if now - self.table.heartbeats[slot] > self.heartbeat_timeout:
+                print(f"⚠️ Worker {slot} (pid {pid}) ne répond plus : SIGKILL")
+                self._signal(pid, signal.SIGKILL)
+
+    def _restart_all(self):
+        """Redémarrage progressif : un nouveau worker démarre avant l'arrêt de l'ancien"""
+        print("🔄 Redémarrage progressif des workers")
+        for old_pid, slot in list(self.workers.items()):
+            self.workers.pop(old_pid)
+            self._signal(old_pid, signal.SIGTERM)
+            self._spawn(slot)
+            self._wait_for(old_pid)
+
+    def _wait_for(self, pid):
+        deadline = time.time() + self.graceful_timeout
+        while time.time() < deadline:
+            try:
+                done, _ = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if done:
+                return
+            time.sleep(0.05)
+        self._signal(pid, signal.SIGKILL)
+        try:
+            os.waitpid(pid, 0)
+        except ChildProcessError:
+            pass
+
+    def _shutdown(self):
+        print("🛑 Arrêt des workers")
+        for pid in list(self.workers):
+            self._signal(pid, signal.SIGTERM)
+        for pid in list(self.workers):
+            self._wait_for(pid)
+        self.workers.clear()
+        self.socket.close()
+
+    def _handle_stop(self, signum, frame):
+        self._stopping = True
+
+    def _handle_hup(self, signum, frame):
+        self._rolling_restart = True
+
+    @staticmethod
+    def _signal(pid, signum):
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
+
+    # ---------- Worker ----------
+
+    def _worker_main(self, slot):
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+            signal.signal(signum, signal.SIG_DFL)
+
+        progress = RequestProgress()
+        server = make_server(self.host, self.port, self._wrap(slot, progress), threaded=True,
+                             fd=self.socket.fileno())
+        # Threads non-daemon : server_close() attend la fin des requêtes en cours
+        server.daemon_threads = False
+
+        def stop(signum, frame):
+            # shutdown() bloque jusqu'à la sortie de serve_forever : depuis un autre thread
+            threading.Thread(target=server.shutdown, daemon=True).start()
+
+        signal.signal(signal.SIGTERM, stop)
+        # Ctrl+C et SIGHUP (envoyés à tout le groupe de processus) sont gérés par le maître
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+
+        # Heartbeat donné par la boucle d'acceptation (toutes les 0,5 s), et seulement si
+        # les requêtes en cours progressent : des threads de requête tous bloqués l'arrêtent
+        server.service_actions = lambda: self._heartbeat(slot, progress)
+
+        server.serve_forever()
+        server.server_close()
+
+    def _heartbeat(self, slot, progress):
+        if not progress.stalled(self.heartbeat_timeout):
+            self.table.heartbeats[slot] = time.time()
+
+    def _wrap(self, slot, progress):
+        """Application WSGI du worker : compte les requêtes, suit leur progression et sert /workers"""
+        table = self.table
+        lock = threading.Lock()
+        heartbeat_timeout = self.heartbeat_timeout
+
+        def worker_app(environ, start_response):
+            with lock:
+                table.requests[slot] += 1
+            if environ.get('PATH_INFO') == '/workers':
+                body = json.dumps({
+                    "status": "success",
+                    "served_by": {"worker": slot, "pid": os.getpid()},
+                    "workers": table.snapshot(heartbeat_timeout),
+                }).encode('utf-8')
+                start_response('200 OK', [('Content-Type', 'application/json'),
+                                          ('Content-Length', str(len(body)))])
+                return [body]
+            progress.started()
+            try:
+                body = self.wsgi_app(environ, start_response)
+            except BaseException:
+                progress.finished()
+                raise
+            return progress.track(body)
+
+        return worker_app
+
+def main():
+    parser = argparse.ArgumentParser(description="Serveur pre-fork de l'API de prédiction de tumeurs")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5002)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--heartbeat-timeout", type=float, default=10.0,
+                        help="Secondes sans heartbeat avant de tuer un worker")
+    parser.add_argument("--graceful-timeout", type=float, default=30.0,
+                        help="Secondes laissées aux requêtes en cours lors d'un arrêt")
+    parser.add_argument("--max-crashes", type=int, default=5,
+                        help="Échecs au démarrage d'affilée d'un worker avant d'arrêter le serveur")
+    args = parser.parse_args()
+
+    if not hasattr(os, "fork"):
+        raise SystemExit("❌ Le serveur pre-fork nécessite os.fork (Linux / macOS)")
+
+    server = PreforkServer(app, args.host, args.port, args.workers,
+                           heartbeat_timeout=args.heartbeat_timeout,
+                           graceful_timeout=args.graceful_timeout,
+                           max_crashes=args.max_crashes)
+    raise SystemExit(server.run())
+
+if __name__ == '__main__':
+    main()
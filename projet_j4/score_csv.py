@@ -0,0 +1,211 @@
+"""
+Scoring hors-ligne d'un fichier CSV ou Parquet avec le modèle tumeurs sauvegardé
+
+Le fichier est lu par paquets de lignes : la mémoire utilisée dépend de la
+taille des paquets, pas de la taille du fichier. Chaque paquet est scoré
+avec le noyau compilé (scaler + modèle repliés) puis ajouté au fichier de
+sortie, avec les colonnes probability_cancerous et predicted_is_cancerous
+(les colonnes d'entrée, dont une éventuelle vérité terrain is_cancerous, sont
+conservées telles quelles).
+
+Exemples :
+    python score_csv.py tumor_two_vars.csv predictions.csv
+    python score_csv.py gros_fichier.parquet predictions.parquet --chunk-size 500000 --workers 4
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from tumor_inference import load_compiled_model
+
+FEATURES = ['size', 'p53_concentration']
+OUTPUTS = ['probability_cancerous', 'predicted_is_cancerous']
+
+_worker_model = None
+
+def _init_worker(model_path, scaler_path):
+    """Chaque processus charge le modèle une seule fois"""
+    global _worker_model
+    _worker_model = load_compiled_model(model_path, scaler_path)
+
+def score_chunk(chunk, compiled_model):
+    """
+    Ajoute probability_cancerous et predicted_is_cancerous à un paquet de lignes
+
+    Les colonnes d'entrée ne sont pas modifiées. Les lignes dont une feature est absente ou non numérique reçoivent des valeurs vides.
+    """
+    size = pd.to_numeric(chunk['size'], errors='coerce').to_numpy(dtype=np.float64)
+    p53 = pd.to_numeric(chunk['p53_concentration'], errors='coerce').to_numpy(dtype=np.float64)
+    valid = np.isfinite(size) & np.isfinite(p53)
+
+    probabilities = np.full(len(chunk), np.nan)
+    labels = np.zeros(len(chunk), dtype=np.int64)
+    labels_valid, probabilities_valid = compiled_model.predict_columns(size[valid], p53[valid])
+    probabilities[valid] = probabilities_valid
+    labels[valid] = labels_valid
+
+    chunk = chunk.copy()
+    chunk['probability_cancerous'] = probabilities
+    chunk['predicted_is_cancerous'] = pd.arrays.IntegerArray(labels, ~valid)  # Entier nullable
+    return chunk
+
+def _score_task(chunk, as_csv, write_header):
+    """Tâche exécutée dans un worker : scoring + sérialisation CSV (la partie coûteuse)"""
+    scored = score_chunk(chunk, _worker_model)
+    if as_csv:
+        return scored.to_csv(index=False, header=write_header), len(scored)
+    return scored, len(scored)
+
+def read_chunks(path, chunk_size):
+    """Lit un CSV ou un Parquet par paquets de chunk_size lignes"""
+    if path.endswith('.parquet'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("❌ pyarrow est nécessaire pour lire du Parquet : pip install pyarrow")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+class OutputWriter:
+    """Écrit les paquets scorés dans l'ordre, en CSV ou en Parquet selon l'extension"""
+
+    def __init__(self, path):
+        self.path = path
+        self.as_csv = not path.endswith('.parquet')
+        self._file = open(path, 'w', newline='') if self.as_csv else None
+        self._parquet = None
+
+    def write(self, result):
+        if self.as_csv:
+            self._file.write(result)
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.Table.from_pandas(result, preserve_index=False)
+        if self._parquet is None:
+            # Une colonne d'entrée vide dans le premier paquet n'a pas de type connu : texte par défaut
+            schema = pa.schema([
+                field.with_type(pa.string())
+                if field.name not in OUTPUTS and table.column(field.name).null_count == len(table) else field
+                for field in table.schema
+            ], metadata=table.schema.metadata)
+            self._parquet = pq.ParquetWriter(self.path, schema)
+        self._parquet.write_table(_conform(table, self._parquet.schema))
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+        if self._parquet is not None:
+            self._parquet.close()
+
+def _conform(table, schema):
+    """
+    Aligne un paquet sur le schéma du fichier Parquet (fixé par le premier paquet)
+
+    pandas déduit les types paquet par paquet : une colonne entière qui reçoit
+    un NaN devient flottante, une colonne vide n'a pas de type. Les valeurs
+    sont converties sans perte, sinon une erreur nomme la colonne fautive.
+    """
+    import pyarrow as pa
+    if table.schema.equals(schema):
+        return table
+    columns = []
+    for field in schema:
+        column = table.column(field.name)
+        if column.type != field.type:
+            if column.null_count == len(column):
+                column = pa.nulls(len(column), field.type)
+            else:
+                try:
+                    column = column.cast(field.type)
+                except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+                    raise ValueError(f"La colonne '{field.name}' change de type entre paquets "
+                                     f"({field.type} puis {column.type}) : augmenter --chunk-size "
+                                     f"ou écrire en CSV ({e})") from e
+        columns.append(column)
+    return pa.Table.from_arrays(columns, schema=schema)
+
+def score_file(input_path, output_path, chunk_size=100_000, workers=0,
+               model_path="tumor_model.joblib", scaler_path="tumor_scaler.joblib"):
+    """
+    Score un fichier complet par paquets, éventuellement en parallèle
+
+    Args:
+        input_path (str): Fichier CSV ou Parquet contenant size et p53_concentration
+        output_path (str): Fichier de sortie (.csv ou .parquet)
+        chunk_size (int): Nombre de lignes par paquet
+        workers (int): Nombre de processus (0 = dans le processus courant)
+
+    Returns:
+        tuple: (nombre de lignes scorées, durée en secondes)
+    """
+    writer = OutputWriter(output_path)
+    start = time.perf_counter()
+    total = 0
+
+    def report(n_rows):
+        nonlocal total
+        total += n_rows
+        elapsed = time.perf_counter() - start
+        print(f"  {total:>12,} lignes | {total / elapsed:>12,.0f} lignes/s", file=sys.stderr)
+
+    try:
+        if workers <= 0:
+            _init_worker(model_path, scaler_path)
+            for i, chunk in enumerate(read_chunks(input_path, chunk_size)):
+                _check_columns(chunk)
+                result, n_rows = _score_task(chunk, writer.as_csv, i == 0)
+                writer.write(result)
+                report(n_rows)
+        else:
+            # Au plus 2 paquets en vol par worker : la mémoire reste bornée et l'ordre est conservé
+            with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                     initargs=(model_path, scaler_path)) as pool:
+                in_flight = deque()
+                for i, chunk in enumerate(read_chunks(input_path, chunk_size)):
+                    _check_columns(chunk)
+                    in_flight.append(pool.submit(_score_task, chunk, writer.as_csv, i == 0))
+                    if len(in_flight) >= 2 * workers:
+                        result, n_rows = in_flight.popleft().result()
+                        writer.write(result)
+                        report(n_rows)
+                while in_flight:
+                    result, n_rows = in_flight.popleft().result()
+                    writer.write(result)
+                    report(n_rows)
+    finally:
+        writer.close()
+
+    return total, time.perf_counter() - start
+
+def _check_columns(chunk):
+    missing = [column for column in FEATURES if column not in chunk.columns]
+    if missing:
+        raise SystemExit(f"❌ Colonnes manquantes dans le fichier d'entrée: {', '.join(missing)}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Scoring hors-ligne d'un fichier de tumeurs")
+    parser.add_argument("input", help="Fichier CSV ou Parquet à scorer")
+    parser.add_argument("output", help="Fichier de sortie (.csv ou .parquet)")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="Lignes par paquet")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Processus de scoring (0 = séquentiel, -1 = tous les cœurs)")
+    parser.add_argument("--model", default="tumor_model.joblib")
+    parser.add_argument("--scaler", default="tumor_scaler.joblib")
+    args = parser.parse_args()
+
+    workers = os.cpu_count() if args.workers < 0 else args.workers
+    print(f"🔮 Scoring de {args.input} -> {args.output} "
+          f"(paquets de {args.chunk_size:,} lignes, {workers or 'aucun'} worker(s))")
+    total, elapsed = score_file(args.input, args.output, args.chunk_size, workers,
+                                args.model, args.scaler)
+    print(f"✅ {total:,} lignes scorées en {elapsed:.2f} s ({total / max(elapsed, 1e-9):,.0f} lignes/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Scoring fantôme (shadow) : un modèle candidat score le même trafic que le modèle principal
+
+Le modèle principal répond à la requête. Les features et sa réponse sont
+ensuite déposées dans une file bornée (sans attente : si la file est pleine,
+l'échantillon est abandonné et compté). Un thread de fond fait scorer le
+candidat et agrège les désaccords et les écarts de latence. Le client ne paie
+donc jamais le coût du candidat.
+"""
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque
+import numpy as np
+
+class ShadowScorer:
+    """Compare un modèle candidat au modèle principal, hors du chemin de la requête"""
+
+    def __init__(self, candidate_fn, name="candidate", max_queue=1000, sample_rate=1.0,
+                 max_examples=20):
+        """
+        Args:
+            candidate_fn (callable): Fonction (matrice n x n_features) -> (labels, probabilités)
+            name (str): Nom du candidat (affiché dans les statistiques)
+            max_queue (int): Lots au plus en attente ; au-delà, les nouveaux lots sont abandonnés
+            sample_rate (float): Fraction des requêtes envoyées au candidat (0 à 1)
+            max_examples (int): Nombre de désaccords récents conservés pour inspection
+        """
+        self.candidate_fn = candidate_fn
+        self.name = name
+        self.sample_rate = float(sample_rate)
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._pid = None
+
+        self.batches = 0
+        self.rows = 0
+        self.disagreements = 0
+        self.dropped = 0
+        self.errors = 0
+        self.last_error = None
+        self._abs_probability_diff = 0.0
+        self._primary_seconds = 0.0
+        self._candidate_seconds = 0.0
+        self._examples = deque(maxlen=max_examples)
+
+    def _ensure_started(self):
+        """Démarre le thread de fond dans le processus courant (compatible fork)"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            threading.Thread(target=self._run, name="shadow-scorer", daemon=True).start()
+
+    def submit(self, features, primary_labels, primary_probabilities, primary_seconds):
+        """
+        Dépose un lot déjà scoré par le modèle principal ; ne bloque jamais
+
+        Args:
+            features (array-like): Matrice (n, n_features) des données brutes, ou tuple de colonnes
+            primary_labels (array-like): Labels renvoyés au client
+            primary_probabilities (array-like): Probabilités renvoyées au client
+            primary_seconds (float): Durée de l'inférence principale
+        """
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((features, primary_labels, primary_probabilities, primary_seconds))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def _run(self):
+        pid = os.getpid()
+        while self._pid == pid:
+            item = self._queue.get()
+            try:
+                self._compare(*item)
+            except Exception as e:
+                with self._lock:
+                    self.errors += 1
+                    self.last_error = f"{type(e).__name__}: {e}"
+            finally:
+                self._queue.task_done()
+
+    def _compare(self, features, primary_labels, primary_probabilities, primary_seconds):
+        if isinstance(features, tuple):
+            features = np.column_stack(features)  # Colonnes empilées ici, pas pendant la requête
+        features = np.asarray(features, dtype=np.float64)
+        start = time.perf_counter()
+        labels, probabilities = self.candidate_fn(features)
+        candidate_seconds = time.perf_counter() - start
+
+        primary_labels = np.asarray(primary_labels)
+        primary_probabilities = np.asarray(primary_probabilities, dtype=np.float64)
+        disagree = np.flatnonzero(np.asarray(labels) != primary_labels)
+        abs_diff = float(np.abs(np.asarray(probabilities, dtype=np.float64) - primary_probabilities).sum())
+
+        with self._lock:
+            self.batches += 1
+            self.rows += len(features)
+            self.disagreements += len(disagree)
+            self._abs_probability_diff += abs_diff
+            self._primary_seconds += primary_seconds
+            self._candidate_seconds += candidate_seconds
+            for i in disagree[:self._examples.maxlen]:
+                self._examples.append({
+                    "features": features[i].tolist(),
+                    "primary": {"label": primary_labels[i].item(),
+                                "probability": float(primary_probabilities[i])},
+                    "candidate": {"label": np.asarray(labels)[i].item(),
+                                  "probability": float(np.asarray(probabilities)[i])},
+                })
+
+    def drain(self, timeout=5.0):
+        """Attend que la file soit vide (tests et benchmarks)"""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.001)
+
+    def stats(self):
+        with self._lock:
+            rows = self.rows or 1
+            batches = self.batches or 1
+            return {
+                "candidate": self.name,
+                "sample_rate": self.sample_rate,
+                "batches": self.batches,
+                "rows": self.rows,
+                "disagreements": self.disagreements,
+                "disagreement_rate": round(self.disagreements / rows, 6) if self.rows else 0.0,
+                "mean_abs_probability_diff": round(self._abs_probability_diff / rows, 6) if self.rows else 0.0,
+                "primary_mean_latency_us": round(self._primary_seconds / batches * 1e6, 2),
+                "candidate_mean_latency_us": round(self._candidate_seconds / batches * 1e6, 2),
+                "mean_latency_delta_us": round((self._candidate_seconds - self._primary_seconds) / batches * 1e6, 2),
+                "queued": self._queue.qsize(),
+                "dropped": self.dropped,
+                "errors": self.errors,
+                "last_error": self.last_error,
+                "recent_disagreements": list(self._examples),
+            }
@@ -1,6 +1,6 @@
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
+from dataset_cache import train_test_frames
 from sklearn.preprocessing import MinMaxScaler
 import joblib
 
@@ -11,12 +11,9 @@ def demonstrate_problem():
     print("=" * 60)
     
     # 1. Charger les données et faire le même split
-    df = pd.read_csv('tumor_two_vars.csv')
-    X = df[['size', 'p53_concentration']]
-    y = df['is_cancerous']
-    
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y
+    # 🗃️ Données et indices du split lus depuis le cache (mêmes lignes que train_test_split)
+    X_train, X_test, y_train, y_test = train_test_frames(
+        'tumor_two_vars.csv', ['size', 'p53_concentration'], 'is_cancerous'
     )
     
     # 2. Charger le modèle et le scaler
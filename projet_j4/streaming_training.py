@@ -0,0 +1,159 @@
+"""
+Entraînement hors mémoire (out-of-core) : le CSV est lu par morceaux, jamais en entier
+
+  1. une première passe calcule les statistiques du scaler avec partial_fit ;
+  2. les passes suivantes (epochs) entraînent un modèle SGD avec partial_fit,
+     morceau par morceau ;
+  3. une dernière passe calcule les métriques train/test.
+
+La mémoire utilisée est bornée par la taille d'un morceau (chunksize), quelle
+que soit la taille du fichier. Le jeu de test est tiré ligne par ligne à partir
+de l'index de la ligne (hachage déterministe) : même découpage à chaque passe
+et à chaque exécution, sans rien garder en mémoire.
+
+Les artefacts produits sont ceux qu'attendent déjà les APIs :
+  - tumeurs : MinMaxScaler + SGDClassifier(loss="log_loss") (coef_, intercept_,
+    classes_, predict_proba), comme le couple MinMaxScaler + LogisticRegression ;
+  - maisons : une LinearRegression dont les coefficients sont ceux du SGD
+    ramenés dans l'espace des données brutes (le SGD apprend sur des données
+    standardisées, sinon il diverge sur des prix de l'ordre de 10^5).
+"""
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression, SGDClassifier, SGDRegressor
+from sklearn.preprocessing import MinMaxScaler, StandardScaler
+
+DEFAULT_CHUNKSIZE = 100_000
+
+def read_chunks(path, columns, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Lit un CSV par morceaux
+
+    Yields:
+        tuple: (index de la première ligne du morceau, DataFrame du morceau)
+    """
+    start = 0
+    for chunk in pd.read_csv(path, usecols=columns, chunksize=chunksize):
+        yield start, chunk[columns]
+        start += len(chunk)
+
+def holdout_mask(start, n_rows, test_fraction, seed=42):
+    """Lignes de test d'un morceau : hachage de l'index global de la ligne, stable d'une passe à l'autre"""
+    row_ids = np.arange(start, start + n_rows, dtype=np.uint64) + np.uint64(seed)
+    hashed = (row_ids * np.uint64(0x9E3779B97F4A7C15)) >> np.uint64(40)  # 24 bits de poids fort
+    return hashed < np.uint64(int(test_fraction * (1 << 24)))
+
+def _train_chunks(path, features, target, chunksize, test_fraction):
+    """Morceaux d'entraînement uniquement : (X, y) en float64"""
+    for start, chunk in read_chunks(path, features + [target], chunksize):
+        train = ~holdout_mask(start, len(chunk), test_fraction)
+        yield chunk[features].to_numpy(np.float64)[train], chunk[target].to_numpy()[train]
+
+def train_sgd_classifier(path, features, target, chunksize=DEFAULT_CHUNKSIZE, epochs=10,
+                         test_fraction=0.2, random_state=42, **sgd_params):
+    """
+    Entraîne MinMaxScaler + SGDClassifier (régression logistique) en streaming
+
+    Args:
+        path (str): CSV d'entraînement
+        features (list): Colonnes features, dans l'ordre attendu par l'API
+        target (str): Colonne cible (binaire)
+        chunksize (int): Lignes lues à la fois (borne la mémoire)
+        epochs (int): Passes d'entraînement sur le fichier
+        test_fraction (float): Part des lignes réservées au test
+        **sgd_params: Paramètres supplémentaires de SGDClassifier (alpha, penalty...)
+
+    Returns:
+        tuple: (model, scaler, métriques)
+    """
+    # 1. Statistiques du scaler et classes, en une passe
+    scaler = MinMaxScaler()
+    classes = set()
+    for X, y in _train_chunks(path, features, target, chunksize, test_fraction):
+        if len(X):
+            scaler.partial_fit(pd.DataFrame(X, columns=features))
+            classes.update(np.unique(y).tolist())
+    classes = np.array(sorted(classes))
+
+    # 2. SGD, une passe par epoch ; chaque morceau est mélangé avant partial_fit
+    model = SGDClassifier(loss="log_loss", random_state=random_state, **sgd_params)
+    rng = np.random.default_rng(random_state)
+    for _ in range(epochs):
+        for X, y in _train_chunks(path, features, target, chunksize, test_fraction):
+            if len(X):
+                order = rng.permutation(len(X))
+                model.partial_fit(scaler.transform(pd.DataFrame(X[order], columns=features)), y[order],
+                                  classes=classes)
+
+    # 3. Métriques : accuracy train et test en une passe
+    correct = {"train": 0, "test": 0}
+    counts = {"train": 0, "test": 0}
+    for start, chunk in read_chunks(path, features + [target], chunksize):
+        test = holdout_mask(start, len(chunk), test_fraction)
+        good = model.predict(scaler.transform(chunk[features])) == chunk[target].to_numpy()
+        for split, mask in (("train", ~test), ("test", test)):
+            correct[split] += int(good[mask].sum())
+            counts[split] += int(mask.sum())
+
+    metrics = {
+        "train_accuracy": correct["train"] / max(counts["train"], 1),
+        "test_accuracy": correct["test"] / max(counts["test"], 1),
+        "n_train": counts["train"],
+        "n_test": counts["test"],
+    }
+    return model, scaler, metrics
+
+def train_sgd_regressor(path, features, target, chunksize=DEFAULT_CHUNKSIZE, epochs=20,
+                        test_fraction=0.2, random_state=42, **sgd_params):
+    """
+    Entraîne une régression linéaire par SGD en streaming
+
+    Le SGD apprend sur X et y standardisés ; ses coefficients sont ensuite
+    ramenés dans l'espace brut et rangés dans une LinearRegression, le format
+    que chargent déjà l'API maisons et l'app Streamlit.
+
+    Returns:
+        tuple: (LinearRegression, métriques)
+    """
+    # 1. Moyennes et écarts-types de X et y, en une passe
+    x_scaler, y_scaler = StandardScaler(), StandardScaler()
+    for X, y in _train_chunks(path, features, target, chunksize, test_fraction):
+        if len(X):
+            x_scaler.partial_fit(X)
+            y_scaler.partial_fit(y.reshape(-1, 1).astype(np.float64))
+
+    # 2. SGD sur les données standardisées
+    sgd = SGDRegressor(random_state=random_state, **sgd_params)
+    rng = np.random.default_rng(random_state)
+    for _ in range(epochs):
+        for X, y in _train_chunks(path, features, target, chunksize, test_fraction):
+            if len(X):
+                order = rng.permutation(len(X))
+                y_scaled = y_scaler.transform(y.reshape(-1, 1).astype(np.float64)).ravel()
+                sgd.partial_fit(x_scaler.transform(X[order]), y_scaled[order])
+
+    # y = y_mean + y_scale * (coef_s . (x - x_mean) / x_scale + intercept_s)
+    coef = sgd.coef_ * y_scaler.scale_[0] / x_scaler.scale_
+    intercept = y_scaler.mean_[0] + y_scaler.scale_[0] * (sgd.intercept_[0] - np.dot(sgd.coef_, x_scaler.mean_ / x_scaler.scale_))
+
+    model = LinearRegression()
+    model.coef_ = coef
+    model.intercept_ = float(intercept)
+    model.n_features_in_ = len(features)
+    model.feature_names_in_ = np.array(features, dtype=object)
+
+    # 3. Métriques : R² train et test, à partir de sommes cumulées
+    sums = {split: np.zeros(4) for split in ("train", "test")}  # n, somme y, somme y², somme des erreurs²
+    for start, chunk in read_chunks(path, features + [target], chunksize):
+        test = holdout_mask(start, len(chunk), test_fraction)
+        y = chunk[target].to_numpy(np.float64)
+        residuals = y - model.predict(chunk[features])
+        for split, mask in (("train", ~test), ("test", test)):
+            sums[split] += [mask.sum(), y[mask].sum(), (y[mask] ** 2).sum(), (residuals[mask] ** 2).sum()]
+
+    metrics = {}
+    for split, (n, total, total_sq, sse) in sums.items():
+        sst = total_sq - total ** 2 / n if n else 0.0
+        metrics[f"{split}_r2"] = float(1 - sse / sst) if sst > 0 else None
+        metrics[f"n_{split}"] = int(n)
+    return model, metrics
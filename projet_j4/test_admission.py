@@ -0,0 +1,64 @@
+import threading
+import time
+import pytest
+from admission import AdmissionController, Overloaded, BULK, PRIORITY
+
+def test_small_requests_bypass_a_saturated_bulk_lane():
+    admission = AdmissionController(max_rows_in_flight=100, max_queue=1, queue_timeout=0.05,
+                                    priority_max_rows=10)
+    batch = admission.acquire(100)
+    assert batch.lane == BULK
+
+    with admission.admit(1) as small:
+        assert small.lane == PRIORITY
+
+    with pytest.raises(Overloaded) as rejected:
+        admission.acquire(50)
+    assert rejected.value.reason == "queue_timeout"
+    assert rejected.value.retry_after == 1
+    admission.release(batch)
+    assert admission.stats()["rows_in_flight"] == 0
+
+def test_full_queue_is_rejected_immediately():
+    admission = AdmissionController(max_rows_in_flight=100, max_queue=1, queue_timeout=5,
+                                    priority_max_rows=0)
+    batch = admission.acquire(100)
+    waiter = threading.Thread(target=lambda: admission.release(admission.acquire(10)))
+    waiter.start()
+    while admission.stats()["queued_now"] == 0:
+        time.sleep(0.001)
+
+    start = time.perf_counter()
+    with pytest.raises(Overloaded) as rejected:
+        admission.acquire(10)
+    assert rejected.value.reason == "queue_full"
+    assert time.perf_counter() - start < 1
+
+    admission.release(batch)
+    waiter.join(timeout=5)
+    assert admission.stats()["admitted"][BULK] == 2
+    assert admission.stats()["rejected"] == {"queue_full": 1}
+
+def test_oversized_batch_runs_alone_instead_of_never():
+    admission = AdmissionController(max_rows_in_flight=100, priority_max_rows=0)
+    ticket = admission.acquire(10_000)
+    assert ticket.rows == 100
+    assert admission.try_acquire(1) is None
+    admission.release(ticket)
+    assert admission.try_acquire(1) is not None
+
+def test_try_acquire_rejects_a_full_queue_and_reserves_places():
+    admission = AdmissionController(max_rows_in_flight=100, max_queue=1, queue_timeout=0.05,
+                                    priority_max_rows=0)
+    batch = admission.acquire(100)
+
+    assert admission.try_acquire(10, reserve=True) is None
+    assert admission.stats()["queued_now"] == 1
+    with pytest.raises(Overloaded) as rejected:
+        admission.try_acquire(10)  # La place réservée compte : file pleine sans attendre
+    assert rejected.value.reason == "queue_full"
+
+    admission.release(batch)
+    ticket = admission.acquire(10, reserved=True)
+    assert ticket.lane == BULK
+    assert admission.stats()["queued_now"] == 0
@@ -0,0 +1,111 @@
+import gzip
+import io
+import json
+import numpy as np
+import pytest
+import app as house_api
+from app import app
+
+def test_predict_batch_returns_per_row_errors_in_order():
+    client = app.test_client()
+    houses = [{"taille": 150, "nb_chambres": 3, "jardin": True},
+              {"taille": "grand", "nb_chambres": 2},
+              {"nb_chambres": 2},
+              {"taille": 80, "nb_chambres": 2}]
+    response = client.post('/predict_batch?engine=rules', json={"houses": houses})
+
+    assert response.status_code == 200
+    predictions = response.get_json()["predictions"]
+    assert [p.get("prix_predit") for p in predictions] == [350000.0, None, None, 226000.0]
+    assert "error" in predictions[1] and "error" in predictions[2]
+    assert response.get_json()["errors"] == 2
+
+def test_predict_batch_accepts_and_returns_gzip():
+    client = app.test_client()
+    columns = {"taille": [100.0] * 2000, "nb_chambres": [2] * 2000, "jardin": [False] * 2000}
+    response = client.post('/predict_batch?engine=rules', data=gzip.compress(json.dumps(columns).encode()),
+                           headers={"Content-Encoding": "gzip", "Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    payload = json.loads(gzip.decompress(response.data))
+    assert payload["prix_predit"] == [250000.0] * 2000
+    assert payload["errors"] == []
+
+def test_predict_batch_rejects_non_scalar_cells_per_row():
+    client = app.test_client()
+    response = client.post('/predict_batch?engine=rules',
+                           json={"taille": [[1, 2], [3, 4]], "nb_chambres": [2, 3], "jardin": [False, True]})
+
+    assert response.status_code == 200
+    payload = response.get_json()
+    assert payload["prix_predit"] == [None, None]
+    assert [error["index"] for error in payload["errors"]] == [0, 1]
+
+    response = client.post('/predict_batch?engine=rules', json={"houses": [
+        {"taille": 100, "nb_chambres": 2, "jardin": [True]},
+        {"taille": [100], "nb_chambres": 2},
+        {"taille": 100, "nb_chambres": 2},
+    ]})
+    predictions = response.get_json()["predictions"]
+    assert "error" in predictions[0] and "error" in predictions[1]
+    assert predictions[2]["prix_predit"] == 250000.0
+
+def test_predict_batch_echoes_rows_that_are_not_objects():
+    client = app.test_client()
+    response = client.post('/predict_batch?engine=rules',
+                           json={"houses": [{"taille": 100, "nb_chambres": 2}, [100, 2], "maison"]})
+
+    predictions = response.get_json()["predictions"]
+    assert predictions[0]["prix_predit"] == 250000.0
+    assert predictions[1] == {"error": "Chaque maison doit être un objet JSON", "house": [100, 2]}
+    assert predictions[2]["house"] == "maison"
+
+@pytest.mark.parametrize("gzipped", [False, True])
+def test_predict_batch_bounds_the_received_body(monkeypatch, gzipped):
+    monkeypatch.setattr(house_api, "MAX_BODY_BYTES", 1000)
+    rng = np.random.default_rng(0)  # Valeurs peu compressibles : le corps gzip dépasse aussi la limite
+    columns = {"taille": rng.uniform(50, 250, 500).tolist(), "nb_chambres": [2] * 500, "jardin": [False] * 500}
+    body = json.dumps(columns).encode()
+    headers = {}
+    if gzipped:
+        body = gzip.compress(body)
+        headers["Content-Encoding"] = "gzip"
+    assert len(body) > 1000
+
+    response = app.test_client().post('/predict_batch?engine=rules', data=body, headers=headers)
+    assert response.status_code == 413
+    assert response.get_json()["status"] == "error"
+
+def test_read_limited_stops_a_body_without_content_length():
+    stream = io.BytesIO(b"x" * 5000)
+    assert house_api.read_limited(io.BytesIO(b"x" * 100), 100) == b"x" * 100
+    with pytest.raises(house_api.BatchError) as rejected:
+        house_api.read_limited(stream, 1000)
+    assert rejected.value.status == 413
+    assert stream.tell() <= 1001
+
+def test_predict_batch_validates_each_cell_independently_of_the_batch():
+    client = app.test_client()
+    for taille in (["150", 120], ["150", "abc"]):
+        response = client.post('/predict_batch?engine=rules',
+                               json={"taille": taille, "nb_chambres": [3, 2], "jardin": [False, False]})
+        payload = response.get_json()
+        assert response.status_code == 200
+        assert payload["prix_predit"][0] is None
+        assert payload["errors"][0]["index"] == 0
+
+    response = client.post('/predict_batch?engine=rules', json={"houses": [
+        {"taille": "150", "nb_chambres": 3}, {"taille": True, "nb_chambres": 3}, {"taille": 150, "nb_chambres": 3}]})
+    predictions = response.get_json()["predictions"]
+    assert predictions[0]["house"] == {"taille": "150", "nb_chambres": 3} and "error" in predictions[1]
+    assert predictions[2]["prix_predit"] == 325000.0
+
+def test_predict_batch_rejects_an_oversized_integer_at_its_index():
+    response = app.test_client().post('/predict_batch?engine=rules',
+                                      data='{"taille": [1' + '0' * 400 + ', 100], "nb_chambres": [2, 2]}',
+                                      content_type='application/json')
+
+    assert response.status_code == 200
+    payload = response.get_json()
+    assert payload["prix_predit"] == [None, 250000.0]
+    assert [error["index"] for error in payload["errors"]] == [0]
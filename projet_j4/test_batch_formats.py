@@ -0,0 +1,131 @@
+import os
+import numpy as np
+import pytest
+import batch_formats
+from batch_formats import ARROW_FILE, ARROW_STREAM, MSGPACK, RAW_FLOAT64
+
+SIZES = np.array([0.01, np.nan, 0.05])
+P53 = np.array([0.002, 0.004, 0.009])
+VALID = np.isfinite(SIZES) & np.isfinite(P53)
+LABELS = np.array([0, 1])
+PROBABILITIES = np.array([0.25, 0.75])
+
+requires_pyarrow = pytest.mark.skipif(batch_formats.pa is None, reason="pyarrow absent")
+requires_msgpack = pytest.mark.skipif(batch_formats.msgpack is None, reason="msgpack absent")
+
+@pytest.mark.parametrize("content_type, expected", [
+    (None, None),
+    ("application/json", None),
+    ("application/json; charset=utf-8", None),
+    ("application/octet-stream", RAW_FLOAT64),
+    ("Application/Vnd.Apache.Arrow.Stream", ARROW_STREAM),
+    ("application/vnd.apache.arrow.file", ARROW_FILE),
+    ("application/x-msgpack", MSGPACK),
+])
+def test_negotiate(content_type, expected):
+    if expected in (ARROW_STREAM, ARROW_FILE) and batch_formats.pa is None:
+        pytest.skip("pyarrow absent")
+    if expected == MSGPACK and batch_formats.msgpack is None:
+        pytest.skip("msgpack absent")
+    assert batch_formats.negotiate(content_type) == expected
+
+@pytest.mark.parametrize("content_type, module", [
+    (ARROW_STREAM, "pa"), (ARROW_FILE, "pa"), (MSGPACK, "msgpack"),
+])
+def test_negotiate_rejects_formats_whose_dependency_is_missing(monkeypatch, content_type, module):
+    monkeypatch.setattr(batch_formats, module, None)
+    with pytest.raises(batch_formats.UnsupportedFormat):
+        batch_formats.negotiate(content_type)
+
+def test_missing_dependency_is_a_415(monkeypatch):
+    os.environ.setdefault("TUMOR_MODEL_WATCH_INTERVAL", "0")
+    from tumor_api_fixed import app
+
+    monkeypatch.setattr(batch_formats, "msgpack", None)
+    response = app.test_client().post('/predict_batch', data=b"\x80", content_type=MSGPACK)
+    assert response.status_code == 415
+    assert response.get_json()["status"] == "error"
+
+def test_raw_float64_round_trip():
+    body = np.column_stack([SIZES, P53]).astype('<f8').tobytes()
+    sizes, p53 = batch_formats.decode_columns(body, RAW_FLOAT64)
+    np.testing.assert_array_equal(sizes, SIZES)
+    np.testing.assert_array_equal(p53, P53)
+
+    out = np.frombuffer(batch_formats.encode_result(RAW_FLOAT64, LABELS, PROBABILITIES, VALID, "v1"),
+                        dtype='<f8').reshape(-1, 2)
+    np.testing.assert_array_equal(out[[0, 2]], [[0, 0.25], [1, 0.75]])
+    assert np.isnan(out[1]).all()
+
+def test_raw_float64_rejects_a_truncated_body():
+    with pytest.raises(ValueError):
+        batch_formats.decode_columns(b"\x00" * 24, RAW_FLOAT64)
+
+@requires_pyarrow
+@pytest.mark.parametrize("fmt", [ARROW_STREAM, ARROW_FILE])
+def test_arrow_round_trip(fmt):
+    pa = batch_formats.pa
+    table = pa.table({"size": SIZES, "p53_concentration": P53})
+    sink = pa.BufferOutputStream()
+    new_ipc = pa.ipc.new_stream if fmt == ARROW_STREAM else pa.ipc.new_file
+    with new_ipc(sink, table.schema) as writer:
+        writer.write_table(table)
+    body = sink.getvalue().to_pybytes()
+    assert body.startswith(b"ARROW1") == (fmt == ARROW_FILE)
+
+    sizes, p53 = batch_formats.decode_columns(body, fmt)
+    np.testing.assert_array_equal(sizes, SIZES)
+    np.testing.assert_array_equal(p53, P53)
+
+    encoded = pa.py_buffer(batch_formats.encode_result(fmt, LABELS, PROBABILITIES, VALID, "v1"))
+    result = (pa.ipc.open_stream if fmt == ARROW_STREAM else pa.ipc.open_file)(encoded).read_all()
+    assert result.column("is_cancerous").to_pylist() == [0, None, 1]
+    assert result.column("probability_cancerous").to_pylist() == [0.25, None, 0.75]
+    assert result.schema.metadata[b"model_version"] == b"v1"
+
+@requires_pyarrow
+def test_arrow_requires_both_columns():
+    pa = batch_formats.pa
+    table = pa.table({"size": SIZES})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    with pytest.raises(ValueError, match="p53_concentration"):
+        batch_formats.decode_columns(sink.getvalue().to_pybytes(), ARROW_STREAM)
+
+@requires_msgpack
+@pytest.mark.parametrize("encode_column", [
+    lambda column: column.astype('<f8').tobytes(),
+    lambda column: [None if np.isnan(v) else float(v) for v in column],
+])
+def test_msgpack_round_trip(encode_column):
+    msgpack = batch_formats.msgpack
+    body = msgpack.packb({"size": encode_column(SIZES), "p53_concentration": encode_column(P53)})
+    sizes, p53 = batch_formats.decode_columns(body, MSGPACK)
+    np.testing.assert_array_equal(sizes, SIZES)
+    np.testing.assert_array_equal(p53, P53)
+
+    result = msgpack.unpackb(batch_formats.encode_result(MSGPACK, LABELS, PROBABILITIES, VALID, "v1"))
+    assert np.frombuffer(result["is_cancerous"], dtype='<i8').tolist() == [0, -1, 1]
+    probabilities = np.frombuffer(result["probability_cancerous"], dtype='<f8')
+    np.testing.assert_array_equal(probabilities[[0, 2]], [0.25, 0.75])
+    assert np.isnan(probabilities[1])
+    assert (result["invalid_indices"], result["total"], result["model_version"]) == ([1], 3, "v1")
+
+@requires_msgpack
+def test_msgpack_rejects_columns_of_different_lengths():
+    body = batch_formats.msgpack.packb({"size": [0.01, 0.02], "p53_concentration": [0.002]})
+    with pytest.raises(ValueError):
+        batch_formats.decode_columns(body, MSGPACK)
+
+@requires_msgpack
+@pytest.mark.parametrize("size", [[[1, 2]], 0.01])
+def test_msgpack_rejects_columns_that_are_not_lists_of_numbers(size):
+    body = batch_formats.msgpack.packb({"size": size, "p53_concentration": [1]})
+    with pytest.raises(ValueError):
+        batch_formats.decode_columns(body, MSGPACK)
+
+    os.environ.setdefault("TUMOR_MODEL_WATCH_INTERVAL", "0")
+    from tumor_api_fixed import app
+    response = app.test_client().post('/predict_batch', data=body, content_type=MSGPACK)
+    assert response.status_code == 400
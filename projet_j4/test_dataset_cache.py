@@ -0,0 +1,56 @@
+import os
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from dataset_cache import DatasetCache, train_test_frames
+
+def test_cached_split_matches_train_test_split(tmp_path):
+    df = pd.read_csv('tumor_two_vars.csv')
+    expected = train_test_split(df[['size', 'p53_concentration']], df['is_cancerous'],
+                                test_size=0.2, random_state=42, stratify=df['is_cancerous'])
+    for _ in range(2):  # Conversion puis lecture depuis le cache
+        cached = train_test_frames('tumor_two_vars.csv', ['size', 'p53_concentration'], 'is_cancerous',
+                                   root=str(tmp_path))
+        for got, want in zip(cached, expected):
+            pd.testing.assert_index_equal(got.index, want.index)
+            np.testing.assert_array_equal(got.to_numpy(), want.to_numpy())
+
+def test_columns_are_memory_mapped_and_keyed_by_content(tmp_path):
+    csv_path = tmp_path / "houses.csv"
+    csv_path.write_text(open('houses.csv').read())
+    cache = DatasetCache(str(tmp_path / "cache"))
+
+    dataset = cache.open(str(csv_path), chunksize=7)
+    assert isinstance(dataset['price'], np.memmap)
+    pd.testing.assert_frame_equal(dataset.to_frame(), pd.read_csv(csv_path), check_dtype=False)
+
+    with open(csv_path, 'a') as f:
+        f.write("100.0,2,1,Nord,250000.0\n")
+    changed = cache.open(str(csv_path))
+    assert changed.directory != dataset.directory and len(changed) == len(dataset) + 1
+    assert len([d for d in os.listdir(cache.root) if not d.endswith('.json')]) == 2
+
+def test_dtypes_are_stable_across_chunks(tmp_path):
+    csv_path = tmp_path / "mixed.csv"
+    csv_path.write_text("n,code,label,flag\n"
+                        "1,10,a,True\n"
+                        "2,20,b,False\n"
+                        "3,Nord,,True\n"  # 'code' devient texte, 'label' manquant
+                        ",40,d,1\n")      # 'n' devient flottant, 'flag' n'est plus booléen
+    dataset = DatasetCache(str(tmp_path / "cache")).open(str(csv_path), chunksize=2)
+
+    assert dataset['n'].dtype == np.float64
+    assert dataset.text_columns == {"code", "label", "flag"}
+    assert os.listdir(dataset.directory).count("code.npy") == 1
+    pd.testing.assert_frame_equal(dataset.to_frame(), pd.read_csv(csv_path, dtype=object).astype(
+        {"n": float}), check_dtype=False)
+    assert pd.isna(dataset.to_frame()["label"][2])
+
+def test_header_only_csv_gives_an_empty_dataset(tmp_path):
+    csv_path = tmp_path / "empty.csv"
+    csv_path.write_text("size,p53_concentration\n")
+    dataset = DatasetCache(str(tmp_path / "cache")).open(str(csv_path))
+
+    assert len(dataset) == 0
+    assert dataset.columns == ["size", "p53_concentration"]
+    assert dataset.to_frame().shape == (0, 2)
@@ -1,7 +1,7 @@
 import requests
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
+from dataset_cache import train_test_frames
 import joblib
 
 # URLs des APIs
@@ -10,12 +10,9 @@ FIXED_API_URL = "http://localhost:5002"   # API avec scaler
 
 def get_test_examples():
     """Récupère les mêmes exemples que précédemment"""
-    df = pd.read_csv('tumor_two_vars.csv')
-    X = df[['size', 'p53_concentration']]
-    y = df['is_cancerous']
-    
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y
+    # 🗃️ Données et indices du split lus depuis le cache (mêmes lignes que train_test_split)
+    X_train, X_test, y_train, y_test = train_test_frames(
+        'tumor_two_vars.csv', ['size', 'p53_concentration'], 'is_cancerous'
     )
     
     examples = []
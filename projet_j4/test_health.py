@@ -0,0 +1,30 @@
+from health import HealthMonitor
+
+def test_check_runs_once_and_is_cached():
+    calls = []
+    monitor = HealthMonitor(lambda: calls.append(1) or {"ok": True}, interval=60, ttl=60)
+    for _ in range(10):
+        ok, details, _ = monitor.last_check()
+    assert ok and details == {"ok": True}
+    assert len(calls) == 1
+
+def test_failed_canary_makes_readiness_fail():
+    def failing():
+        raise RuntimeError("modèle absent")
+
+    monitor = HealthMonitor(failing, interval=60, ttl=60)
+    ready, payload = monitor.readiness()
+    assert not ready
+    assert payload["reasons"]["canary"] == "modèle absent"
+    assert monitor.liveness()["status"] == "alive"
+
+def test_marked_failure_flips_readiness_until_cleared():
+    monitor = HealthMonitor(lambda: {}, interval=60, ttl=60)
+    monitor.mark_unready("reload", "échec")
+    assert monitor.readiness()[0] is False
+    monitor.clear("reload")
+    assert monitor.readiness()[0] is True
+
+def test_stale_result_is_not_ready():
+    monitor = HealthMonitor(lambda: {}, interval=60, ttl=-1)
+    assert monitor.readiness()[0] is False
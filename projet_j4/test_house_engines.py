@@ -0,0 +1,26 @@
+import joblib
+import numpy as np
+import pandas as pd
+from house_engines import LinearPriceModel
+from app import app
+
+def test_compiled_model_matches_sklearn():
+    model = joblib.load("regression.joblib")
+    engine = LinearPriceModel.from_sklearn(model)
+    houses = pd.DataFrame({"size": [150, 80, 200.5], "nb_rooms": [3, 2, 4], "garden": [1, 0, 1]})
+    expected = np.round(model.predict(houses), 2)
+
+    columns = engine.predict_columns(houses["size"], houses["nb_rooms"], houses["garden"])
+    np.testing.assert_allclose(columns, expected, atol=0.01)
+    assert [engine.predict_one(*row) for row in houses.itertuples(index=False)] == columns.tolist()
+
+def test_engine_switch_per_request():
+    client = app.test_client()
+    house = {"taille": 150, "nb_chambres": 3, "jardin": True}
+
+    rules = client.post('/predict?engine=rules', json=house).get_json()
+    model = client.post('/predict?engine=model', json=house).get_json()
+    assert rules["prediction"]["prix_predit"] == 350000.0
+    assert model["engine"]["name"] == "model"
+    assert model["prediction"]["prix_predit"] != rules["prediction"]["prix_predit"]
+    assert client.post('/predict?engine=oracle', json=house).status_code == 400
@@ -0,0 +1,73 @@
+import asyncio
+import json
+import pytest
+import loadgen
+
+OK = b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nContent-Type: application/json\r\n\r\n{}"
+
+def _serving(response, delay=0.0):
+    """Serveur keep-alive minimal qui renvoie toujours la même réponse brute, après delay secondes"""
+    async def serve(reader, writer):
+        while True:
+            headers = await reader.readuntil(b"\r\n\r\n")
+            for line in headers.split(b"\r\n"):
+                if line.lower().startswith(b"content-length"):
+                    await reader.readexactly(int(line.split(b":")[1]))
+            if delay:
+                await asyncio.sleep(delay)
+            writer.write(response)
+            await writer.drain()
+    return serve
+
+def test_batch_mix_and_payloads():
+    sizes, weights = loadgen.parse_batch_mix("1:3,100:1")
+    assert sizes == [1, 100] and weights == [0.75, 0.25]
+    payloads = loadgen.build_payloads("tumor", sizes)
+    assert payloads[1][0] == "/predict" and "size" in json.loads(payloads[1][1])
+    assert payloads[100][0] == "/predict_batch" and len(json.loads(payloads[100][1])["tumors"]) == 100
+
+def test_closed_loop_reuses_pooled_connections():
+    async def scenario():
+        server = await asyncio.start_server(_serving(OK), "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            return await loadgen.run(f"http://127.0.0.1:{port}", concurrency=4, duration=0.3, warmup=0.05,
+                                       batch_mix="1:0.5,10:0.5")
+
+    report = asyncio.run(scenario())
+    assert report["statuses"] == {"200": report["requests"]} and report["requests"] > 0
+    assert report["connections_opened"] == 4
+    assert set(report["latency_ms"]) >= {"p50", "p95", "p99", "p999"}
+    assert set(report["latency_ms_by_batch_size"]) == {"1", "10"}
+
+def test_open_loop_measures_latency_from_the_scheduled_arrival():
+    async def scenario():
+        server = await asyncio.start_server(_serving(OK, delay=0.02), "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            # 200 req/s sur une seule connexion qui en sert au plus 50/s : les arrivées s'accumulent
+            return await loadgen.run(f"http://127.0.0.1:{port}", mode="open", rate=200, concurrency=1,
+                                     duration=0.3, warmup=0)
+
+    report = asyncio.run(scenario())
+    assert report["config"]["mode"] == "open" and report["config"]["rate"] == 200
+    assert report["statuses"] == {"200": report["requests"]} and report["requests"] > 20
+    assert report["connections_opened"] == 1
+    # Mesurée depuis l'envoi, chaque latence vaudrait ~20 ms ; l'attente d'une connexion libre compte aussi
+    assert report["latency_ms"]["p50"] >= 20
+    assert report["latency_ms"]["max"] > 100
+
+@pytest.mark.parametrize("response", [
+    b"HTTP/1.1 OK 200\r\nContent-Length: 2\r\n\r\n{}",
+    b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\nzz\r\n{}\r\n0\r\n\r\n",
+])
+def test_malformed_responses_are_recorded_as_failed_requests(response):
+    async def scenario():
+        server = await asyncio.start_server(_serving(response), "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            return await loadgen.run(f"http://127.0.0.1:{port}", concurrency=2, duration=0.2, warmup=0)
+
+    report = asyncio.run(scenario())
+    assert report["statuses"] == {}
+    assert report["errors"] == {"ValueError": report["requests"]} and report["requests"] > 0
@@ -0,0 +1,55 @@
+import contextvars
+import threading
+from metrics import ApiMetrics, MetricsRegistry
+
+def test_counter_sums_shards_of_all_threads():
+    registry = MetricsRegistry("test")
+    counter = registry.counter("requests_total", "Requêtes", ["endpoint"])
+
+    def work():
+        for _ in range(1000):
+            counter.inc("/predict")
+
+    threads = [threading.Thread(target=work) for _ in range(50)]  # > 32 : des tranches sont repliées
+    for thread in threads:
+        thread.start()
+        thread.join()
+
+    assert counter.collect() == {("/predict",): 50_000}
+    assert 'test_requests_total{endpoint="/predict"} 50000' in registry.render()
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry("test")
+    histogram = registry.histogram("seconds", "Durée", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+
+    lines = registry.render().splitlines()
+    assert 'test_seconds_bucket{le="0.1"} 2' in lines
+    assert 'test_seconds_bucket{le="1.0"} 3' in lines
+    assert 'test_seconds_bucket{le="+Inf"} 4' in lines
+    assert 'test_seconds_sum 3.65' in lines
+    assert 'test_seconds_count 4' in lines
+
+def test_error_response_without_exception_type_counts_as_http_status():
+    metrics = ApiMetrics("test")
+    metrics.error("/predict", ValueError("boom"))
+    metrics.observe_request("/predict", "POST", 500, 0.01)
+    metrics.observe_request("/predict", "POST", 400, 0.01)
+
+    assert metrics.errors.collect() == {("/predict", "ValueError"): 1, ("/predict", "http_400"): 1}
+
+def test_error_flag_belongs_to_its_own_request():
+    metrics = ApiMetrics("test")
+    failing, other = contextvars.Context(), contextvars.Context()  # Deux requêtes ASGI sur le même thread
+    failing.run(metrics.start_request)
+    other.run(metrics.start_request)
+
+    pool_context = failing.run(contextvars.copy_context)  # Comme run_in_pool : erreur levée dans un autre thread
+    worker = threading.Thread(target=pool_context.run, args=(metrics.error, "/predict", ValueError("boom")))
+    worker.start()
+    worker.join()
+    other.run(metrics.observe_request, "/predict", "POST", 400, 0.01)
+    failing.run(metrics.observe_request, "/predict", "POST", 500, 0.01)
+
+    assert metrics.errors.collect() == {("/predict", "ValueError"): 1, ("/predict", "http_400"): 1}
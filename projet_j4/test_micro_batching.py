@@ -0,0 +1,109 @@
+import os
+import threading
+import time
+import pytest
+from micro_batching import MicroBatcher
+
+def double_first_column(features):
+    return features[:, 0] * 2, features[:, 1]
+
+def test_each_caller_gets_its_own_result():
+    batcher = MicroBatcher(double_first_column, max_batch_size=8, max_latency_us=5000)
+    results = {}
+
+    def call(i):
+        results[i] = batcher.submit([i, i / 100])
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(40)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    batcher.close()
+
+    assert results == {i: (i * 2, pytest.approx(i / 100)) for i in range(40)}
+    stats = batcher.stats()
+    assert stats["rows"] == 40
+    assert stats["batches"] <= 40
+    assert 0 < stats["mean_fill_ratio"] <= 1
+    assert sum(stats["fill_ratio_histogram"].values()) == stats["batches"]
+
+def test_errors_are_sent_to_every_caller():
+    def failing(features):
+        raise ValueError("boom")
+
+    batcher = MicroBatcher(failing, max_batch_size=4, max_latency_us=0)
+    with pytest.raises(ValueError):
+        batcher.submit([1.0, 2.0])
+    batcher.close()
+    assert batcher.stats()["errors"] == 1
+
+def test_submit_after_close_is_rejected():
+    batcher = MicroBatcher(double_first_column)
+    batcher.close()
+    with pytest.raises(RuntimeError):
+        batcher.submit([1.0, 2.0])
+
+def test_submit_times_out_when_the_batch_is_stuck():
+    release = threading.Event()
+
+    def blocked(features):
+        release.wait()
+        return double_first_column(features)
+
+    batcher = MicroBatcher(blocked, max_latency_us=0, timeout=0.05)
+    with pytest.raises(TimeoutError):
+        batcher.submit([1.0, 2.0])
+    release.set()
+    batcher.close()
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork indisponible")
+def test_forked_worker_starts_its_own_thread():
+    batcher = MicroBatcher(double_first_column, max_latency_us=0, timeout=5)
+    assert batcher.submit([1.0, 0.5]) == (2.0, 0.5)  # Thread démarré dans le parent avant le fork
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:  # Worker : aucun thread hérité, submit() doit en démarrer un
+        try:
+            label, _ = batcher.submit([21.0, 0.1])
+            os.write(write_fd, str(label).encode())
+        finally:
+            os._exit(0)
+    os.close(write_fd)
+    _, status = os.waitpid(pid, 0)
+    with os.fdopen(read_fd) as f:
+        assert f.read() == "42.0"
+    assert os.waitstatus_to_exitcode(status) == 0
+    batcher.close()
+
+def test_rows_are_scored_with_their_own_model():
+    def triple_first_column(features):
+        return features[:, 0] * 3, features[:, 1]
+
+    batcher = MicroBatcher(double_first_column, max_batch_size=8, max_latency_us=200_000, timeout=5)
+    models = [double_first_column, triple_first_column] * 2
+    results = {}
+
+    def call(i):
+        results[i] = batcher.submit([i, 0.0], predict_fn=models[i])
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(len(models))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    batcher.close()
+
+    assert results == {0: (0.0, 0.0), 1: (3.0, 0.0), 2: (4.0, 0.0), 3: (9.0, 0.0)}
+
+def test_submit_racing_close_fails_fast():
+    batcher = MicroBatcher(double_first_column, max_latency_us=0, timeout=5)
+    batcher.submit([1.0, 2.0])
+    batcher.close()
+    batcher._running = True  # Comme un submit() qui a passé le contrôle juste avant close()
+
+    start = time.perf_counter()
+    with pytest.raises(RuntimeError):
+        batcher.submit([1.0, 2.0])
+    assert time.perf_counter() - start < 1
@@ -0,0 +1,49 @@
+import joblib
+import numpy as np
+import pytest
+from model_registry import ModelNotFound, ModelRegistry, file_digest, load_artifacts, resolve_artifacts
+
+@pytest.fixture
+def registry(tmp_path):
+    return ModelRegistry(str(tmp_path / "models"))
+
+def test_register_publishes_incrementing_versions_with_manifest(registry):
+    model, scaler = joblib.load("tumor_model.joblib"), joblib.load("tumor_scaler.joblib")
+    first = registry.register("tumor", {"model": model, "scaler": scaler},
+                              feature_names=["size", "p53_concentration"], metrics={"test_accuracy": 0.97})
+    second = registry.register("tumor", {"model": model, "scaler": scaler})
+
+    assert (first["version"], second["version"]) == (1, 2)
+    assert registry.versions("tumor") == [1, 2]
+    assert registry.manifest("tumor", "v1")["metrics"] == {"test_accuracy": 0.97}
+    paths = registry.artifact_paths("tumor")
+    assert registry.manifest("tumor")["hash"] == file_digest(paths["model"], paths["scaler"])
+
+def test_load_memory_maps_arrays_and_verifies_hashes(registry):
+    registry.register("tumor", {"model": joblib.load("tumor_model.joblib")})
+    artifacts, manifest = registry.load("tumor", 1, verify=True)
+    assert isinstance(artifacts["model"].coef_, np.memmap)
+    assert artifacts["model"].predict(np.array([[0.5, 0.1]])).shape == (1,)
+
+    with open(registry.artifact_paths("tumor")["model"], "ab") as f:
+        f.write(b"corrompu")
+    with pytest.raises(ValueError):
+        registry.load("tumor", verify=True)
+
+def test_fallback_to_legacy_files_only_for_latest(registry):
+    paths, from_registry = resolve_artifacts("regression", fallback={"model": "regression.joblib"},
+                                             root=registry.root)
+    assert (paths, from_registry) == ({"model": "regression.joblib"}, False)
+    assert load_artifacts("regression", fallback=paths, root=registry.root)["model"].coef_.shape == (3,)
+    with pytest.raises(ModelNotFound):
+        resolve_artifacts("regression", 2, fallback=paths, root=registry.root)
+
+def test_bytes_artifacts_are_stored_verbatim(registry):
+    from tumor_inference import CompiledTumorModel, load_compiled_model
+    payload = load_compiled_model().to_bytes()
+    registry.register("tumor", {"model": joblib.load("tumor_model.joblib"), "pipeline": payload})
+
+    assert registry.artifact_paths("tumor")["pipeline"].endswith("pipeline.bin")
+    artifacts, _ = registry.load("tumor", verify=True)
+    assert artifacts["pipeline"] == payload
+    assert CompiledTumorModel.from_bytes(artifacts["pipeline"])[0].predict_one(0.01, 0.002)[0] == 1
@@ -0,0 +1,51 @@
+import shutil
+import joblib
+import numpy as np
+import pytest
+from model_watcher import ModelWatcher, load_bundle, validate_bundle
+
+CANARY = np.array([[0.012, 0.0019], [0.02, 0.004], [0.03, 0.008]])
+
+@pytest.fixture
+def artifacts(tmp_path):
+    model_path = tmp_path / "tumor_model.joblib"
+    scaler_path = tmp_path / "tumor_scaler.joblib"
+    shutil.copy("tumor_model.joblib", model_path)
+    shutil.copy("tumor_scaler.joblib", scaler_path)
+    return str(model_path), str(scaler_path)
+
+def test_flipped_model_fails_canary_accuracy(artifacts):
+    bundle = load_bundle(*artifacts)
+    labels, _ = bundle.compiled.predict_with_proba(CANARY)
+    validate_bundle(bundle, CANARY, labels, min_accuracy=1.0)
+
+    bundle.model.coef_ = -bundle.model.coef_
+    bundle.model.intercept_ = -bundle.model.intercept_
+    flipped = type(bundle)(bundle.model, bundle.scaler, "flipped")
+    with pytest.raises(ValueError):
+        validate_bundle(flipped, CANARY, labels, min_accuracy=1.0)
+
+def test_reload_waits_for_stable_files_then_swaps(artifacts):
+    model_path, scaler_path = artifacts
+    watcher = ModelWatcher(model_path, scaler_path, CANARY, interval=0)
+    old_version = watcher.current.version
+
+    model = joblib.load(model_path)
+    model.coef_ = model.coef_ * 1.01
+    joblib.dump(model, model_path)
+
+    assert watcher.poll() is False  # Changement vu une première fois : on attend la stabilité
+    assert watcher.current.version == old_version
+    assert watcher.poll() is True
+    assert watcher.current.version != old_version
+    assert watcher.reloads == 1
+
+def test_pipeline_bundle_loads_without_sklearn_objects(artifacts, tmp_path):
+    from tumor_inference import load_compiled_model, save_pipeline
+    pipeline_path = str(tmp_path / "tumor_pipeline.bin")
+    save_pipeline(load_compiled_model(*artifacts), pipeline_path)
+
+    watcher = ModelWatcher(pipeline_path, None, CANARY, interval=0)
+    assert watcher.current.model is None and watcher.status()["source"] == {"pipeline": pipeline_path}
+    expected = load_bundle(*artifacts).compiled.predict_with_proba(CANARY)[1]
+    np.testing.assert_allclose(watcher.current.compiled.predict_with_proba(CANARY)[1], expected)
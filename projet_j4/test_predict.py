@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+from predict import predict, predict_columns, predict_multiple, predict_multiple_columnar
+
+def test_vectorized_prices_match_scalar_predict():
+    rng = np.random.default_rng(0)
+    taille = np.round(rng.uniform(10, 500, 10_000), 2)
+    nb_chambres = rng.integers(1, 10, 10_000)
+    jardin = rng.random(10_000) < 0.5
+
+    expected = [predict(t, c, j) for t, c, j in zip(taille.tolist(), nb_chambres.tolist(), jardin.tolist())]
+    np.testing.assert_array_equal(predict_columns(taille, nb_chambres, jardin), expected)
+
+def test_columnar_output_matches_predict_multiple():
+    houses = [{"taille": 150, "nb_chambres": 3, "jardin": True},
+              {"taille": 80, "nb_chambres": 2, "jardin": False}]
+    columns = {key: [house[key] for house in houses] for key in houses[0]}
+
+    result = predict_multiple_columnar(columns)
+    assert result["prix_predit"].tolist() == [p["prix_predit"] for p in predict_multiple(houses)]
+
+    frame = predict_multiple_columnar(pd.DataFrame(houses))
+    assert frame["prix_predit"].tolist() == result["prix_predit"].tolist()
@@ -0,0 +1,40 @@
+import pytest
+from prediction_cache import PredictionCache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_least_recently_used_entry_is_evicted():
+    cache = PredictionCache(max_entries=2, ttl=0)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" devient la moins récemment utilisée
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get_many(["a", "c"]) == [1, 3]
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 1
+    assert (stats["hits"], stats["misses"]) == (3, 1)
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = PredictionCache(ttl=10, clock=clock)
+    cache.put("a", 1)
+    clock.now = 9.9
+    assert cache.get("a") == 1
+    clock.now = 10.0
+    assert cache.get_many(["a"]) == [None]
+    assert cache.stats()["expirations"] == 1
+
+def test_key_quantizes_features_and_includes_model_version():
+    cache = PredictionCache(decimals=6)
+    assert cache.key("v1", 0.0120000001, "0.0019") == cache.key("v1", 0.012, 0.0019)
+    assert cache.key("v1", 0.012, 0.0019) != cache.key("v2", 0.012, 0.0019)
+    with pytest.raises(ValueError):
+        cache.key("v1", "abc", 0.0019)
@@ -0,0 +1,62 @@
+import gc
+import os
+import signal
+import time
+import pytest
+from prefork_server import PreforkServer, RequestProgress
+
+def hello_app(environ, start_response):
+    start_response('200 OK', [('Content-Type', 'text/plain')])
+    return [b"hello ", b"world"]
+
+def test_idle_worker_is_not_stalled():
+    progress = RequestProgress()
+    progress.last_progress -= 60
+    assert not progress.stalled(1.0)
+
+def test_requests_without_progress_stall_the_heartbeat():
+    server = PreforkServer(hello_app, "127.0.0.1", 0, 1, heartbeat_timeout=1.0)
+    progress = RequestProgress()
+    progress.started()
+
+    server._heartbeat(0, progress)
+    assert server.table.heartbeats[0] > 0
+
+    server.table.heartbeats[0] = 0.0
+    progress.last_progress -= 5  # Plus aucune réponse ni aucun morceau depuis 5 s
+    server._heartbeat(0, progress)
+    assert server.table.heartbeats[0] == 0.0
+
+def test_worker_app_tracks_each_request_until_its_body_is_sent():
+    server = PreforkServer(hello_app, "127.0.0.1", 0, 1)
+    progress = RequestProgress()
+    worker_app = server._wrap(0, progress)
+
+    body = worker_app({"PATH_INFO": "/predict"}, lambda status, headers: None)
+    assert progress.in_flight == 1
+    assert b"".join(body) == b"hello world"
+    assert progress.in_flight == 0
+    assert server.table.requests[0] == 1
+
+class CrashingServer(PreforkServer):
+    def _worker_main(self, slot):
+        raise RuntimeError("artefact illisible")
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork indisponible")
+def test_crash_loop_is_logged_backed_off_and_abandoned(capfd):
+    handlers = {signum: signal.getsignal(signum) for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP)}
+    server = CrashingServer(hello_app, "127.0.0.1", 0, 1, crash_backoff=0.01, max_crashes=3)
+    try:
+        start = time.perf_counter()
+        assert server.run() == 1
+        assert time.perf_counter() - start < 10
+    finally:
+        for signum, handler in handlers.items():
+            signal.signal(signum, handler)
+        gc.unfreeze()
+
+    captured = capfd.readouterr()
+    assert "RuntimeError: artefact illisible" in captured.err
+    assert "a échoué 3 fois d'affilée" in captured.out
+    assert server.table.restarts[0] == 2
+    assert server.workers == {}
@@ -0,0 +1,56 @@
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+import score_csv
+
+def write_input(path, n_rows=25):
+    data = pd.read_csv("tumor_two_vars.csv").head(n_rows)
+    data['size'] = data['size'].astype(object)
+    data.loc[3, 'size'] = "grand"
+    data.loc[7, 'p53_concentration'] = None
+    data.to_csv(path, index=False)
+    return data
+
+def test_csv_is_scored_in_chunks_and_keeps_ground_truth(tmp_path):
+    source = write_input(tmp_path / "in.csv")
+    total, _ = score_csv.score_file(str(tmp_path / "in.csv"), str(tmp_path / "out.csv"), chunk_size=10)
+
+    scored = pd.read_csv(tmp_path / "out.csv")
+    assert total == len(scored) == 25
+    assert list(scored.columns) == list(source.columns) + ["probability_cancerous", "predicted_is_cancerous"]
+    assert scored["is_cancerous"].tolist() == source["is_cancerous"].tolist()
+    assert scored.loc[[3, 7], ["probability_cancerous", "predicted_is_cancerous"]].isna().all().all()
+    valid = scored.drop(index=[3, 7])
+    assert valid["predicted_is_cancerous"].isin([0, 1]).all()
+    assert ((valid["probability_cancerous"] > 0.5) == (valid["predicted_is_cancerous"] == 1)).all()
+
+def test_workers_give_the_same_output_in_the_same_order(tmp_path):
+    write_input(tmp_path / "in.csv")
+    score_csv.score_file(str(tmp_path / "in.csv"), str(tmp_path / "seq.csv"), chunk_size=4)
+    score_csv.score_file(str(tmp_path / "in.csv"), str(tmp_path / "par.csv"), chunk_size=4, workers=2)
+    assert (tmp_path / "seq.csv").read_text() == (tmp_path / "par.csv").read_text()
+
+def test_parquet_output_survives_dtypes_changing_between_chunks(tmp_path):
+    pytest.importorskip("pyarrow")
+    data = pd.DataFrame({
+        "size": [0.01, 0.02, 0.03, 0.04],
+        "p53_concentration": [0.002, 0.003, 0.004, 0.005],
+        "is_cancerous": [0, 1, None, 1],  # Entier dans le 1er paquet, flottant avec NaN dans le 2e
+        "note": [None, None, "revue", None],  # Vide dans le 1er paquet, texte dans le 2e
+    })
+    data.to_csv(tmp_path / "in.csv", index=False)
+
+    total, _ = score_csv.score_file(str(tmp_path / "in.csv"), str(tmp_path / "out.parquet"), chunk_size=2)
+
+    scored = pd.read_parquet(tmp_path / "out.parquet")
+    assert total == len(scored) == 4
+    assert scored["is_cancerous"].tolist()[:2] == [0, 1] and pd.isna(scored["is_cancerous"][2])
+    assert scored["note"].tolist()[2] == "revue"
+    assert np.isfinite(scored["probability_cancerous"]).all()
+
+def test_missing_feature_columns_stop_the_cli(tmp_path, monkeypatch):
+    pd.DataFrame({"size": [0.01]}).to_csv(tmp_path / "in.csv", index=False)
+    monkeypatch.setattr(sys, "argv", ["score_csv.py", str(tmp_path / "in.csv"), str(tmp_path / "out.csv")])
+    with pytest.raises(SystemExit, match="p53_concentration"):
+        score_csv.main()
@@ -0,0 +1,37 @@
+import threading
+import numpy as np
+from shadow import ShadowScorer
+
+def threshold_candidate(features):
+    probabilities = features[:, 0]
+    return (probabilities > 0.5).astype(np.int64), probabilities
+
+def test_disagreements_are_aggregated_off_the_request_path():
+    shadow = ShadowScorer(threshold_candidate, "seuil")
+    features = np.array([[0.9, 0.0], [0.2, 0.0], [0.7, 0.0]])
+    shadow.submit(features, np.array([1, 1, 1]), np.array([0.9, 0.6, 0.7]), 0.001)
+    shadow.submit((features[:, 0], features[:, 1]), np.array([1, 0, 1]), features[:, 0], 0.001)
+    shadow.drain()
+
+    stats = shadow.stats()
+    assert (stats["batches"], stats["rows"], stats["disagreements"]) == (2, 6, 1)
+    assert stats["recent_disagreements"][0]["candidate"] == {"label": 0, "probability": 0.2}
+    assert abs(stats["mean_abs_probability_diff"] - 0.4 / 6) < 1e-6
+
+def test_full_queue_drops_instead_of_blocking():
+    release = threading.Event()
+
+    def slow_candidate(features):
+        release.wait()
+        return threshold_candidate(features)
+
+    shadow = ShadowScorer(slow_candidate, max_queue=1)
+    batch = (np.array([[0.9, 0.0]]), np.array([1]), np.array([0.9]), 0.0)
+    for _ in range(5):
+        shadow.submit(*batch)
+    release.set()
+    shadow.drain()
+
+    stats = shadow.stats()
+    assert stats["dropped"] >= 3
+    assert stats["batches"] + stats["dropped"] == 5
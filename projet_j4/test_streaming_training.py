@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+from streaming_training import holdout_mask, train_sgd_classifier, train_sgd_regressor
+
+def test_holdout_is_stable_across_chunk_sizes():
+    whole = holdout_mask(0, 1000, 0.2)
+    pieces = np.concatenate([holdout_mask(start, 100, 0.2) for start in range(0, 1000, 100)])
+    np.testing.assert_array_equal(whole, pieces)
+    assert 0.15 < whole.mean() < 0.25
+
+def test_streaming_classifier_matches_in_memory_quality():
+    model, scaler, metrics = train_sgd_classifier('tumor_two_vars.csv', ['size', 'p53_concentration'],
+                                                  'is_cancerous', chunksize=100)
+    assert metrics["n_train"] + metrics["n_test"] == len(pd.read_csv('tumor_two_vars.csv'))
+    assert metrics["test_accuracy"] > 0.9
+    assert model.predict_proba(scaler.transform(pd.DataFrame({"size": [0.01], "p53_concentration": [0.002]}))).shape == (1, 2)
+
+def test_streaming_regressor_returns_raw_space_linear_regression():
+    model, metrics = train_sgd_regressor('houses.csv', ['size', 'nb_rooms', 'garden'], 'price', chunksize=8)
+    houses = pd.read_csv('houses.csv')
+    X = houses[['size', 'nb_rooms', 'garden']]
+    np.testing.assert_allclose(model.predict(X), X.to_numpy() @ model.coef_ + model.intercept_)
+    assert metrics["train_r2"] > 0
@@ -0,0 +1,37 @@
+import warnings
+import numpy as np
+import train_tumor_model as training
+
+def test_cv_folds_are_stratified_and_cached(tmp_path):
+    rng = np.random.default_rng(0)
+    X = rng.random((200, 2))
+    y = (rng.random(200) < 0.3).astype(int)
+
+    folds = training.cv_folds(X, y, n_splits=4, cache_dir=str(tmp_path))
+    assert sorted(np.unique(folds)) == [0, 1, 2, 3]
+    for fold in range(4):
+        assert abs(y[folds == fold].mean() - y.mean()) < 0.05
+    assert len(list(tmp_path.iterdir())) == 1
+    np.testing.assert_array_equal(training.cv_folds(X, y, n_splits=4, cache_dir=str(tmp_path)), folds)
+
+def test_fit_fold_scores_every_candidate():
+    rng = np.random.default_rng(1)
+    X = rng.random((120, 2))
+    y = (X[:, 0] > 0.5).astype(int)
+    folds = np.arange(120) % 3
+    training._init_search_worker(X, y, folds)
+
+    grid = list(training.candidates())
+    assert len(grid) == 2 * 5 * 4
+    candidate_id, fold, accuracy, loss, fit_seconds = training._fit_fold(0, grid[-1], 1)
+    assert (candidate_id, fold) == (0, 1) and 0 <= accuracy <= 1 and loss > 0 and fit_seconds >= 0
+
+def test_grid_fits_without_deprecated_arguments():
+    rng = np.random.default_rng(2)
+    X = rng.random((60, 2))
+    y = (X[:, 0] > 0.5).astype(int)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", FutureWarning)
+        for params in training.candidates():
+            scaler, model = training.build_pipeline(params)
+            model.fit(scaler.fit_transform(X), y)
@@ -0,0 +1,123 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+
+pytest.importorskip("starlette")
+os.environ.setdefault("TUMOR_MODEL_WATCH_INTERVAL", "0")
+from starlette.testclient import TestClient
+import tumor_api_asgi
+import tumor_service
+from admission import AdmissionController
+from tumor_api_asgi import app as asgi_app
+from tumor_api_fixed import app as flask_app
+
+TUMORS = [{"size": 0.01, "p53_concentration": 0.002},
+          {"size": 0.05, "p53_concentration": 0.009},
+          {"size": "grand", "p53_concentration": 0.004},
+          {"p53_concentration": 0.004}]
+
+@pytest.fixture
+def asgi_client():
+    return TestClient(asgi_app)
+
+@pytest.fixture
+def flask_client():
+    return flask_app.test_client()
+
+def without_cache_hits(payload):
+    # Les deux serveurs partagent le cache de tumor_service : seul ce compteur dépend de l'ordre des appels
+    payload.pop("cache_hits", None)
+    return payload
+
+@pytest.mark.parametrize("path, body", [
+    ('/predict', {"size": 0.03, "p53_concentration": 0.004}),
+    ('/predict', {"size": 0.03}),
+    ('/predict_batch', {"tumors": TUMORS}),
+    ('/predict_batch', {"tumors": []}),
+    ('/predict_batch', {"size": [0.01, None, 0.05], "p53_concentration": [0.002, 0.004, 0.009]}),
+    ('/predict_batch', {"size": [0.01, 0.02], "p53_concentration": [0.002]}),
+])
+def test_asgi_matches_flask_json_contract(asgi_client, flask_client, path, body):
+    flask_response = flask_client.post(path, json=body)
+    asgi_response = asgi_client.post(path, json=body)
+
+    assert asgi_response.status_code == flask_response.status_code
+    assert asgi_response.headers["content-type"] == flask_response.headers["content-type"]
+    assert without_cache_hits(asgi_response.json()) == without_cache_hits(flask_response.get_json())
+
+def test_asgi_matches_flask_on_invalid_json(asgi_client, flask_client):
+    headers = {"Content-Type": "application/json"}
+    flask_response = flask_client.post('/predict', data=b"{pas du json", headers=headers)
+    asgi_response = asgi_client.post('/predict', content=b"{pas du json", headers=headers)
+
+    assert asgi_response.status_code == flask_response.status_code == 400
+    assert asgi_response.json()["status"] == flask_response.get_json()["status"] == "error"
+
+def test_asgi_records_the_serialize_stage(asgi_client):
+    def serialize_count():
+        state = tumor_service.metrics.stage_seconds.collect().get(('/predict', 'serialize'))
+        return sum(state[:-1]) if state else 0
+
+    before = serialize_count()
+    asgi_client.post('/predict', json={"size": 0.03, "p53_concentration": 0.004})
+    assert serialize_count() == before + 1
+
+def test_asgi_stream_matches_flask(asgi_client, flask_client, monkeypatch):
+    monkeypatch.setattr(tumor_service, "STREAM_MAX_LINE_BYTES", 100)
+    body = b"\n".join([
+        b'{"id": 1, "size": 0.01, "p53_concentration": 0.002}',
+        b'{"id": 2, "size": "0.05", "p53_concentration": 0.009}',
+        b"z" * 5000,
+        b'{"id": 3, "size": 0.05, "p53_concentration": 0.009}',
+    ])
+    headers = {"Content-Type": "application/x-ndjson"}
+    flask_response = flask_client.post('/predict_stream', data=body, headers=headers)
+    asgi_response = asgi_client.post('/predict_stream', content=body, headers=headers)
+
+    assert asgi_response.status_code == flask_response.status_code == 200
+    assert asgi_response.headers["content-type"] == flask_response.headers["content-type"]
+    assert asgi_response.content == flask_response.data
+    assert b"Ligne trop longue" in asgi_response.content
+
+def test_error_raised_in_the_inference_pool_is_not_counted_twice(asgi_client, monkeypatch):
+    monkeypatch.setattr(tumor_api_asgi, "OFFLOAD_MIN_BYTES", 0)  # Décodage JSON dans le pool
+    errors = tumor_service.metrics.errors
+    before = errors.collect()
+
+    response = asgi_client.post('/predict', content=b"{pas du json", headers={"Content-Type": "application/json"})
+
+    assert response.status_code == 400
+    added = {key: count - before.get(key, 0) for key, count in errors.collect().items()
+             if key[0] == '/predict' and count != before.get(key, 0)}
+    assert sum(added.values()) == 1 and ('/predict', 'http_400') not in added
+
+def test_saturated_queue_answers_429_immediately(monkeypatch):
+    admission = AdmissionController(max_rows_in_flight=100, max_queue=1, queue_timeout=5, priority_max_rows=0)
+    monkeypatch.setattr(tumor_service, "admission", admission)
+    pool = ThreadPoolExecutor(max_workers=1)  # Un thread par place de la file, comme au démarrage
+    monkeypatch.setattr(tumor_api_asgi, "admission_pool", pool)
+    held = admission.acquire(100)  # Budget de lignes entièrement pris
+    body = {"tumors": TUMORS[:2]}
+
+    with TestClient(asgi_app) as client:
+        queued = {}
+        waiter = threading.Thread(target=lambda: queued.update(response=client.post('/predict_batch', json=body)))
+        waiter.start()
+        while admission.stats()["queued_now"] == 0:
+            time.sleep(0.001)
+
+        start = time.perf_counter()
+        rejected = client.post('/predict_batch', json=body)
+        elapsed = time.perf_counter() - start
+
+        admission.release(held)
+        waiter.join(timeout=10)
+    pool.shutdown()
+
+    assert rejected.status_code == 429 and elapsed < 1
+    assert rejected.headers["retry-after"] == "1"
+    assert queued["response"].status_code == 200
+    assert admission.stats()["rejected"] == {"queue_full": 1}
+    assert admission.stats()["rows_in_flight"] == 0
@@ -0,0 +1,106 @@
+import json
+import os
+import pytest
+
+os.environ.setdefault("TUMOR_MODEL_WATCH_INTERVAL", "0")
+import tumor_service
+from tumor_api_fixed import app
+
+SIZES = [0.01, 0.05, 0.03, 0.065]
+P53 = [0.002, 0.009, 0.004, 0.0105]
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+def test_columnar_batch_contract(client):
+    response = client.post('/predict_batch', json={"size": SIZES, "p53_concentration": P53})
+
+    assert response.status_code == 200
+    payload = response.get_json()
+    assert set(payload) == {"status", "format", "is_cancerous", "probability_cancerous",
+                            "invalid_indices", "total", "preprocessing", "model_version"}
+    assert (payload["status"], payload["format"], payload["total"]) == ("success", "columnar", 4)
+    assert payload["invalid_indices"] == []
+    assert all(label in (0, 1) for label in payload["is_cancerous"])
+    assert all(0.0 <= p <= 1.0 for p in payload["probability_cancerous"])
+
+def test_columnar_batch_matches_row_format(client):
+    columns = client.post('/predict_batch', json={"size": SIZES, "p53_concentration": P53}).get_json()
+    rows = client.post('/predict_batch', json={"tumors": [
+        {"size": s, "p53_concentration": p} for s, p in zip(SIZES, P53)
+    ]}).get_json()
+
+    assert columns["is_cancerous"] == [row["is_cancerous"] for row in rows["predictions"]]
+    assert columns["probability_cancerous"] == pytest.approx(
+        [row["probability_cancerous"] for row in rows["predictions"]], abs=1e-12)
+    assert columns["model_version"] == rows["model_version"]
+
+def test_columnar_batch_keeps_invalid_rows_aligned(client):
+    response = client.post('/predict_batch', json={"size": [0.01, None, 0.05],
+                                                   "p53_concentration": [0.002, 0.004, None]})
+
+    payload = response.get_json()
+    assert response.status_code == 200
+    assert payload["invalid_indices"] == [1, 2]
+    assert payload["is_cancerous"][1:] == [None, None]
+    assert payload["probability_cancerous"][1:] == [None, None]
+    assert payload["is_cancerous"][0] in (0, 1)
+
+@pytest.mark.parametrize("body", [
+    {"size": [0.01, 0.02], "p53_concentration": [0.002]},
+    {"size": [], "p53_concentration": []},
+    {"size": [0.01, "grand"], "p53_concentration": [0.002, 0.004]},
+    {"size": [0.01], "p53_concentration": 0.002},
+])
+def test_columnar_batch_rejects_malformed_columns(client, body):
+    response = client.post('/predict_batch', json=body)
+
+    assert response.status_code == 400
+    payload = response.get_json()
+    assert payload["status"] == "error" and payload["message"]
+
+def ndjson(data):
+    return [json.loads(line) for line in data.splitlines()]
+
+def test_stream_scores_each_line_and_reports_errors_in_place(client):
+    body = b"\n".join([
+        b'{"id": "a", "size": 0.01, "p53_concentration": 0.002}',
+        b'',
+        b'{"id": "b", "size": "0.05", "p53_concentration": 0.009}',
+        b'{"id": "c", "size": true, "p53_concentration": 0.009}',
+        b'{"id": "d", "p53_concentration": 0.009}',
+        b'{pas du json',
+        b'{"id": "e", "size": 0.05, "p53_concentration": 0.009}',
+    ])
+    response = client.post('/predict_stream', data=body, content_type='application/x-ndjson')
+
+    assert response.status_code == 200
+    rows = ndjson(response.data)
+    assert [row["index"] for row in rows[:-1]] == list(range(6))
+    assert [row.get("id") for row in rows[:-1]] == ["a", "b", "c", "d", None, "e"]
+    assert rows[1]["error"] == rows[2]["error"] == "Paramètres non numériques"
+    assert rows[3]["error"] == "Paramètres manquants"
+    assert rows[4]["error"].startswith("Ligne invalide")
+    assert rows[0]["is_cancerous"] in (0, 1) and rows[5]["is_cancerous"] in (0, 1)
+    assert rows[-1]["status"] == "done" and rows[-1]["total"] == 6
+
+def test_stream_rejects_overlong_lines_without_buffering_them(client, monkeypatch):
+    monkeypatch.setattr(tumor_service, "STREAM_MAX_LINE_BYTES", 100)
+    good = b'{"size": 0.01, "p53_concentration": 0.002}'
+    body = good + b"\n" + b"x" * 10_000 + b"\n" + good + b"\n" + b"y" * 10_000
+    response = client.post('/predict_stream', data=body, content_type='application/x-ndjson')
+
+    rows = ndjson(response.data)
+    assert rows[1]["error"] == rows[3]["error"] == "Ligne trop longue (plus de 100 octets)"
+    assert "is_cancerous" in rows[0] and "is_cancerous" in rows[2]
+    assert rows[-1]["total"] == 4
+
+def test_line_splitter_keeps_at_most_one_line_in_memory():
+    splitter = tumor_service.LineSplitter(max_line_bytes=10)
+    lines = []
+    for block in [b"abc\nde", b"f" * 50, b"g" * 50, b"\nhij\n", b"kl"]:
+        lines += splitter.feed(block)
+        assert len(splitter._pending) <= 10
+    lines += splitter.close()
+    assert lines == [b"abc", tumor_service.LINE_TOO_LONG, b"hij", b"kl"]
@@ -0,0 +1,82 @@
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from tumor_inference import CompiledTumorModel
+
+@pytest.fixture(scope="module")
+def pipeline():
+    model = joblib.load("tumor_model.joblib")
+    scaler = joblib.load("tumor_scaler.joblib")
+    return model, scaler, CompiledTumorModel.from_sklearn(model, scaler)
+
+@pytest.fixture(scope="module")
+def features():
+    df = pd.read_csv("tumor_two_vars.csv")
+    return df[['size', 'p53_concentration']].to_numpy()
+
+def test_predict_with_proba_matches_sklearn(pipeline, features):
+    model, scaler, compiled = pipeline
+    scaled = scaler.transform(features)
+    labels, probabilities = compiled.predict_with_proba(features)
+    np.testing.assert_array_equal(labels, model.predict(scaled))
+    np.testing.assert_allclose(probabilities, model.predict_proba(scaled)[:, 1], rtol=1e-12, atol=1e-12)
+
+def test_predict_one_matches_sklearn(pipeline, features):
+    model, scaler, compiled = pipeline
+    scaled = scaler.transform(features[:50])
+    expected_labels = model.predict(scaled)
+    expected_probabilities = model.predict_proba(scaled)[:, 1]
+    for row, label, probability in zip(features[:50], expected_labels, expected_probabilities):
+        predicted_label, predicted_probability = compiled.predict_one(*row)
+        assert predicted_label == label
+        assert predicted_probability == pytest.approx(probability, rel=1e-12, abs=1e-12)
+
+def test_scale_one_matches_scaler(pipeline, features):
+    _, scaler, compiled = pipeline
+    np.testing.assert_allclose(compiled.scale_one(*features[0]), scaler.transform(features[:1])[0])
+
+def test_extreme_values_do_not_overflow(pipeline):
+    _, _, compiled = pipeline
+    assert compiled.predict_one(1e6, -1e6)[1] in (0.0, 1.0)
+    assert compiled.predict_one(-1e6, 1e6)[1] in (0.0, 1.0)
+
+@pytest.mark.parametrize("values", [(0.01,), (0.01, 0.002, 0.5)])
+def test_single_row_requires_one_value_per_feature(pipeline, values):
+    _, _, compiled = pipeline
+    with pytest.raises(ValueError):
+        compiled.predict_one(*values)
+    with pytest.raises(ValueError):
+        compiled.scale_one(*values)
+
+def test_predict_columns_matches_matrix_path(pipeline, features):
+    _, _, compiled = pipeline
+    labels, probabilities = compiled.predict_with_proba(features)
+    column_labels, column_probabilities = compiled.predict_columns(features[:, 0], features[:, 1])
+    np.testing.assert_array_equal(column_labels, labels)
+    np.testing.assert_allclose(column_probabilities, probabilities, rtol=1e-12)
+
+def test_standard_scaler_is_folded_too(features):
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.preprocessing import StandardScaler
+    labels = pd.read_csv("tumor_two_vars.csv")["is_cancerous"].to_numpy()
+    scaler = StandardScaler().fit(features)
+    model = LogisticRegression().fit(scaler.transform(features), labels)
+    compiled = CompiledTumorModel.from_sklearn(model, scaler)
+
+    _, probabilities = compiled.predict_with_proba(features)
+    np.testing.assert_allclose(probabilities, model.predict_proba(scaler.transform(features))[:, 1],
+                               rtol=1e-9, atol=1e-12)
+
+def test_pipeline_artifact_round_trips_without_pickle(pipeline, features, tmp_path):
+    from tumor_inference import load_pipeline, save_pipeline
+    _, _, compiled = pipeline
+    path = str(tmp_path / "tumor_pipeline.bin")
+    save_pipeline(compiled, path, metadata={"test_accuracy": 0.97})
+
+    with open(path, 'rb') as f:
+        assert f.read(8) == b"TUMORPL1"
+    loaded = load_pipeline(path)
+    assert loaded.feature_names == ['size', 'p53_concentration']
+    np.testing.assert_array_equal(loaded.predict_with_proba(features)[1], compiled.predict_with_proba(features)[1])
+    assert loaded.predict_one(0.01, 0.002) == compiled.predict_one(0.01, 0.002)
@@ -1,12 +1,49 @@
+import argparse
+
 def build_model():
-    import pandas as pd 
     from sklearn.linear_model import LinearRegression
     import joblib
-    df = pd.read_csv('houses.csv')
+    from dataset_cache import open_dataset
+    df = open_dataset('houses.csv').to_frame()  # 🗃️ Cache binaire : pas de parsing CSV après le premier appel
     X = df[['size', 'nb_rooms', 'garden']]
     y = df['price']
     model = LinearRegression()
     model.fit(X, y)
     joblib.dump(model, "regression.joblib")
-    
-build_model()
\ No newline at end of file
+
+    # Nouvelle version dans le registre de modèles (models/regression)
+    from model_registry import ModelRegistry
+    ModelRegistry().register(
+        "regression", {"model": model},
+        feature_names=list(X.columns),
+        metrics={"train_r2": model.score(X, y), "n_samples": len(df)},
+    )
+
+def build_model_streaming(path='houses.csv', chunksize=100_000, epochs=20):
+    """Même modèle, entraîné par SGD en lisant le CSV par morceaux (fichiers plus gros que la RAM)"""
+    import joblib
+    from model_registry import ModelRegistry
+    from streaming_training import train_sgd_regressor
+
+    features = ['size', 'nb_rooms', 'garden']
+    model, metrics = train_sgd_regressor(path, features, 'price', chunksize=chunksize, epochs=epochs)
+    joblib.dump(model, "regression.joblib")  # Une LinearRegression, comme le mode en mémoire
+    ModelRegistry().register(
+        "regression", {"model": model},
+        feature_names=features,
+        metrics=metrics,
+        params={"mode": "streaming", "solver": "sgd", "chunksize": chunksize, "epochs": epochs},
+    )
+    print(f"✅ Régression entraînée en streaming: {metrics}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Entraînement de la régression des prix de maisons")
+    parser.add_argument("--streaming", action="store_true", help="Lecture par morceaux et SGD (mémoire bornée)")
+    parser.add_argument("--data", default="houses.csv")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--epochs", type=int, default=20)
+    args = parser.parse_args()
+    if args.streaming:
+        build_model_streaming(args.data, args.chunksize, args.epochs)
+    else:
+        build_model()
@@ -1,17 +1,66 @@
+import argparse
+import hashlib
+import inspect
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import MinMaxScaler
+from sklearn.model_selection import StratifiedKFold
+from sklearn.preprocessing import MinMaxScaler, StandardScaler
 from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+from sklearn.metrics import accuracy_score, classification_report, confusion_matrix, log_loss
 import joblib
+from model_registry import ModelRegistry
+from tumor_inference import CompiledTumorModel, save_pipeline
+from dataset_cache import open_dataset, train_test_frames
+
+PIPELINE_PATH = "tumor_pipeline.bin"
+
+# 🔎 Grille de la recherche d'hyperparamètres (les deux scalers sont servis par le noyau replié)
+SCALERS = {"minmax": MinMaxScaler, "standard": StandardScaler}
+PARAM_GRID = {
+    "scaler": list(SCALERS),
+    "C": [0.01, 0.1, 1.0, 10.0, 100.0],
+    # l1_ratio 0 = pénalité L2, 1 = pénalité L1, chacune avec les solveurs qui la supportent
+    "l1_ratio_solver": [(0.0, "lbfgs"), (0.0, "liblinear"), (1.0, "liblinear"), (1.0, "saga")],
+}
+# sklearn >= 1.8 : penalty= est déprécié, la pénalité se donne uniquement par l1_ratio
+PENALTY_DEPRECATED = inspect.signature(LogisticRegression).parameters["penalty"].default == "deprecated"
+
+def save_and_register(model, scaler, feature_names, metrics, params):
+    """
+    Sauvegarde le modèle, le scaler et le pipeline fusionné, puis publie la version dans le registre
+
+    Le pipeline fusionné (tumor_pipeline.bin : en-tête JSON + coefficients, sans
+    pickle) est ce que chargent les APIs ; les deux .joblib restent pour les
+    scripts qui utilisent sklearn directement.
+    """
+    joblib.dump(model, "tumor_model.joblib")
+    joblib.dump(scaler, "tumor_scaler.joblib")  # TRÈS IMPORTANT !
+    pipeline = CompiledTumorModel.from_sklearn(model, scaler)
+    metadata = {"metrics": metrics, "params": params}
+    save_pipeline(pipeline, PIPELINE_PATH, metadata)
+
+    # Nouvelle version dans le registre : modèle + scaler + pipeline publiés ensemble, avec leurs métriques
+    manifest = ModelRegistry().register(
+        "tumor", {"model": model, "scaler": scaler, "pipeline": pipeline.to_bytes(metadata)},
+        feature_names=feature_names,
+        metrics=metrics,
+        params=params,
+    )
+    print(f"✅ Version {manifest['version']} publiée dans le registre ({manifest['hash']})")
+    return manifest
 
 def train_tumor_model():
     """Entraîne un modèle pour prédire si une tumeur est cancéreuse"""
     
     # 1. Chargement des données
     print("📊 Chargement des données...")
-    df = pd.read_csv('tumor_two_vars.csv')
+    # 🗃️ Colonnes en cache binaire (mmap) : le CSV n'est parsé qu'au premier entraînement
+    dataset = open_dataset('tumor_two_vars.csv')
+    df = dataset.to_frame()
     print(f"Données chargées: {df.shape}")
     print(f"Colonnes: {df.columns.tolist()}")
     print(f"Répartition des classes: \n{df['is_cancerous'].value_counts()}")
@@ -23,9 +72,10 @@ def train_tumor_model():
     
     # 2. Train test split
     print("🔄 Division des données (train/test split)...")
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y
-    )
+    # Indices du découpage stockés dans le cache : mêmes lignes que train_test_split(..., stratify=y)
+    train_index, test_index = dataset.split(test_size=0.2, random_state=42, stratify='is_cancerous')
+    X_train, X_test = X.iloc[train_index], X.iloc[test_index]
+    y_train, y_test = y.iloc[train_index], y.iloc[test_index]
     print(f"Train set: {X_train.shape}")
     print(f"Test set: {X_test.shape}")
     print()
@@ -61,11 +111,15 @@ def train_tumor_model():
     
     # 5. Sauvegarde du modèle ET du scaler
     print("💾 Sauvegarde du modèle et du scaler...")
-    joblib.dump(model, "tumor_model.joblib")
-    joblib.dump(scaler, "tumor_scaler.joblib")  # TRÈS IMPORTANT !
-    
+    save_and_register(
+        model, scaler, list(X.columns),
+        metrics={"train_accuracy": train_accuracy, "test_accuracy": test_accuracy,
+                 "n_train": len(X_train), "n_test": len(X_test)},
+        params=model.get_params(),
+    )
     print("✅ Modèle sauvegardé dans 'tumor_model.joblib'")
     print("✅ Scaler sauvegardé dans 'tumor_scaler.joblib'")
+    print(f"✅ Pipeline fusionné sauvegardé dans '{PIPELINE_PATH}'")
     print()
     
     # Exemple de prédictions
@@ -85,5 +139,167 @@ def train_tumor_model():
         print(f"  ✅ Correct: {'Oui' if pred == real else 'Non'}")
         print()
 
+def train_tumor_model_streaming(path='tumor_two_vars.csv', chunksize=100_000, epochs=10):
+    """
+    Entraîne le modèle en lisant le CSV par morceaux (fichiers plus gros que la RAM)
+
+    MinMaxScaler.partial_fit puis SGDClassifier(loss="log_loss").partial_fit :
+    mêmes artefacts (modèle + scaler) que train_tumor_model, chargés tels quels par les APIs.
+    """
+    from streaming_training import train_sgd_classifier
+
+    print(f"📊 Entraînement en streaming sur {path} (morceaux de {chunksize} lignes, {epochs} epochs)...")
+    model, scaler, metrics = train_sgd_classifier(
+        path, ['size', 'p53_concentration'], 'is_cancerous', chunksize=chunksize, epochs=epochs
+    )
+    print(f"Accuracy sur train: {metrics['train_accuracy']:.4f}")
+    print(f"Accuracy sur test: {metrics['test_accuracy']:.4f}")
+
+    save_and_register(model, scaler, ['size', 'p53_concentration'], metrics,
+                      params={**model.get_params(), "mode": "streaming", "chunksize": chunksize, "epochs": epochs})
+
+def candidates(grid=PARAM_GRID):
+    """Toutes les combinaisons de la grille, sous forme de dicts de paramètres"""
+    for scaler, C, (l1_ratio, solver) in itertools.product(grid["scaler"], grid["C"], grid["l1_ratio_solver"]):
+        yield {"scaler": scaler, "C": C, "l1_ratio": l1_ratio, "solver": solver}
+
+def build_pipeline(params, random_state=42):
+    """(scaler, modèle) non entraînés pour un jeu de paramètres"""
+    if PENALTY_DEPRECATED:
+        penalty = {"l1_ratio": params["l1_ratio"]}
+    else:
+        penalty = {"penalty": "l1" if params["l1_ratio"] == 1 else "l2"}
+    model = LogisticRegression(C=params["C"], solver=params["solver"], max_iter=5000,
+                               random_state=random_state, **penalty)
+    return SCALERS[params["scaler"]](), model
+
+def cv_folds(X, y, n_splits=5, random_state=42, cache_dir=".cv_cache"):
+    """
+    Numéro de fold de chaque ligne (StratifiedKFold), mis en cache sur disque
+
+    La clé du cache est l'empreinte des données et des paramètres du découpage :
+    les mêmes données ne sont jamais redécoupées d'une exécution à l'autre.
+    """
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(X, dtype=np.float64).tobytes())
+    digest.update(np.ascontiguousarray(y).tobytes())
+    digest.update(f"{n_splits}:{random_state}".encode())
+    path = os.path.join(cache_dir, f"folds-{digest.hexdigest()[:16]}.npy")
+    if os.path.exists(path):
+        return np.load(path)
+
+    folds = np.empty(len(y), dtype=np.int8)
+    splitter = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+    for fold, (_, test_index) in enumerate(splitter.split(X, y)):
+        folds[test_index] = fold
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.save(f, folds)
+    os.replace(tmp_path, path)
+    return folds
+
+_worker_data = None
+
+def _init_search_worker(X, y, folds):
+    """Chaque processus reçoit les données et les folds une seule fois"""
+    global _worker_data
+    _worker_data = (X, y, folds)
+
+def _fit_fold(candidate_id, params, fold):
+    """Tâche exécutée dans un worker : entraîne un candidat sur un fold et le score sur le fold restant"""
+    X, y, folds = _worker_data
+    train, test = folds != fold, folds == fold
+    start = time.perf_counter()
+    scaler, model = build_pipeline(params)
+    model.fit(scaler.fit_transform(X[train]), y[train])
+    fit_seconds = time.perf_counter() - start
+    X_test = scaler.transform(X[test])
+    return (candidate_id, fold, accuracy_score(y[test], model.predict(X_test)),
+            log_loss(y[test], model.predict_proba(X_test), labels=model.classes_), fit_seconds)
+
+def search_tumor_model(path='tumor_two_vars.csv', n_splits=5, workers=None,
+                       leaderboard_path="tumor_leaderboard.csv", cache_dir=".cv_cache"):
+    """
+    Validation croisée stratifiée sur toute la grille, en parallèle sur plusieurs processus
+
+    Chaque tâche est un couple (candidat, fold) : assez de tâches pour occuper
+    tous les cœurs. Le meilleur candidat (accuracy moyenne, puis log loss) est
+    réentraîné sur tout le jeu d'entraînement, évalué sur le jeu de test puis
+    sauvegardé comme le modèle classique (fichiers .joblib + registre).
+    """
+    workers = os.cpu_count() if workers is None else workers
+    features = ['size', 'p53_concentration']
+    X_train, X_test, y_train, y_test = train_test_frames(path, features, 'is_cancerous')
+    X = X_train.to_numpy(np.float64)
+    y = y_train.to_numpy()
+    folds = cv_folds(X, y, n_splits, cache_dir=cache_dir)
+    grid = list(candidates())
+    tasks = [(i, params, fold) for i, params in enumerate(grid) for fold in range(n_splits)]
+    print(f"🔎 {len(grid)} candidats x {n_splits} folds = {len(tasks)} entraînements sur {workers or 1} processus...")
+
+    start = time.perf_counter()
+    results = []
+    if workers <= 1:
+        _init_search_worker(X, y, folds)
+        results = [_fit_fold(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_search_worker, initargs=(X, y, folds)) as pool:
+            futures = [pool.submit(_fit_fold, *task) for task in tasks]
+            results = [future.result() for future in as_completed(futures)]
+    elapsed = time.perf_counter() - start
+
+    scores = pd.DataFrame(results, columns=["candidate", "fold", "accuracy", "log_loss", "fit_seconds"])
+    leaderboard = scores.groupby("candidate").agg(
+        mean_accuracy=("accuracy", "mean"), std_accuracy=("accuracy", "std"),
+        mean_log_loss=("log_loss", "mean"), mean_fit_seconds=("fit_seconds", "mean"),
+    )
+    leaderboard = pd.DataFrame(grid).join(leaderboard).sort_values(
+        ["mean_accuracy", "mean_log_loss"], ascending=[False, True]
+    ).reset_index(drop=True)
+    leaderboard.insert(0, "rank", np.arange(1, len(leaderboard) + 1))
+    leaderboard.to_csv(leaderboard_path, index=False)
+    print(f"⏱️ Recherche terminée en {elapsed:.2f} s ({len(tasks) / elapsed:,.0f} entraînements/s)")
+    print(f"🏆 Classement sauvegardé dans '{leaderboard_path}' (10 premiers):")
+    print(leaderboard.head(10).to_string(index=False))
+    print()
+
+    # Meilleur candidat réentraîné sur tout le jeu d'entraînement
+    best = {key: leaderboard.loc[0, key] for key in ("scaler", "C", "l1_ratio", "solver")}
+    best["C"] = float(best["C"])
+    best["l1_ratio"] = float(best["l1_ratio"])
+    scaler, model = build_pipeline(best)
+    model.fit(scaler.fit_transform(X_train), y_train)
+    train_accuracy = accuracy_score(y_train, model.predict(scaler.transform(X_train)))
+    test_accuracy = accuracy_score(y_test, model.predict(scaler.transform(X_test)))
+    print(f"🥇 Meilleur: {best} | CV {leaderboard.loc[0, 'mean_accuracy']:.4f} | test {test_accuracy:.4f}")
+
+    save_and_register(
+        model, scaler, features,
+        metrics={"train_accuracy": train_accuracy, "test_accuracy": test_accuracy,
+                 "cv_accuracy": float(leaderboard.loc[0, "mean_accuracy"]),
+                 "cv_accuracy_std": float(leaderboard.loc[0, "std_accuracy"]),
+                 "n_train": len(X_train), "n_test": len(X_test)},
+        params={**best, "mode": "search", "n_splits": n_splits, "n_candidates": len(grid)},
+    )
+    return leaderboard
+
 if __name__ == "__main__":
-    train_tumor_model() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Entraînement du modèle de détection de tumeurs")
+    parser.add_argument("--streaming", action="store_true", help="Lecture par morceaux et SGD (mémoire bornée)")
+    parser.add_argument("--data", default="tumor_two_vars.csv")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--search", action="store_true",
+                        help="Validation croisée sur une grille d'hyperparamètres, en parallèle")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=-1, help="Processus de la recherche (-1 = tous les cœurs)")
+    parser.add_argument("--leaderboard", default="tumor_leaderboard.csv")
+    args = parser.parse_args()
+    if args.search:
+        search_tumor_model(args.data, args.folds, os.cpu_count() if args.workers < 0 else args.workers,
+                           args.leaderboard)
+    elif args.streaming:
+        train_tumor_model_streaming(args.data, args.chunksize, args.epochs)
+    else:
+        train_tumor_model()
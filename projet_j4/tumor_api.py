@@ -1,11 +1,18 @@
+import os
 from flask import Flask, jsonify, request
-import joblib
 import numpy as np
+from metrics import ApiMetrics
+from model_registry import load_artifacts
 
 app = Flask(__name__)
 
+# 📈 Requêtes, latence par étape, tailles de lot et erreurs sur /metrics
+metrics = ApiMetrics("tumor_api").instrument_flask(app)
+
 # Chargement du modèle (ATTENTION: on ne charge PAS le scaler pour l'instant)
-model = joblib.load("tumor_model.joblib")
+# 📦 Résolu dans le registre (models/tumor) s'il y est publié, sinon tumor_model.joblib
+model = load_artifacts("tumor", os.environ.get("TUMOR_MODEL_VERSION", "latest"),
+                       fallback={"model": "tumor_model.joblib"})["model"]
 
 @app.route('/')
 def home():
@@ -14,7 +21,8 @@ def home():
         "status": "API fonctionnelle",
         "endpoints": {
             "/predict": "POST - Prédire si une tumeur est cancéreuse",
-            "/predict_batch": "POST - Prédictions multiples"
+            "/predict_batch": "POST - Prédictions multiples",
+            "/metrics": "GET - Métriques Prometheus"
         }
     })
 
@@ -22,7 +30,8 @@ def home():
 def predict_tumor():
     """Prédire si une tumeur est cancéreuse (VERSION INCORRECTE - sans scaler)"""
     try:
-        data = request.json
+        with metrics.stage('/predict', 'json_parse'):
+            data = request.json
         size = data.get('size')
         p53_concentration = data.get('p53_concentration')
         
@@ -35,22 +44,26 @@ def predict_tumor():
         
         # Prédiction SANS preprocessing (c'est le problème !)
         features = np.array([[size, p53_concentration]])
-        prediction = model.predict(features)[0]
-        probability = model.predict_proba(features)[0]
+        with metrics.stage('/predict', 'predict'):
+            prediction = model.predict(features)[0]
+        with metrics.stage('/predict', 'predict_proba'):
+            probability = model.predict_proba(features)[0]
         
-        return jsonify({
-            "status": "success",
-            "prediction": {
-                "size": size,
-                "p53_concentration": p53_concentration,
-                "is_cancerous": int(prediction),
-                "is_cancerous_text": "Cancéreux" if prediction == 1 else "Non cancéreux",
-                "probability_cancerous": float(probability[1]),
-                "confidence": float(max(probability))
-            }
-        })
+        with metrics.stage('/predict', 'jsonify'):
+            return jsonify({
+                "status": "success",
+                "prediction": {
+                    "size": size,
+                    "p53_concentration": p53_concentration,
+                    "is_cancerous": int(prediction),
+                    "is_cancerous_text": "Cancéreux" if prediction == 1 else "Non cancéreux",
+                    "probability_cancerous": float(probability[1]),
+                    "confidence": float(max(probability))
+                }
+            })
         
     except Exception as e:
+        metrics.error('/predict', e)
         return jsonify({
             "status": "error",
             "message": f"Erreur lors de la prédiction: {str(e)}"
@@ -60,7 +73,8 @@ def predict_tumor():
 def predict_batch():
     """Prédictions multiples (VERSION INCORRECTE)"""
     try:
-        data = request.json
+        with metrics.stage('/predict_batch', 'json_parse'):
+            data = request.json
         tumors = data.get('tumors', [])
         
         if not tumors:
@@ -69,6 +83,7 @@ def predict_batch():
                 "message": "Le paramètre 'tumors' est requis et doit être une liste"
             }), 400
         
+        metrics.observe_batch('/predict_batch', len(tumors))
         predictions = []
         for tumor in tumors:
             size = tumor.get('size')
@@ -83,8 +98,10 @@ def predict_batch():
             
             # Prédiction SANS preprocessing
             features = np.array([[size, p53_concentration]])
-            prediction = model.predict(features)[0]
-            probability = model.predict_proba(features)[0]
+            with metrics.stage('/predict_batch', 'predict'):
+                prediction = model.predict(features)[0]
+            with metrics.stage('/predict_batch', 'predict_proba'):
+                probability = model.predict_proba(features)[0]
             
             predictions.append({
                 "size": size,
@@ -94,13 +111,15 @@ def predict_batch():
                 "probability_cancerous": float(probability[1])
             })
         
-        return jsonify({
-            "status": "success",
-            "predictions": predictions,
-            "total": len(predictions)
-        })
+        with metrics.stage('/predict_batch', 'jsonify'):
+            return jsonify({
+                "status": "success",
+                "predictions": predictions,
+                "total": len(predictions)
+            })
         
     except Exception as e:
+        metrics.error('/predict_batch', e)
         return jsonify({
             "status": "error",
             "message": f"Erreur lors des prédictions: {str(e)}"
@@ -0,0 +1,306 @@
+"""
+Variante ASGI de l'API de prédiction de tumeurs (mêmes routes et mêmes contrats JSON que tumor_api_fixed.py)
+
+L'inférence (décodage JSON compris) est CPU-bound : au-delà de quelques Ko de
+corps de requête, elle est déportée dans un pool de threads borné pour que la
+boucle asyncio reste disponible pour accepter les connexions. Les petites
+requêtes (une prédiction = quelques µs) sont traitées directement sur la
+boucle, le passage par le pool coûtant alors plus cher que le calcul.
+
+Lancement :
+    python tumor_api_asgi.py --workers 4 --inference-threads 8
+"""
+import argparse
+import asyncio
+import contextvars
+import functools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from starlette.applications import Starlette
+    from starlette.responses import Response
+    from starlette.routing import Route
+except ImportError as e:
+    raise ImportError("starlette n'est pas installé : pip install starlette uvicorn") from e
+
+import batch_formats
+import tumor_service
+from admission import Overloaded
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+
+INFERENCE_THREADS = int(os.environ.get("TUMOR_INFERENCE_THREADS", "4"))
+OFFLOAD_MIN_BYTES = int(os.environ.get("TUMOR_OFFLOAD_MIN_BYTES", str(16 * 1024)))
+
+# Pool borné partagé par toutes les requêtes de ce processus
+inference_pool = ThreadPoolExecutor(max_workers=INFERENCE_THREADS, thread_name_prefix="inference")
+
+# Attente dans la file d'admission hors de la boucle : un thread par place de la file
+admission_pool = None
+if tumor_service.admission is not None:
+    admission_pool = ThreadPoolExecutor(max_workers=max(1, tumor_service.admission.max_queue),
+                                        thread_name_prefix="admission")
+
+def json_response(result, endpoint=None):
+    """Transforme un couple (payload, code HTTP) de tumor_service en réponse ASGI"""
+    payload, status = result
+    if endpoint is None:
+        body = tumor_service.dumps(payload)
+    else:
+        with tumor_service.metrics.stage(endpoint, "serialize"):
+            body = tumor_service.dumps(payload)
+    return Response(body, status_code=status, media_type='application/json')
+
+def raw_response(result):
+    """Transforme un couple (corps, code, Content-Type, en-têtes) de tumor_service en réponse ASGI"""
+    body, status, content_type, headers = result
+    return Response(body, status_code=status, media_type=content_type, headers=headers)
+
+async def run_in_pool(func, *args):
+    """Exécute une fonction CPU-bound dans le pool d'inférence, avec le contexte de la requête"""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()  # run_in_executor ne propage pas les ContextVar
+    return await loop.run_in_executor(inference_pool, functools.partial(context.run, func, *args))
+
+def _decode_and_call(handler, body, endpoint):
+    try:
+        with tumor_service.metrics.stage(endpoint, "json_parse"):
+            data = tumor_service.loads(body)
+    except ValueError as e:
+        tumor_service.metrics.error(endpoint, e)
+        return tumor_service.error(f"Corps JSON invalide: {str(e)}", 400)
+    return handler(data)
+
+async def dispatch(handler, body, endpoint, blocking=False):
+    """Traite la requête sur la boucle si elle est petite, sinon dans le pool d'inférence"""
+    if blocking or len(body) >= OFFLOAD_MIN_BYTES:
+        return await run_in_pool(_decode_and_call, handler, body, endpoint)
+    return _decode_and_call(handler, body, endpoint)
+
+async def home(request):
+    return json_response(tumor_service.home(), '/')
+
+async def predict_tumor(request):
+    """Prédire si une tumeur est cancéreuse (VERSION CORRIGÉE - avec scaler)"""
+    body = await request.body()
+    # Avec le micro-batching, predict_one attend la fin du lot : jamais sur la boucle
+    blocking = tumor_service.micro_batcher is not None
+    result = await dispatch(tumor_service.predict_one, body, '/predict', blocking)
+    return json_response(result, '/predict')
+
+async def predict_batch(request):
+    """Prédictions multiples, au format lignes ('tumors') ou colonnes ('size'/'p53_concentration')"""
+    try:
+        fmt = batch_formats.negotiate(request.headers.get('content-type'))
+    except batch_formats.UnsupportedFormat as e:
+        return json_response(tumor_service.error(str(e), 415), '/predict_batch')
+    body = await request.body()
+    if fmt is not None:
+        if len(body) >= OFFLOAD_MIN_BYTES:
+            return raw_response(await run_in_pool(tumor_service.predict_batch_binary, body, fmt))
+        return raw_response(tumor_service.predict_batch_binary(body, fmt))
+    result = await dispatch(tumor_service.predict_batch, body, '/predict_batch')
+    return json_response(result, '/predict_batch')
+
+class PredictStream:
+    """
+    Scoring en flux NDJSON : les résultats partent dès qu'un paquet de lignes est scoré
+
+    Endpoint ASGI brut : StreamingResponse de Starlette consomme les messages
+    receive() pour détecter la déconnexion du client, ce qui empêche de lire
+    le corps de la requête pendant l'envoi de la réponse.
+    """
+
+    async def __call__(self, scope, receive, send):
+        if scope["method"] != "POST":
+            response = json_response(tumor_service.error("Méthode non autorisée", 405), scope["path"])
+            await response(scope, receive, send)
+            return
+
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"application/x-ndjson")],
+        })
+
+        bundle = tumor_service.current_bundle()  # Un seul couple pour tout le flux
+        splitter = tumor_service.LineSplitter()  # Longueur de ligne bornée : mémoire bornée
+        chunk, total = [], 0
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            more_body = message.get("more_body", False)
+            lines = splitter.feed(message.get("body", b""))
+            if not more_body:
+                lines += splitter.close()
+            for line in lines:
+                if not tumor_service.is_blank(line):
+                    chunk.append(line)
+                if len(chunk) >= tumor_service.STREAM_CHUNK_SIZE:
+                    await self._send_chunk(send, chunk, total, bundle)
+                    total += len(chunk)
+                    chunk = []
+
+        if chunk:
+            await self._send_chunk(send, chunk, total, bundle)
+            total += len(chunk)
+        await send({"type": "http.response.body", "body": tumor_service.stream_summary(total, bundle)})
+
+    @staticmethod
+    async def _send_chunk(send, chunk, first_index, bundle):
+        body = await run_in_pool(tumor_service.score_ndjson_chunk, chunk, first_index, bundle)
+        await send({"type": "http.response.body", "body": body, "more_body": True})
+
+async def micro_batching_stats(request):
+    return json_response(tumor_service.micro_batching_stats(), '/stats/micro_batching')
+
+async def cache_stats(request):
+    return json_response(tumor_service.cache_stats(), '/stats/cache')
+
+async def shadow_stats(request):
+    return json_response(tumor_service.shadow_stats(), '/stats/shadow')
+
+async def admission_stats(request):
+    return json_response(tumor_service.admission_stats(), '/stats/admission')
+
+async def model_status(request):
+    return json_response(tumor_service.model_status(), '/model')
+
+async def metrics(request):
+    """Métriques Prometheus (partagées avec tumor_service)"""
+    return Response(tumor_service.metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+async def health_check(request):
+    """Vérification de la santé de l'API (dernier test canari, mis en cache)"""
+    return json_response(tumor_service.health(), '/health')
+
+async def health_live(request):
+    return json_response(tumor_service.liveness(), '/health/live')
+
+async def health_ready(request):
+    return json_response(tumor_service.readiness(), '/health/ready')
+
+class RequestMetrics:
+    """Middleware ASGI : compte les requêtes et mesure leur durée totale (jusqu'au dernier octet envoyé)"""
+
+    def __init__(self, app, paths):
+        self.app = app
+        self.paths = set(paths)  # Chemins connus seulement : pas d'explosion du nombre de labels
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+        tumor_service.metrics.start_request()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            endpoint = scope["path"] if scope["path"] in self.paths else "unknown"
+            tumor_service.metrics.observe_request(endpoint, scope["method"], status,
+                                                  time.perf_counter() - start)
+
+def _release_abandoned_ticket(future):
+    """Client parti pendant l'attente dans la file : rend le ticket obtenu malgré tout"""
+    if not future.cancelled() and future.exception() is None:
+        tumor_service.admission.release(future.result())
+
+class AdmissionControl:
+    """Middleware ASGI : contrôle d'admission avant de lire le corps, 429 + Retry-After en cas de refus"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        admission = tumor_service.admission
+        if (admission is None or scope["type"] != "http"
+                or scope["path"] not in tumor_service.ADMITTED_ENDPOINTS):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        content_type = headers.get(b"content-type")
+        rows = tumor_service.estimate_rows(
+            scope["path"],
+            int(content_length) if content_length else None,
+            content_type.decode("latin-1") if content_type else None,
+        )
+        try:
+            # Décision sur la boucle (admis, ou file pleine -> 429 immédiat) ; sinon la place
+            # réservée dans la file est attendue dans un thread dédié
+            ticket = admission.try_acquire(rows, reserve=True)
+            if ticket is None:
+                loop = asyncio.get_running_loop()
+                waiting = loop.run_in_executor(admission_pool,
+                                               functools.partial(admission.acquire, rows, reserved=True))
+                try:
+                    ticket = await asyncio.shield(waiting)  # acquire() doit consommer la réservation
+                except asyncio.CancelledError:
+                    waiting.add_done_callback(_release_abandoned_ticket)
+                    raise
+        except Overloaded as e:
+            payload, status, extra_headers = tumor_service.overloaded(e)
+            response = json_response((payload, status), scope["path"])
+            response.headers.update(extra_headers)
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            admission.release(ticket)
+
+routes = [
+    Route('/', home),
+    Route('/predict', predict_tumor, methods=['POST']),
+    Route('/predict_batch', predict_batch, methods=['POST']),
+    Route('/predict_stream', PredictStream(), methods=['POST']),
+    Route('/stats/micro_batching', micro_batching_stats),
+    Route('/stats/cache', cache_stats),
+    Route('/stats/shadow', shadow_stats),
+    Route('/stats/admission', admission_stats),
+    Route('/metrics', metrics),
+    Route('/model', model_status),
+    Route('/health', health_check),
+    Route('/health/live', health_live),
+    Route('/health/ready', health_ready),
+]
+app = RequestMetrics(AdmissionControl(Starlette(routes=routes)), [route.path for route in routes])
+
+def main():
+    parser = argparse.ArgumentParser(description="API ASGI de prédiction de tumeurs")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5003)
+    parser.add_argument("--workers", type=int, default=1, help="Nombre de processus uvicorn")
+    parser.add_argument("--inference-threads", type=int, default=INFERENCE_THREADS,
+                        help="Taille du pool d'inférence par processus")
+    args = parser.parse_args()
+
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("❌ uvicorn n'est pas installé : pip install uvicorn")
+
+    # Les workers uvicorn ré-importent ce module : la taille du pool passe par l'environnement
+    os.environ["TUMOR_INFERENCE_THREADS"] = str(args.inference_threads)
+
+    print("🚀 Démarrage de l'API ASGI avec preprocessing MinMaxScaler")
+    print(f"⚙️ {args.workers} processus x {args.inference_threads} threads d'inférence")
+    uvicorn.run("tumor_api_asgi:app", host=args.host, port=args.port,
+                workers=args.workers, log_level="warning")
+
+if __name__ == '__main__':
+    main()
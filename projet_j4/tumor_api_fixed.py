@@ -1,168 +1,150 @@
-from flask import Flask, jsonify, request
-import joblib
-import numpy as np
+from flask import Flask, Response, g, request, stream_with_context
+from admission import Overloaded
+import batch_formats
+import tumor_service
 
 app = Flask(__name__)
 
-# Chargement du modèle ET du scaler (CORRECTION !)
-model = joblib.load("tumor_model.joblib")
-scaler = joblib.load("tumor_scaler.joblib")  # ✅ Maintenant on charge le scaler !
+# 📈 Requêtes, latence par étape, tailles de lot et erreurs sur /metrics
+metrics = tumor_service.metrics.instrument_flask(app)
+
+# Le modèle et le scaler (CORRECTION !) sont chargés par tumor_service,
+# partagé avec la variante ASGI (tumor_api_asgi.py), qui les recharge à chaud
+# après un nouvel entraînement
+
+def json_response(result):
+    """Transforme un couple (payload, code HTTP) de tumor_service en réponse Flask"""
+    payload, status = result
+    with metrics.stage(request.url_rule.rule, "serialize"):
+        body = tumor_service.dumps(payload)
+    return Response(body, status=status, mimetype='application/json')
+
+def read_json_body():
+    """Décode le corps JSON de la requête (avec orjson si disponible)"""
+    with metrics.stage(request.url_rule.rule, "json_parse"):
+        return tumor_service.loads(request.get_data(cache=False))
+
+def raw_response(result):
+    """Transforme un couple (corps, code, Content-Type, en-têtes) de tumor_service en réponse Flask"""
+    body, status, content_type, headers = result
+    return Response(body, status=status, content_type=content_type, headers=headers)
+
+@app.before_request
+def admit_request():
+    """🚦 Contrôle d'admission avant de lire le corps : 429 immédiat si le serveur est saturé"""
+    if tumor_service.admission is None or request.url_rule is None:
+        return None
+    endpoint = request.url_rule.rule
+    if endpoint not in tumor_service.ADMITTED_ENDPOINTS:
+        return None
+    rows = tumor_service.estimate_rows(endpoint, request.content_length, request.content_type)
+    try:
+        g.admission_ticket = tumor_service.admission.acquire(rows)
+    except Overloaded as e:
+        payload, status, headers = tumor_service.overloaded(e)
+        response = json_response((payload, status))
+        response.headers.update(headers)
+        return response
+    return None
+
+@app.teardown_request
+def release_admission(exc):
+    ticket = g.pop('admission_ticket', None)
+    if ticket is not None:
+        tumor_service.admission.release(ticket)
+
+def invalid_json(e):
+    metrics.error(request.url_rule.rule, e)
+    return json_response(tumor_service.error(f"Corps JSON invalide: {str(e)}", 400))
 
 @app.route('/')
 def home():
-    return jsonify({
-        "message": "🏥 API de prédiction de tumeurs cancéreuses (VERSION CORRIGÉE)",
-        "status": "API fonctionnelle avec preprocessing correct",
-        "preprocessing": "MinMaxScaler appliqué avant prédiction",
-        "endpoints": {
-            "/predict": "POST - Prédire si une tumeur est cancéreuse",
-            "/predict_batch": "POST - Prédictions multiples"
-        }
-    })
+    return json_response(tumor_service.home())
 
 @app.route('/predict', methods=['POST'])
 def predict_tumor():
     """Prédire si une tumeur est cancéreuse (VERSION CORRIGÉE - avec scaler)"""
     try:
-        data = request.json
-        size = data.get('size')
-        p53_concentration = data.get('p53_concentration')
-        
-        # Validation des données
-        if size is None or p53_concentration is None:
-            return jsonify({
-                "status": "error",
-                "message": "Les paramètres 'size' et 'p53_concentration' sont requis"
-            }), 400
-        
-        # ✅ CORRECTION: Appliquer le preprocessing (scaler) AVANT la prédiction
-        features_raw = np.array([[size, p53_concentration]])
-        features_scaled = scaler.transform(features_raw)  # 🔑 ÉTAPE CRUCIALE !
-        
-        # Prédiction avec les données normalisées
-        prediction = model.predict(features_scaled)[0]
-        probability = model.predict_proba(features_scaled)[0]
-        
-        return jsonify({
-            "status": "success",
-            "prediction": {
-                "size": size,
-                "p53_concentration": p53_concentration,
-                "size_scaled": float(features_scaled[0][0]),  # Montrer la donnée transformée
-                "p53_scaled": float(features_scaled[0][1]),   # Montrer la donnée transformée
-                "is_cancerous": int(prediction),
-                "is_cancerous_text": "Cancéreux" if prediction == 1 else "Non cancéreux",
-                "probability_cancerous": float(probability[1]),
-                "confidence": float(max(probability)),
-                "preprocessing_applied": "MinMaxScaler"
-            }
-        })
-        
-    except Exception as e:
-        return jsonify({
-            "status": "error",
-            "message": f"Erreur lors de la prédiction: {str(e)}"
-        }), 500
+        data = read_json_body()
+    except ValueError as e:
+        return invalid_json(e)
+    return json_response(tumor_service.predict_one(data))
 
 @app.route('/predict_batch', methods=['POST'])
 def predict_batch():
-    """Prédictions multiples (VERSION CORRIGÉE)"""
+    """Prédictions multiples, au format lignes ('tumors') ou colonnes ('size'/'p53_concentration')"""
     try:
-        data = request.json
-        tumors = data.get('tumors', [])
-        
-        if not tumors:
-            return jsonify({
-                "status": "error",
-                "message": "Le paramètre 'tumors' est requis et doit être une liste"
-            }), 400
-        
-        predictions = []
-        
-        # Préparer toutes les features pour un scaling en lot (plus efficace)
-        features_list = []
-        for tumor in tumors:
-            size = tumor.get('size')
-            p53_concentration = tumor.get('p53_concentration')
-            
-            if size is None or p53_concentration is None:
-                predictions.append({
-                    "error": "Paramètres manquants",
-                    "tumor": tumor
-                })
-                features_list.append(None)
-                continue
-            
-            features_list.append([size, p53_concentration])
-        
-        # Filtrer les features valides et appliquer le scaler
-        valid_features = [f for f in features_list if f is not None]
-        if valid_features:
-            features_array = np.array(valid_features)
-            features_scaled = scaler.transform(features_array)  # ✅ Scaling en lot
-            
-            # Faire les prédictions
-            predictions_array = model.predict(features_scaled)
-            probabilities_array = model.predict_proba(features_scaled)
-            
-            # Associer les résultats
-            valid_idx = 0
-            for i, (tumor, features) in enumerate(zip(tumors, features_list)):
-                if features is None:
-                    continue  # Déjà ajouté l'erreur
-                
-                prediction = predictions_array[valid_idx]
-                probability = probabilities_array[valid_idx]
-                
-                predictions.append({
-                    "size": tumor['size'],
-                    "p53_concentration": tumor['p53_concentration'],
-                    "is_cancerous": int(prediction),
-                    "is_cancerous_text": "Cancéreux" if prediction == 1 else "Non cancéreux",
-                    "probability_cancerous": float(probability[1]),
-                    "preprocessing_applied": "MinMaxScaler"
-                })
-                
-                valid_idx += 1
-        
-        return jsonify({
-            "status": "success",
-            "predictions": predictions,
-            "total": len(predictions),
-            "preprocessing": "MinMaxScaler appliqué sur tous les échantillons"
-        })
-        
-    except Exception as e:
-        return jsonify({
-            "status": "error",
-            "message": f"Erreur lors des prédictions: {str(e)}"
-        }), 500
+        fmt = batch_formats.negotiate(request.content_type)
+    except batch_formats.UnsupportedFormat as e:
+        return json_response(tumor_service.error(str(e), 415))
+    if fmt is not None:
+        return raw_response(tumor_service.predict_batch_binary(request.get_data(cache=False), fmt))
+
+    try:
+        data = read_json_body()
+    except ValueError as e:
+        return invalid_json(e)
+    return json_response(tumor_service.predict_batch(data))
+
+@app.route('/predict_stream', methods=['POST'])
+def predict_stream():
+    """Scoring en flux NDJSON : les résultats partent dès qu'un paquet de lignes est scoré"""
+    # request.stream est lu par blocs : le corps n'est jamais chargé en entier
+    results = tumor_service.predict_stream(tumor_service.iter_lines(request.stream))
+    # Le droit d'admission est rendu à la fin du flux, pas à la fin de la vue
+    ticket = g.pop('admission_ticket', None)
+    return Response(stream_with_context(_release_after(results, ticket)), mimetype='application/x-ndjson')
+
+def _release_after(results, ticket):
+    try:
+        yield from results
+    finally:
+        if ticket is not None:
+            tumor_service.admission.release(ticket)
+
+@app.route('/stats/micro_batching', methods=['GET'])
+def micro_batching_stats():
+    """Métriques de remplissage des lots du micro-batching de /predict"""
+    return json_response(tumor_service.micro_batching_stats())
+
+@app.route('/stats/cache', methods=['GET'])
+def cache_stats():
+    """Hits/misses du cache de prédictions de /predict et /predict_batch"""
+    return json_response(tumor_service.cache_stats())
+
+@app.route('/stats/shadow', methods=['GET'])
+def shadow_stats():
+    """Comparaison au modèle candidat (scoring fantôme, hors du chemin de la requête)"""
+    return json_response(tumor_service.shadow_stats())
+
+@app.route('/stats/admission', methods=['GET'])
+def admission_stats():
+    """État du contrôle d'admission (lignes en cours, file, refus)"""
+    return json_response(tumor_service.admission_stats())
+
+@app.route('/model', methods=['GET'])
+def model_status():
+    """Version du modèle en service et état du rechargement à chaud"""
+    return json_response(tumor_service.model_status())
 
 @app.route('/health', methods=['GET'])
 def health_check():
-    """Vérification de la santé de l'API avec test de prédiction"""
-    try:
-        # Test simple avec des données connues
-        test_features = np.array([[0.01, 0.002]])
-        test_scaled = scaler.transform(test_features)
-        test_prediction = model.predict(test_scaled)[0]
-        
-        return jsonify({
-            "status": "healthy",
-            "model_loaded": True,
-            "scaler_loaded": True,
-            "test_prediction": int(test_prediction),
-            "preprocessing_working": True
-        })
-        
-    except Exception as e:
-        return jsonify({
-            "status": "error",
-            "message": f"Problème de santé: {str(e)}"
-        }), 500
+    """Vérification de la santé de l'API (dernier test canari, mis en cache)"""
+    return json_response(tumor_service.health())
+
+@app.route('/health/live', methods=['GET'])
+def health_live():
+    return json_response(tumor_service.liveness())
+
+@app.route('/health/ready', methods=['GET'])
+def health_ready():
+    return json_response(tumor_service.readiness())
 
 if __name__ == '__main__':
     print("🚀 Démarrage de l'API corrigée avec preprocessing MinMaxScaler")
-    print("📊 Modèle chargé:", "tumor_model.joblib")
-    print("⚙️ Scaler chargé:", "tumor_scaler.joblib")
-    app.run(debug=True, host='0.0.0.0', port=5002)  # Port 5002 pour la version corrigée 
\ No newline at end of file
+    print("📊 Modèle chargé:", tumor_service.model_watcher.model_path)
+    if tumor_service.model_watcher.scaler_path is not None:
+        print("⚙️ Scaler chargé:", tumor_service.model_watcher.scaler_path)
+    else:
+        print("⚙️ Scaler inclus dans le pipeline fusionné")
+    app.run(debug=True, host='0.0.0.0', port=5002)  # Port 5002 pour la version corrigée
@@ -0,0 +1,221 @@
+import json
+import math
+import os
+import struct
+import numpy as np
+from scipy.special import expit
+
+# 📦 Artefact pipeline sans pickle : en-tête JSON + tableaux float64 bruts
+#   b"TUMORPL1" | longueur de l'en-tête (uint32 little-endian) | en-tête JSON | tableaux
+PIPELINE_MAGIC = b"TUMORPL1"
+PIPELINE_FORMAT_VERSION = 1
+PIPELINE_ARRAYS = ("coef", "scale", "offset")
+
+class CompiledTumorModel:
+    """
+    Pipeline MinMaxScaler + LogisticRegression replié en un seul produit scalaire
+
+    Le MinMaxScaler calcule x_scaled = x * scale_ + min_ et la régression
+    logistique calcule z = coef . x_scaled + intercept. On replie donc les deux
+    étapes au chargement :
+        z = (coef * scale_) . x + (coef . min_ + intercept)
+    ce qui évite les trois appels sklearn (transform, predict, predict_proba)
+    et leurs validations à chaque requête.
+    """
+
+    def __init__(self, coef, intercept, classes, scale, offset, feature_names=None):
+        coef = np.asarray(coef, dtype=np.float64).ravel()
+        self.coef = coef
+        self.intercept = float(intercept)
+        self.feature_names = list(feature_names) if feature_names is not None else None
+        self.scale = np.asarray(scale, dtype=np.float64).ravel()
+        self.offset = np.asarray(offset, dtype=np.float64).ravel()
+        self.classes = np.asarray(classes)
+
+        if len(self.classes) != 2:
+            raise ValueError("Seule la classification binaire est supportée")
+        if not (len(coef) == len(self.scale) == len(self.offset)):
+            raise ValueError("Le modèle et le scaler n'ont pas le même nombre de features")
+
+        # Poids exprimés directement dans l'espace des données brutes
+        self.weights = coef * self.scale
+        self.bias = float(np.dot(coef, self.offset) + float(intercept))
+
+        # Copies en floats Python pour le chemin une-ligne (plus rapide que NumPy sur 2 valeurs)
+        self._weights = [float(w) for w in self.weights]
+        self._scale = [float(s) for s in self.scale]
+        self._offset = [float(o) for o in self.offset]
+        self._labels = [c.item() if hasattr(c, 'item') else c for c in self.classes]
+
+    @classmethod
+    def from_sklearn(cls, model, scaler):
+        """
+        Construit le noyau à partir d'un LogisticRegression et d'un MinMaxScaler entraînés
+
+        Args:
+            model: LogisticRegression binaire entraîné sur les données normalisées
+            scaler: MinMaxScaler ou StandardScaler entraîné
+
+        Returns:
+            CompiledTumorModel: noyau d'inférence replié
+        """
+        coef = np.asarray(model.coef_)
+        if coef.shape[0] != 1:
+            raise ValueError("Seule la classification binaire est supportée")
+        if hasattr(scaler, "min_"):
+            scale, offset = scaler.scale_, scaler.min_
+        else:
+            # StandardScaler : x_scaled = (x - mean_) / scale_ = x * (1 / scale_) - mean_ / scale_
+            n_features = scaler.n_features_in_
+            std = np.ones(n_features) if scaler.scale_ is None else np.asarray(scaler.scale_)
+            mean = np.zeros(n_features) if scaler.mean_ is None else np.asarray(scaler.mean_)
+            scale, offset = 1.0 / std, -mean / std
+        names = getattr(scaler, "feature_names_in_", None)
+        return cls(coef[0], model.intercept_[0], model.classes_, scale, offset,
+                   feature_names=[str(name) for name in names] if names is not None else None)
+
+    def without_scaler(self):
+        """Même modèle appliqué aux données brutes, sans le scaler (le bug de tumor_api.py)"""
+        n_features = len(self.coef)
+        return CompiledTumorModel(self.coef, self.intercept, self.classes,
+                                  np.ones(n_features), np.zeros(n_features), self.feature_names)
+
+    def to_bytes(self, metadata=None):
+        """
+        Sérialise le pipeline (scaler + modèle) sans pickle
+
+        Les floats de l'en-tête sont écrits avec repr par json : aller-retour exact.
+
+        Args:
+            metadata (dict): Informations libres ajoutées à l'en-tête (métriques, paramètres...)
+        """
+        arrays, start = {}, 0
+        for name in PIPELINE_ARRAYS:
+            arrays[name] = [start, len(getattr(self, name))]
+            start += len(getattr(self, name))
+        header = json.dumps({
+            "format_version": PIPELINE_FORMAT_VERSION,
+            "feature_names": self.feature_names,
+            "classes": [c.item() if hasattr(c, 'item') else c for c in self.classes],
+            "intercept": self.intercept,
+            "dtype": "<f8",
+            "arrays": arrays,
+            "metadata": metadata or {},
+        }, default=str).encode('utf-8')
+        # Tableaux alignés sur 8 octets : np.frombuffer les lit sans copie
+        header += b" " * (-(len(PIPELINE_MAGIC) + 4 + len(header)) % 8)
+        data = np.concatenate([getattr(self, name) for name in PIPELINE_ARRAYS]).astype('<f8')
+        return PIPELINE_MAGIC + struct.pack('<I', len(header)) + header + data.tobytes()
+
+    @classmethod
+    def from_bytes(cls, buffer):
+        """Recharge un pipeline écrit par to_bytes ; renvoie (noyau, en-tête)"""
+        buffer = memoryview(buffer)
+        if bytes(buffer[:len(PIPELINE_MAGIC)]) != PIPELINE_MAGIC:
+            raise ValueError("Ce fichier n'est pas un pipeline tumeurs")
+        offset = len(PIPELINE_MAGIC)
+        (header_length,) = struct.unpack_from('<I', buffer, offset)
+        offset += 4
+        header = json.loads(bytes(buffer[offset:offset + header_length]))
+        if header.get("format_version") != PIPELINE_FORMAT_VERSION:
+            raise ValueError(f"Version de format non supportée: {header.get('format_version')}")
+        data = np.frombuffer(buffer, dtype=header["dtype"], offset=offset + header_length)
+        arrays = {name: data[start:start + count] for name, (start, count) in header["arrays"].items()}
+        compiled = cls(arrays["coef"], header["intercept"], np.array(header["classes"]),
+                       arrays["scale"], arrays["offset"], header.get("feature_names"))
+        return compiled, header
+
+    def predict_with_proba(self, features):
+        """
+        Prédit les labels et les probabilités en un seul passage
+
+        Args:
+            features (array-like): Matrice (n, n_features) de données brutes (non normalisées)
+
+        Returns:
+            tuple: (labels, probabilités de la classe positive), deux tableaux de taille n
+        """
+        features = np.asarray(features, dtype=np.float64)
+        decision = features @ self.weights + self.bias
+        probabilities = expit(decision)
+        labels = self.classes[(decision > 0).astype(np.intp)]
+        return labels, probabilities
+
+    def predict_columns(self, *columns):
+        """
+        Comme predict_with_proba, mais à partir de colonnes séparées (aucune copie en matrice)
+
+        Args:
+            *columns (array-like): Une colonne 1-D de données brutes par feature
+
+        Returns:
+            tuple: (labels, probabilités de la classe positive)
+        """
+        if len(columns) != len(self.weights):
+            raise ValueError(f"{len(self.weights)} colonnes attendues, {len(columns)} reçues")
+        decision = np.full(len(columns[0]), self.bias)
+        for weight, column in zip(self.weights, columns):
+            decision += weight * np.asarray(column, dtype=np.float64)
+        probabilities = expit(decision)
+        labels = self.classes[(decision > 0).astype(np.intp)]
+        return labels, probabilities
+
+    def predict_one(self, *values):
+        """
+        Prédit une seule ligne sans passer par NumPy
+
+        Args:
+            *values (float): Valeurs brutes des features (ex: size, p53_concentration)
+
+        Returns:
+            tuple: (label, probabilité de la classe positive)
+
+        Raises:
+            ValueError: si le nombre de valeurs ne correspond pas au nombre de features
+        """
+        self._check_arity(values)
+        decision = self.bias
+        for weight, value in zip(self._weights, values):
+            decision += weight * float(value)
+        return self._labels[decision > 0], _sigmoid(decision)
+
+    def scale_one(self, *values):
+        """Applique uniquement le scaler à une ligne (pour l'affichage)"""
+        self._check_arity(values)
+        return [float(value) * scale + offset
+                for value, scale, offset in zip(values, self._scale, self._offset)]
+
+    def _check_arity(self, values):
+        # zip() tronquerait en silence une ligne trop longue ou trop courte
+        if len(values) != len(self._weights):
+            raise ValueError(f"{len(self._weights)} valeurs attendues, {len(values)} reçues")
+
+def _sigmoid(z):
+    """Sigmoïde numériquement stable pour un float Python"""
+    if z >= 0:
+        return 1.0 / (1.0 + math.exp(-z))
+    e = math.exp(z)
+    return e / (1.0 + e)
+
+def save_pipeline(compiled, path="tumor_pipeline.bin", metadata=None):
+    """Écrit le pipeline dans un fichier, atomiquement (un lecteur ne voit jamais un fichier à moitié écrit)"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(compiled.to_bytes(metadata))
+    os.replace(tmp_path, path)
+
+def load_pipeline(path="tumor_pipeline.bin"):
+    """Charge un pipeline écrit par save_pipeline (aucun pickle, aucun import sklearn)"""
+    with open(path, 'rb') as f:
+        return CompiledTumorModel.from_bytes(f.read())[0]
+
+def load_compiled_model(model_path="tumor_model.joblib", scaler_path="tumor_scaler.joblib"):
+    """
+    Charge le modèle et le scaler sauvegardés puis les replie en un seul noyau
+
+    Avec scaler_path=None, model_path désigne un pipeline fusionné (tumor_pipeline.bin).
+    """
+    if scaler_path is None:
+        return load_pipeline(model_path)
+    import joblib
+    return CompiledTumorModel.from_sklearn(joblib.load(model_path), joblib.load(scaler_path))
@@ -0,0 +1,744 @@
+"""
+Logique métier de l'API de prédiction de tumeurs, indépendante du framework web
+
+Chaque handler reçoit des données déjà décodées et renvoie un couple
+(payload, code HTTP). Les serveurs Flask (tumor_api_fixed.py) et ASGI
+(tumor_api_asgi.py) ne font que décoder la requête, appeler ces fonctions
+et encoder la réponse, ce qui garantit des contrats JSON identiques.
+"""
+import json
+import os
+import time
+import numpy as np
+from model_watcher import ModelWatcher, load_bundle
+from micro_batching import MicroBatcher
+from prediction_cache import PredictionCache
+from admission import AdmissionController
+from model_registry import ModelRegistry, resolve_artifacts
+from shadow import ShadowScorer
+import batch_formats
+from health import HealthMonitor
+from metrics import ApiMetrics
+
+try:
+    import orjson  # Décodage/encodage JSON bien plus rapide pour les gros lots (voir requirements.txt)
+except ImportError:
+    orjson = None  # Repli sur json : /predict_batch en colonnes n'est alors que ~5x plus rapide
+
+MODEL_PATH = "tumor_model.joblib"
+SCALER_PATH = "tumor_scaler.joblib"
+PIPELINE_PATH = "tumor_pipeline.bin"  # Scaler + modèle fusionnés, sans pickle : préféré s'il existe
+# 📦 Modèle résolu dans le registre (models/) s'il y est publié, sinon les fichiers ci-dessus
+MODEL_NAME = os.environ.get("TUMOR_MODEL_NAME", "tumor")
+MODEL_VERSION = os.environ.get("TUMOR_MODEL_VERSION", "latest")
+CANARY_PATH = "tumor_two_vars.csv"
+STREAM_CHUNK_SIZE = int(os.environ.get("TUMOR_STREAM_CHUNK_SIZE", "1000"))
+STREAM_MAX_LINE_BYTES = int(os.environ.get("TUMOR_STREAM_MAX_LINE_BYTES", str(64 * 1024)))
+LINE_TOO_LONG = object()  # Remplace une ligne NDJSON plus longue que STREAM_MAX_LINE_BYTES
+
+# 📈 Métriques Prometheus partagées par les serveurs Flask et ASGI (exposées sur /metrics)
+metrics = ApiMetrics("tumor_service")
+
+def load_canary_set(path=CANARY_PATH, n_rows=200):
+    """Premières lignes étiquetées du dataset, utilisées pour valider un modèle rechargé"""
+    if not os.path.exists(path):
+        return np.array([[0.01, 0.002]]), None
+    data = np.loadtxt(path, delimiter=',', skiprows=1, max_rows=n_rows, ndmin=2)
+    return data[:, :2], data[:, 2].astype(np.int64)
+
+def resolve_model_paths():
+    """
+    (chemin modèle, chemin scaler, mmap_mode) de la version demandée ; mmap seulement pour le registre
+
+    Le pipeline fusionné est préféré quand il existe : (chemin pipeline, None, None).
+    """
+    paths, from_registry = resolve_artifacts(MODEL_NAME, MODEL_VERSION,
+                                             fallback={"pipeline": PIPELINE_PATH, "model": MODEL_PATH,
+                                                       "scaler": SCALER_PATH})
+    if "pipeline" in paths and os.path.exists(paths["pipeline"]):
+        return paths["pipeline"], None, None
+    return paths["model"], paths["scaler"], "r" if from_registry else None
+
+def run_canary():
+    """Test canari : une prédiction connue à travers le scaler et le modèle actifs"""
+    bundle = model_watcher.current
+    test_prediction, _ = bundle.compiled.predict_one(0.01, 0.002)
+    return {
+        "model_loaded": True,
+        "scaler_loaded": True,
+        "test_prediction": int(test_prediction),
+        "preprocessing_working": True,
+        "model_version": bundle.version
+    }
+
+# 🩺 Le canari tourne en arrière-plan : les sondes /health ne lisent que le cache
+health_monitor = HealthMonitor(
+    run_canary,
+    interval=float(os.environ.get("TUMOR_HEALTH_INTERVAL", "5")),
+    ttl=float(os.environ.get("TUMOR_HEALTH_TTL", "15")),
+)
+
+# Chargement du modèle ET du scaler (CORRECTION !), ensemble, dans un seul couple
+# ⚡ Le couple contient aussi le noyau compilé (scaler + modèle repliés en un produit scalaire)
+# 🔄 Les fichiers sont surveillés : un nouvel entraînement est rechargé sans redémarrage
+canary_features, canary_labels = load_canary_set()
+model_watcher = ModelWatcher(
+    MODEL_PATH, SCALER_PATH, canary_features, canary_labels,
+    resolve_paths=resolve_model_paths,
+    min_accuracy=float(os.environ.get("TUMOR_RELOAD_MIN_ACCURACY", "0.9")),
+    interval=float(os.environ.get("TUMOR_MODEL_WATCH_INTERVAL", "2")),
+    health_monitor=health_monitor,
+)
+
+def current_bundle():
+    """Couple modèle + scaler actif ; à lire UNE fois par requête"""
+    model_watcher.ensure_started()
+    return model_watcher.current
+
+def _predict_with_current(features):
+    return model_watcher.current.compiled.predict_with_proba(features)
+
+# 📦 Micro-batching optionnel de /predict (TUMOR_MICRO_BATCH=1 pour l'activer)
+micro_batcher = None
+if os.environ.get("TUMOR_MICRO_BATCH", "0") == "1":
+    micro_batcher = MicroBatcher(
+        _predict_with_current,
+        max_batch_size=int(os.environ.get("TUMOR_MICRO_BATCH_MAX_SIZE", "64")),
+        max_latency_us=int(os.environ.get("TUMOR_MICRO_BATCH_MAX_LATENCY_US", "500")),
+        timeout=float(os.environ.get("TUMOR_MICRO_BATCH_TIMEOUT_MS", "1000")) / 1000,
+    )
+
+# 🗃️ Cache des résultats de /predict et /predict_batch (TUMOR_CACHE_SIZE=0 pour le désactiver)
+prediction_cache = None
+if int(os.environ.get("TUMOR_CACHE_SIZE", "10000")) > 0:
+    prediction_cache = PredictionCache(
+        max_entries=int(os.environ.get("TUMOR_CACHE_SIZE", "10000")),
+        ttl=float(os.environ.get("TUMOR_CACHE_TTL", "300")),
+        decimals=int(os.environ.get("TUMOR_CACHE_DECIMALS", "9")),
+    )
+
+# 🚦 Contrôle d'admission des endpoints de prédiction (TUMOR_MAX_ROWS_IN_FLIGHT=0 pour le désactiver)
+ADMITTED_ENDPOINTS = ('/predict', '/predict_batch', '/predict_stream')
+JSON_BYTES_PER_ROW = 40  # Estimation prudente (une ligne JSON fait plutôt 40 à 70 octets)
+admission = None
+if int(os.environ.get("TUMOR_MAX_ROWS_IN_FLIGHT", "200000")) > 0:
+    admission = AdmissionController(
+        max_rows_in_flight=int(os.environ.get("TUMOR_MAX_ROWS_IN_FLIGHT", "200000")),
+        max_queue=int(os.environ.get("TUMOR_ADMISSION_QUEUE", "32")),
+        queue_timeout=float(os.environ.get("TUMOR_ADMISSION_QUEUE_TIMEOUT", "2")),
+        priority_max_rows=int(os.environ.get("TUMOR_PRIORITY_MAX_ROWS", "16")),
+        priority_max_in_flight=int(os.environ.get("TUMOR_PRIORITY_MAX_IN_FLIGHT", "256")),
+        retry_after=int(os.environ.get("TUMOR_RETRY_AFTER", "1")),
+    )
+
+def estimate_rows(endpoint, content_length, content_type=None):
+    """
+    Nombre de lignes d'une requête, estimé AVANT de lire le corps (pour refuser vite)
+
+    Args:
+        endpoint (str): Route appelée
+        content_length (int): Taille du corps (None si envoyé par morceaux)
+        content_type (str): Content-Type, pour reconnaître les formats binaires (16 octets par ligne)
+
+    Returns:
+        int: Lignes à réserver dans le contrôle d'admission
+    """
+    if endpoint == '/predict':
+        return 1
+    if endpoint == '/predict_stream':
+        return STREAM_CHUNK_SIZE  # Un flux n'a qu'un paquet en cours à la fois
+    if not content_length:
+        return admission.max_rows_in_flight  # Taille inconnue : traité comme le plus gros lot
+    try:
+        fmt = batch_formats.negotiate(content_type)
+    except batch_formats.UnsupportedFormat:
+        fmt = None
+    bytes_per_row = 2 * batch_formats.FLOAT64_LE.itemsize if fmt is not None else JSON_BYTES_PER_ROW
+    return max(1, -(-content_length // bytes_per_row))
+
+def overloaded(e):
+    """Réponse 429 d'un refus d'admission : (payload, code HTTP, en-têtes)"""
+    payload, status = error(str(e), 429)
+    payload["retry_after"] = e.retry_after
+    return payload, status, {"Retry-After": str(e.retry_after)}
+
+def build_shadow_candidate(spec):
+    """
+    Modèle candidat du scoring fantôme
+
+    Args:
+        spec (str): "unscaled" pour le pipeline sans scaler de tumor_api.py,
+            ou une version du registre (ex: "v3")
+
+    Returns:
+        tuple: (fonction matrice -> (labels, probabilités), nom du candidat)
+    """
+    if spec == "unscaled":
+        def predict_unscaled(features):
+            compiled = model_watcher.current.compiled.without_scaler()  # Modèle SANS le scaler, comme tumor_api.py
+            return compiled.predict_with_proba(features)
+        return predict_unscaled, "unscaled (tumor_api.py, sans scaler)"
+
+    paths = ModelRegistry().artifact_paths(MODEL_NAME, spec)
+    if "pipeline" in paths:
+        candidate = load_bundle(paths["pipeline"])
+    else:
+        candidate = load_bundle(paths["model"], paths["scaler"], mmap_mode="r")
+    return candidate.compiled.predict_with_proba, f"{MODEL_NAME} {spec} ({candidate.version})"
+
+# 👥 Scoring fantôme optionnel (TUMOR_SHADOW=unscaled ou une version du registre, ex: v3)
+shadow = None
+if os.environ.get("TUMOR_SHADOW"):
+    _candidate_fn, _candidate_name = build_shadow_candidate(os.environ["TUMOR_SHADOW"])
+    shadow = ShadowScorer(
+        _candidate_fn, _candidate_name,
+        max_queue=int(os.environ.get("TUMOR_SHADOW_QUEUE", "1000")),
+        sample_rate=float(os.environ.get("TUMOR_SHADOW_SAMPLE", "1")),
+    )
+
+def loads(body):
+    """Décode un corps de requête JSON (avec orjson si disponible)"""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+def dumps(payload):
+    """Encode une réponse en JSON (bytes), tableaux NumPy compris"""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(payload, default=_to_builtin).encode('utf-8')
+
+def _to_builtin(value):
+    """Convertit les tableaux et scalaires NumPy pour le module json standard"""
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    raise TypeError(f"Type non sérialisable en JSON: {type(value).__name__}")
+
+def error(message, status):
+    """Payload d'erreur commun à tous les endpoints"""
+    return {"status": "error", "message": message}, status
+
+def home():
+    return {
+        "message": "🏥 API de prédiction de tumeurs cancéreuses (VERSION CORRIGÉE)",
+        "status": "API fonctionnelle avec preprocessing correct",
+        "preprocessing": "MinMaxScaler appliqué avant prédiction",
+        "endpoints": {
+            "/predict": "POST - Prédire si une tumeur est cancéreuse",
+            "/predict_batch": "POST - Prédictions multiples (lignes 'tumors' ou colonnes 'size'/'p53_concentration' ; "
+                              "aussi en octet-stream float64, Arrow IPC ou MessagePack selon le Content-Type)",
+            "/stats/micro_batching": "GET - Métriques du micro-batching de /predict",
+            "/stats/cache": "GET - Hits/misses du cache de prédictions",
+            "/stats/shadow": "GET - Désaccords et écarts de latence du modèle candidat (scoring fantôme)",
+            "/stats/admission": "GET - Lignes en cours, file d'attente et refus (429) du contrôle d'admission",
+            "/metrics": "GET - Métriques Prometheus (requêtes, latence par étape, tailles de lot, erreurs)",
+            "/health": "GET - Résultat du dernier test canari (mis en cache)",
+            "/health/live": "GET - Sonde de vivacité",
+            "/health/ready": "GET - Sonde de disponibilité (503 si le canari ou le rechargement échoue)",
+            "/model": "GET - Version du modèle en service et état du rechargement à chaud",
+            "/predict_stream": "POST - Scoring en flux NDJSON (une tumeur par ligne, résultats renvoyés par paquets)"
+        }
+    }, 200
+
+def predict_one(data):
+    """Prédire si une tumeur est cancéreuse (VERSION CORRIGÉE - avec scaler)"""
+    try:
+        size = data.get('size')
+        p53_concentration = data.get('p53_concentration')
+
+        # Validation des données
+        if size is None or p53_concentration is None:
+            return error("Les paramètres 'size' et 'p53_concentration' sont requis", 400)
+
+        # ✅ CORRECTION: Appliquer le preprocessing (scaler) AVANT la prédiction
+        # Le noyau compilé applique le scaler et le modèle en une seule opération
+        bundle = current_bundle()
+        with metrics.stage("/predict", "predict"):
+            size_scaled, p53_scaled = bundle.compiled.scale_one(size, p53_concentration)
+            prediction, probability_cancerous = _predict_one_cached(bundle, size, p53_concentration)
+
+        return {
+            "status": "success",
+            "prediction": {
+                "size": size,
+                "p53_concentration": p53_concentration,
+                "size_scaled": size_scaled,  # Montrer la donnée transformée
+                "p53_scaled": p53_scaled,    # Montrer la donnée transformée
+                "is_cancerous": int(prediction),
+                "is_cancerous_text": "Cancéreux" if prediction == 1 else "Non cancéreux",
+                "probability_cancerous": probability_cancerous,
+                "confidence": max(probability_cancerous, 1.0 - probability_cancerous),
+                "preprocessing_applied": "MinMaxScaler"
+            },
+            "model_version": bundle.version
+        }, 200
+
+    except TimeoutError as e:
+        # ⏳ Micro-batcher saturé ou bloqué : l'appelant peut réessayer plus tard
+        metrics.error("/predict", e)
+        return error(f"Service temporairement indisponible: {str(e)}", 503)
+    except Exception as e:
+        metrics.error("/predict", e)
+        return error(f"Erreur lors de la prédiction: {str(e)}", 500)
+
+def _predict_one_cached(bundle, size, p53_concentration):
+    """(label, probabilité) d'une ligne : cache d'abord, puis micro-batcher ou noyau compilé"""
+    key = None
+    if prediction_cache is not None:
+        key = prediction_cache.key(bundle.version, size, p53_concentration)
+        cached = prediction_cache.get(key)
+        if cached is not None:
+            return cached
+
+    start = time.perf_counter()
+    if micro_batcher is not None:
+        # Le lot est scoré avec le couple de la requête : version renvoyée et clé de cache concordent
+        prediction, probability_cancerous = micro_batcher.submit([size, p53_concentration],
+                                                                 predict_fn=bundle.compiled.predict_with_proba)
+    else:
+        prediction, probability_cancerous = bundle.compiled.predict_one(size, p53_concentration)
+    result = (int(prediction), float(probability_cancerous))
+    if shadow is not None:
+        shadow.submit([[float(size), float(p53_concentration)]], [result[0]], [result[1]],
+                      time.perf_counter() - start)
+
+    if key is not None:
+        prediction_cache.put(key, result)
+    return result
+
+def predict_batch(data):
+    """Prédictions multiples (VERSION CORRIGÉE)
+
+    Deux formats sont acceptés :
+      - lignes : {"tumors": [{"size": ..., "p53_concentration": ...}, ...]}
+      - colonnes : {"size": [...], "p53_concentration": [...]} (chemin rapide vectorisé)
+    """
+    try:
+        # ⚡ Format colonnes : validation et prédiction entièrement vectorisées
+        if isinstance(data.get('size'), list) or isinstance(data.get('p53_concentration'), list):
+            return predict_batch_columnar(data)
+
+        tumors = data.get('tumors', [])
+
+        if not tumors:
+            return error("Le paramètre 'tumors' est requis et doit être une liste", 400)
+
+        bundle = current_bundle()
+        predictions = [None] * len(tumors)
+        metrics.observe_batch("/predict_batch", len(tumors))
+
+        # Valider chaque ligne ; les erreurs restent à leur place dans la réponse
+        rows = []
+        features_list = []
+        with metrics.stage("/predict_batch", "validate"):
+            for i, tumor in enumerate(tumors):
+                size = tumor.get('size')
+                p53_concentration = tumor.get('p53_concentration')
+
+                if size is None or p53_concentration is None:
+                    predictions[i] = {
+                        "error": "Paramètres manquants",
+                        "tumor": tumor
+                    }
+                    continue
+
+                try:
+                    features_list.append((float(size), float(p53_concentration)))
+                except (TypeError, ValueError):
+                    predictions[i] = {
+                        "error": "Paramètres non numériques",
+                        "tumor": tumor
+                    }
+                    continue
+                rows.append(i)
+
+        # 🗃️ Le cache d'abord : seules les lignes absentes passent par le modèle
+        with metrics.stage("/predict_batch", "cache_lookup"):
+            if prediction_cache is not None:
+                keys = [prediction_cache.key(bundle.version, *features) for features in features_list]
+                results = prediction_cache.get_many(keys)
+            else:
+                results = [None] * len(features_list)
+            misses = [j for j, result in enumerate(results) if result is None]
+
+        if misses:
+            features_array = np.array([features_list[j] for j in misses], dtype=np.float64)
+
+            # ✅ Scaling + prédictions en lot via le noyau compilé
+            with metrics.stage("/predict_batch", "predict"):
+                start = time.perf_counter()
+                predictions_array, probabilities_array = bundle.compiled.predict_with_proba(features_array)
+            if shadow is not None:
+                shadow.submit(features_array, predictions_array, probabilities_array,
+                              time.perf_counter() - start)
+            computed = list(zip(predictions_array.tolist(), probabilities_array.tolist()))
+            for j, result in zip(misses, computed):
+                results[j] = result
+            if prediction_cache is not None:
+                prediction_cache.put_many((keys[j], result) for j, result in zip(misses, computed))
+
+        # Associer les résultats, dans l'ordre de la requête
+        for i, (prediction, probability_cancerous) in zip(rows, results):
+            tumor = tumors[i]
+            predictions[i] = {
+                "size": tumor['size'],
+                "p53_concentration": tumor['p53_concentration'],
+                "is_cancerous": int(prediction),
+                "is_cancerous_text": "Cancéreux" if prediction == 1 else "Non cancéreux",
+                "probability_cancerous": float(probability_cancerous),
+                "preprocessing_applied": "MinMaxScaler"
+            }
+
+        return {
+            "status": "success",
+            "predictions": predictions,
+            "total": len(predictions),
+            "cache_hits": len(rows) - len(misses),
+            "preprocessing": "MinMaxScaler appliqué sur tous les échantillons",
+            "model_version": bundle.version
+        }, 200
+
+    except Exception as e:
+        metrics.error("/predict_batch", e)
+        return error(f"Erreur lors des prédictions: {str(e)}", 500)
+
+def predict_batch_columnar(data):
+    """Prédictions en lot au format colonnes (un seul produit matriciel pour tout le lot)
+
+    Args:
+        data (dict): {"size": [...], "p53_concentration": [...]}
+
+    Returns:
+        tuple: (payload avec des tableaux colonnes alignés sur l'entrée, code HTTP)
+    """
+    sizes = data.get('size')
+    p53 = data.get('p53_concentration')
+
+    if not isinstance(sizes, list) or not isinstance(p53, list):
+        return error("Les paramètres 'size' et 'p53_concentration' doivent être des listes", 400)
+
+    if len(sizes) != len(p53):
+        return error("Les listes 'size' et 'p53_concentration' doivent avoir la même longueur", 400)
+
+    if not sizes:
+        return error("Les listes 'size' et 'p53_concentration' ne doivent pas être vides", 400)
+
+    metrics.observe_batch("/predict_batch", len(sizes))
+    try:
+        # None devient NaN avec dtype=float : la validation se fait ensuite par masque
+        with metrics.stage("/predict_batch", "validate"):
+            size_column = np.array(sizes, dtype=np.float64)
+            p53_column = np.array(p53, dtype=np.float64)
+    except (TypeError, ValueError):
+        return error("Les valeurs de 'size' et 'p53_concentration' doivent être numériques", 400)
+
+    with metrics.stage("/predict_batch", "predict"):
+        labels, probabilities, valid, bundle = score_columns(size_column, p53_column)
+
+    if valid.all():
+        is_cancerous = labels
+        probability_cancerous = probabilities
+        invalid_indices = []
+    else:
+        # Les lignes invalides reçoivent null pour garder l'alignement avec l'entrée
+        is_cancerous = np.full(len(valid), None, dtype=object)
+        is_cancerous[valid] = labels.tolist()
+        probability_cancerous = np.full(len(valid), None, dtype=object)
+        probability_cancerous[valid] = probabilities.tolist()
+        is_cancerous = is_cancerous.tolist()
+        probability_cancerous = probability_cancerous.tolist()
+        invalid_indices = np.flatnonzero(~valid).tolist()
+
+    return {
+        "status": "success",
+        "format": "columnar",
+        "is_cancerous": is_cancerous,
+        "probability_cancerous": probability_cancerous,
+        "invalid_indices": invalid_indices,
+        "total": len(valid),
+        "preprocessing": "MinMaxScaler appliqué sur tous les échantillons",
+        "model_version": bundle.version
+    }, 200
+
+def score_columns(size_column, p53_column):
+    """
+    Valide par masque puis score deux colonnes brutes avec le couple actif
+
+    Returns:
+        tuple: (labels et probabilités des lignes valides, masque des lignes valides, couple utilisé)
+    """
+    valid = np.isfinite(size_column) & np.isfinite(p53_column)
+    if not valid.all():
+        size_column, p53_column = size_column[valid], p53_column[valid]
+
+    # ✅ Scaling + prédiction de tout le lot en une seule opération vectorisée
+    bundle = current_bundle()
+    start = time.perf_counter()
+    labels, probabilities = bundle.compiled.predict_columns(size_column, p53_column)
+    if shadow is not None:
+        shadow.submit((size_column, p53_column), labels, probabilities, time.perf_counter() - start)
+    return labels, probabilities, valid, bundle
+
+def predict_batch_binary(body, fmt):
+    """
+    Prédictions en lot pour les formats binaires (voir batch_formats)
+
+    Args:
+        body (bytes): Corps brut de la requête, décodé sans copie quand c'est possible
+        fmt (str): Format négocié par batch_formats.negotiate()
+
+    Returns:
+        tuple: (corps de la réponse en bytes, code HTTP, Content-Type, en-têtes supplémentaires)
+    """
+    try:
+        with metrics.stage("/predict_batch", "decode"):
+            size_column, p53_column = batch_formats.decode_columns(body, fmt)
+    except Exception as e:
+        metrics.error("/predict_batch", e)
+        return _json_error(f"Corps {fmt} invalide: {str(e)}", 400)
+
+    if len(size_column) == 0:
+        return _json_error("Le lot ne doit pas être vide", 400)
+
+    metrics.observe_batch("/predict_batch", len(size_column))
+    try:
+        with metrics.stage("/predict_batch", "predict"):
+            labels, probabilities, valid, bundle = score_columns(size_column, p53_column)
+        with metrics.stage("/predict_batch", "encode"):
+            body = batch_formats.encode_result(fmt, labels, probabilities, valid, bundle.version)
+    except Exception as e:
+        metrics.error("/predict_batch", e)
+        return _json_error(f"Erreur lors des prédictions: {str(e)}", 500)
+
+    headers = {
+        "X-Model-Version": bundle.version,
+        "X-Total-Rows": str(len(valid)),
+        "X-Invalid-Rows": str(int(len(valid) - valid.sum())),
+    }
+    return body, 200, fmt, headers
+
+def _json_error(message, status):
+    payload, status = error(message, status)
+    return dumps(payload), status, "application/json", {}
+
+def score_ndjson_chunk(lines, first_index, bundle):
+    """
+    Score un paquet de lignes NDJSON et renvoie les lignes de résultat NDJSON
+
+    Args:
+        lines (list): Lignes brutes (bytes, str ou LINE_TOO_LONG), une tumeur JSON par ligne
+        first_index (int): Index (dans le flux) de la première ligne du paquet
+        bundle (ModelBundle): Couple modèle + scaler utilisé pour tout le flux
+
+    Returns:
+        bytes: Une ligne JSON de résultat par ligne d'entrée
+    """
+    metrics.observe_batch("/predict_stream", len(lines))
+    with metrics.stage("/predict_stream", "score_chunk"):
+        return _score_ndjson_chunk(lines, first_index, bundle)
+
+def _score_ndjson_chunk(lines, first_index, bundle):
+    n_lines = len(lines)
+    size_column = np.full(n_lines, np.nan)
+    p53_column = np.full(n_lines, np.nan)
+    ids = [None] * n_lines
+    errors = [None] * n_lines
+
+    for i, line in enumerate(lines):
+        if line is LINE_TOO_LONG:
+            errors[i] = f"Ligne trop longue (plus de {STREAM_MAX_LINE_BYTES} octets)"
+            continue
+        try:
+            tumor = loads(line)
+            ids[i] = tumor.get('id')
+            size = tumor.get('size')
+            p53_concentration = tumor.get('p53_concentration')
+            if size is None or p53_concentration is None:
+                continue
+            # Nombres JSON uniquement : ni chaînes ("0.01") ni booléens
+            if not (_is_number(size) and _is_number(p53_concentration)):
+                errors[i] = "Paramètres non numériques"
+                continue
+            size_column[i] = size
+            p53_column[i] = p53_concentration
+        except (ValueError, TypeError, AttributeError, OverflowError) as e:
+            errors[i] = f"Ligne invalide: {str(e)}"
+
+    valid = np.isfinite(size_column) & np.isfinite(p53_column)
+    size_column, p53_column = size_column[valid], p53_column[valid]
+    start = time.perf_counter()
+    labels, probabilities = bundle.compiled.predict_columns(size_column, p53_column)
+    if shadow is not None:
+        shadow.submit((size_column, p53_column), labels, probabilities, time.perf_counter() - start)
+    labels, probabilities = iter(labels.tolist()), iter(probabilities.tolist())
+
+    out = []
+    for i in range(n_lines):
+        row = {"index": first_index + i}
+        if ids[i] is not None:
+            row["id"] = ids[i]
+        if valid[i]:
+            label = next(labels)
+            row["is_cancerous"] = label
+            row["probability_cancerous"] = next(probabilities)
+        else:
+            row["error"] = errors[i] or "Paramètres manquants"
+        out.append(dumps(row))
+    out.append(b"")
+    return b"\n".join(out)
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+class LineSplitter:
+    """
+    Découpe des blocs d'octets en lignes NDJSON, sans jamais garder plus d'une ligne en mémoire
+
+    Une ligne plus longue que max_line_bytes est remplacée par LINE_TOO_LONG
+    (une erreur pour cette ligne seulement) et ses octets sont jetés jusqu'au
+    saut de ligne suivant : un corps sans saut de ligne ne fait pas grossir le tampon.
+    """
+
+    def __init__(self, max_line_bytes=None):
+        self.max_line_bytes = max_line_bytes or STREAM_MAX_LINE_BYTES
+        self._pending = b""
+        self._skipping = False  # Dans une ligne trop longue, jusqu'au prochain saut de ligne
+
+    def feed(self, block):
+        """Renvoie les lignes complètes du bloc (bytes ou LINE_TOO_LONG)"""
+        if self._skipping:
+            end = block.find(b"\n")
+            if end < 0:
+                return []
+            block = block[end + 1:]
+            self._skipping = False
+        lines = (self._pending + block).split(b"\n")
+        self._pending = lines.pop()  # Dernière ligne éventuellement incomplète
+        lines = [LINE_TOO_LONG if len(line) > self.max_line_bytes else line for line in lines]
+        if len(self._pending) > self.max_line_bytes:
+            lines.append(LINE_TOO_LONG)
+            self._pending = b""
+            self._skipping = True
+        return lines
+
+    def close(self):
+        """Renvoie la dernière ligne, sans saut de ligne final"""
+        pending, self._pending = self._pending, b""
+        return [pending] if pending else []
+
+def iter_lines(stream, block_size=64 * 1024):
+    """Découpe un flux binaire en lignes en le lisant par blocs (bien plus rapide que readline)"""
+    splitter = LineSplitter()
+    while True:
+        block = stream.read(block_size)
+        if not block:
+            break
+        yield from splitter.feed(block)
+    yield from splitter.close()
+
+def is_blank(line):
+    return line is not LINE_TOO_LONG and not line.strip()
+
+def predict_stream(lines, chunk_size=None):
+    """
+    Scoring en flux : lit des lignes NDJSON et produit les résultats paquet par paquet
+
+    La mémoire utilisée est bornée par chunk_size quelle que soit la taille
+    du flux. Une dernière ligne {"status": "done", ...} résume le flux.
+
+    Args:
+        lines (iterable): Lignes brutes de la requête (bytes, str ou LINE_TOO_LONG)
+        chunk_size (int): Nombre de lignes scorées ensemble (STREAM_CHUNK_SIZE par défaut)
+
+    Yields:
+        bytes: Résultats NDJSON d'un paquet
+    """
+    chunk_size = chunk_size or STREAM_CHUNK_SIZE
+    bundle = current_bundle()  # Un seul couple pour tout le flux
+    chunk = []
+    total = 0
+    for line in lines:
+        if is_blank(line):
+            continue
+        chunk.append(line)
+        if len(chunk) >= chunk_size:
+            yield score_ndjson_chunk(chunk, total, bundle)
+            total += len(chunk)
+            chunk = []
+    if chunk:
+        yield score_ndjson_chunk(chunk, total, bundle)
+        total += len(chunk)
+    yield stream_summary(total, bundle)
+
+def stream_summary(total, bundle):
+    return dumps({"status": "done", "total": total, "model_version": bundle.version}) + b"\n"
+
+def micro_batching_stats():
+    """Métriques de remplissage des lots du micro-batching de /predict"""
+    if micro_batcher is None:
+        return {
+            "status": "disabled",
+            "message": "Micro-batching désactivé (TUMOR_MICRO_BATCH=1 pour l'activer)"
+        }, 200
+    return {
+        "status": "enabled",
+        "stats": micro_batcher.stats()
+    }, 200
+
+def cache_stats():
+    """Hits/misses et remplissage du cache de prédictions"""
+    if prediction_cache is None:
+        return {
+            "status": "disabled",
+            "message": "Cache désactivé (TUMOR_CACHE_SIZE=0)"
+        }, 200
+    return {
+        "status": "enabled",
+        "stats": prediction_cache.stats()
+    }, 200
+
+def shadow_stats():
+    """Désaccords et écarts de latence entre le modèle principal et le candidat"""
+    if shadow is None:
+        return {
+            "status": "disabled",
+            "message": "Scoring fantôme désactivé (TUMOR_SHADOW=unscaled ou une version du registre)"
+        }, 200
+    return {
+        "status": "enabled",
+        "primary": model_watcher.current.version,
+        "stats": shadow.stats()
+    }, 200
+
+def admission_stats():
+    """Lignes en cours, file d'attente et refus du contrôle d'admission"""
+    if admission is None:
+        return {
+            "status": "disabled",
+            "message": "Contrôle d'admission désactivé (TUMOR_MAX_ROWS_IN_FLIGHT=0)"
+        }, 200
+    return {
+        "status": "enabled",
+        "stats": admission.stats()
+    }, 200
+
+def health():
+    """Santé de l'API d'après le dernier test canari (mis en cache, sans inférence)"""
+    ok, details, age = health_monitor.last_check()
+    if not ok:
+        return error(f"Problème de santé: {details}", 500)
+    return {"status": "healthy", **details, "last_check_age_s": round(age, 3)}, 200
+
+def model_status():
+    """Version du modèle en service et état du rechargement à chaud"""
+    model_watcher.ensure_started()
+    return {"status": "success", **model_watcher.status()}, 200
+
+def liveness():
+    """Sonde de vivacité : le processus répond"""
+    return health_monitor.liveness(), 200
+
+def readiness():
+    """Sonde de disponibilité : canari récent et réussi, aucun échec signalé (ex: rechargement)"""
+    ready, payload = health_monitor.readiness()
+    return payload, 200 if ready else 503